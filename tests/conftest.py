@@ -0,0 +1,14 @@
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+# Run from any directory: the engine package lives next to this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def random_image(width, height, seed=0):
+    """Deterministic RGBA noise image, shared by the test modules"""
+    pixels = np.random.default_rng(seed).integers(0, 256, (height, width, 4), dtype=np.uint8)
+    return Image.fromarray(pixels, "RGBA")
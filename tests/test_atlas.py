@@ -0,0 +1,123 @@
+import threading
+
+from conftest import random_image
+from texture_engine import atlas as atlas_module
+from texture_engine.atlas import (
+    AtlasBuilder,
+    AtlasConfig,
+    AtlasSheetView,
+    SlotConfig,
+    TileCache,
+    build_atlas,
+    build_multi_atlas_preview,
+    build_single_atlas,
+)
+from texture_engine.tiling import materialize
+
+
+def make_configs(images, target_size=64):
+    return [
+        AtlasConfig([SlotConfig(images[0], 1), SlotConfig(images[1], 2)], target_size),
+        AtlasConfig([SlotConfig(images[0], 1), SlotConfig(None, 1, blank_alpha=True), SlotConfig(images[2], 1)], target_size),
+        AtlasConfig([SlotConfig(None), SlotConfig(None)], target_size),
+    ]
+
+
+def test_build_all_matches_build_atlas():
+    images = [random_image(48, 48, seed) for seed in range(3)]
+    configs = make_configs(images)
+    atlases = AtlasBuilder().build_all(configs)
+    assert atlases[2] is None
+    for config, atlas in zip(configs, atlases[:2]):
+        assert materialize(atlas).tobytes() == materialize(build_atlas(config)).tobytes()
+
+
+def test_build_all_reuses_clean_atlases():
+    images = [random_image(48, 48, seed) for seed in range(3)]
+    configs = make_configs(images)
+    builder = AtlasBuilder()
+    first = builder.build_all(configs)
+    second = builder.build_all(make_configs(images))
+    assert all(a is b for a, b in zip(first, second))
+
+
+def test_changed_group_reuses_cached_tiles():
+    images = [random_image(48, 48, seed) for seed in range(4)]
+    cache = TileCache()
+    builder = AtlasBuilder(tile_cache=cache)
+    first = builder.build_all(make_configs(images))
+    misses = cache.misses
+
+    # Only the second atlas changes; its unchanged slot tile comes from the cache
+    configs = make_configs(images)
+    configs[1].slots[2] = SlotConfig(images[3], 1)
+    second = builder.build_all(configs)
+    assert second[0] is first[0]
+    assert second[1] is not first[1]
+    assert cache.misses == misses + 1
+    assert cache.hits >= 1
+
+
+def test_slots_sharing_an_image_share_one_tile():
+    image = random_image(32, 32)
+    cache = TileCache()
+    config = AtlasConfig([SlotConfig(image, 2), SlotConfig(image, 2), SlotConfig(image, 1)], 64)
+    AtlasBuilder(tile_cache=cache).build_all([config])
+    assert cache.misses == 2
+    assert len(cache.entries) == 2
+
+
+def test_forget_image_drops_its_tiles():
+    images = [random_image(32, 32, seed) for seed in range(2)]
+    cache = TileCache()
+    config = AtlasConfig([SlotConfig(images[0], 1), SlotConfig(images[1], 1)], 32)
+    AtlasBuilder(tile_cache=cache).build_all([config])
+    cache.forget_image(images[0])
+    assert [entry[0] for entry in cache.entries.values()] == [images[1]]
+    assert cache.current_bytes == 32 * 32 * 4
+
+
+def test_build_reuses_tiles_and_matches_build_atlas():
+    images = [random_image(48, 48, seed) for seed in range(3)]
+    cache = TileCache()
+    builder = AtlasBuilder(tile_cache=cache)
+    config = make_configs(images)[1]
+    built = builder.build(1, config)
+    assert materialize(built).tobytes() == materialize(build_atlas(config)).tobytes()
+    assert builder.build(1, make_configs(images)[1]) is built
+
+    assert builder.build(0, make_configs(images)[0]) is not None
+    assert cache.hits == 1
+
+
+def test_build_resamples_outside_the_lock(monkeypatch):
+    builder = AtlasBuilder()
+    acquired = []
+    process_slot_image = atlas_module.process_slot_image
+
+    def try_lock():
+        acquired.append(builder.lock.acquire(timeout=1))
+        if acquired[-1]:
+            builder.lock.release()
+
+    def check_lock(slot, target_size):
+        # Another thread (the UI trimming or forgetting images) must get the lock meanwhile
+        thread = threading.Thread(target=try_lock)
+        thread.start()
+        thread.join()
+        return process_slot_image(slot, target_size)
+
+    monkeypatch.setattr(atlas_module, "process_slot_image", check_lock)
+    builder.build(0, make_configs([random_image(16, 16, seed) for seed in range(3)])[0])
+    assert acquired == [True, True]
+
+
+def test_atlas_sheet_view_matches_composed_preview():
+    tiles = [random_image(32, 32, seed) for seed in range(4)]
+    atlases = [build_single_atlas(tiles[:count], 32) for count in (1, 3, 4)]
+    sheet = AtlasSheetView(atlases, 32)
+    composed = build_multi_atlas_preview(atlases, 32)
+    assert sheet.size == composed.size == (96, 128)
+    assert sheet.materialize().tobytes() == composed.tobytes()
+    assert sheet.render_preview(sheet.size).tobytes() == composed.tobytes()
+    assert sheet.render_preview((48, 64)).size == (48, 64)
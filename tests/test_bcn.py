@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from texture_engine import bcn
+
+
+def gradient(width, height, opaque=False):
+    y, x = np.mgrid[0:height, 0:width]
+    pixels = np.stack([
+        x * 255 // (width - 1),
+        y * 255 // (height - 1),
+        (x + y) * 255 // (width + height - 2),
+        255 - x * 255 // (width - 1),
+    ], axis=-1).astype(np.uint8)
+    if opaque:
+        pixels[..., 3] = 255
+    return pixels
+
+
+def round_trip(pixels, codec, **kwargs):
+    height, width = pixels.shape[:2]
+    data = bcn.compress(pixels, codec, **kwargs)
+    blocks = ((width + 3) // 4) * ((height + 3) // 4)
+    assert len(data) == blocks * bcn.BLOCK_BYTES[codec]
+    return data, bcn.decompress(data, width, height, codec)
+
+
+# codec -> (channels compared, largest allowed mean absolute error)
+TOLERANCES = {
+    "BC1": (4, 4.0),
+    "BC2": (4, 6.0),
+    "BC3": (4, 4.0),
+    "BC4": (1, 1.0),
+    "BC4S": (1, 1.0),
+    "BC5": (2, 1.0),
+    "BC5S": (2, 1.0),
+    "BC6H": (3, 6.0),
+    "BC7": (4, 4.0),
+}
+
+
+@pytest.mark.parametrize("codec", sorted(TOLERANCES))
+@pytest.mark.parametrize("preset", ["fast", "balanced", "quality"])
+def test_round_trip_error(codec, preset):
+    channels, tolerance = TOLERANCES[codec]
+    pixels = gradient(48, 32, opaque=codec == "BC1")
+    _, decoded = round_trip(pixels, codec, workers=1, preset=preset)
+    assert decoded.shape == pixels.shape
+    error = np.abs(decoded[..., :channels].astype(int) - pixels[..., :channels])
+    assert error.mean() <= tolerance
+
+
+def test_bc7_quality_preset_is_not_worse():
+    pixels = gradient(48, 32)
+    errors = []
+    for preset in ("fast", "quality"):
+        _, decoded = round_trip(pixels, "BC7", workers=1, preset=preset)
+        errors.append(np.abs(decoded.astype(int) - pixels).mean())
+    assert errors[1] <= errors[0]
+
+
+def test_bc1_keeps_punch_through_alpha():
+    pixels = gradient(16, 16, opaque=True)
+    pixels[:8, :, 3] = 0
+    _, decoded = round_trip(pixels, "BC1", workers=1)
+    assert np.all(decoded[:8, :, 3] == 0)
+    assert np.all(decoded[8:, :, 3] == 255)
+
+
+@pytest.mark.parametrize("codec", ["BC1", "BC3", "BC4", "BC5", "BC6H", "BC7"])
+def test_partial_blocks(codec):
+    pixels = gradient(13, 7, opaque=True)
+    _, decoded = round_trip(pixels, codec, workers=1)
+    assert decoded.shape == pixels.shape
+
+
+@pytest.mark.parametrize("codec", ["BC1", "BC2", "BC3", "BC4", "BC5", "BC5S"])
+def test_decode_blocks_matches_pillow(codec):
+    pixels = gradient(48, 32)
+    data = bcn.compress(pixels, codec, workers=1)
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, bcn.BLOCK_BYTES[codec])
+    decoded = bcn.from_blocks(bcn.decode_blocks(raw, codec).reshape(8, 12, 16, 4), 48, 32)
+    assert np.array_equal(decoded, bcn.decompress(data, 48, 32, codec))
+
+
+def test_parallel_compress_matches_serial():
+    pixels = gradient(64, 64)
+    assert bcn.compress(pixels, "BC3", workers=2) == bcn.compress(pixels, "BC3", workers=1)
+
+
+def test_unknown_codec_and_preset():
+    with pytest.raises(ValueError):
+        bcn.compress(gradient(8, 8), "BC9")
+    with pytest.raises(ValueError):
+        bcn.compress(gradient(8, 8), "BC1", preset="slowest")
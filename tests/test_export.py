@@ -0,0 +1,57 @@
+import os
+
+import pytest
+from PIL import Image
+
+from conftest import random_image
+from texture_engine import export
+
+
+def test_export_tasks_names(tmp_path):
+    tasks = export.export_tasks([(1, (64, 128)), (3, (64, 256))], str(tmp_path), "{name}_{index}_{height}", [".dds", ".png"], "rock")
+    names = [(index, os.path.basename(path), ext) for index, path, ext in tasks]
+    assert names == [
+        (1, "rock_1_128.dds", ".dds"),
+        (1, "rock_1_128.png", ".png"),
+        (3, "rock_3_256.dds", ".dds"),
+        (3, "rock_3_256.png", ".png"),
+    ]
+
+
+@pytest.mark.parametrize("pattern", ["fixed", "{missing}", "", "sub/{index}"])
+def test_export_tasks_rejects_bad_patterns(pattern, tmp_path):
+    with pytest.raises(ValueError):
+        export.export_tasks([(1, (64, 64)), (2, (64, 64))], str(tmp_path), pattern, [".png"])
+
+
+def test_export_run_builds_and_saves(tmp_path):
+    images = {1: random_image(32, 64, 1), 2: random_image(32, 32, 2)}
+    tasks = export.export_tasks([(index, image.size) for index, image in images.items()], str(tmp_path), "atlas{index}", [".png", ".dds"])
+    run = export.ExportRun(tasks, lambda: images, workers=2).start()
+    status = run.wait()
+    assert status["finished"]
+    assert status["fraction"] == 1.0
+    assert not status["failed"] and not status["skipped"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["atlas1.dds", "atlas1.png", "atlas2.dds", "atlas2.png"]
+    with Image.open(tmp_path / "atlas2.png") as saved:
+        assert saved.tobytes() == images[2].tobytes()
+
+
+def test_cancel_while_building_skips_every_file(tmp_path):
+    tasks = export.export_tasks([(1, (16, 16))], str(tmp_path), "atlas{index}", [".png"])
+    run = export.ExportRun(tasks, lambda: run.cancel() or {1: random_image(16, 16)})
+    status = run.start().wait()
+    assert status["finished"]
+    assert status["skipped"] == [tasks[0][1]]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_build_errors_fail_every_file(tmp_path):
+    tasks = export.export_tasks([(1, (16, 16))], str(tmp_path), "atlas{index}", [".png", ".dds"])
+
+    def build():
+        raise RuntimeError("no atlases")
+
+    status = export.ExportRun(tasks, build).start().wait()
+    assert status["finished"]
+    assert [str(error) for _, error in status["failed"]] == ["no atlases", "no atlases"]
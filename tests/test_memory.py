@@ -0,0 +1,39 @@
+import numpy as np
+from PIL import Image
+
+from texture_engine import memory
+from texture_engine.atlas import AtlasView
+
+
+def test_buffer_bytes_counts_shared_buffers_once():
+    tile = Image.new("RGBA", (32, 32))
+    view = AtlasView([tile, tile], 32)
+    pixels = np.zeros((8, 8, 4), dtype=np.uint8)
+    assert memory.buffer_bytes(view, tile, pixels, None) == 32 * 32 * 4 + pixels.nbytes
+    assert memory.buffer_bytes(view, pixels, exclude=[tile]) == pixels.nbytes
+
+
+def test_enforce_counts_only_released_bytes():
+    cache = {"a": Image.new("RGBA", (64, 64)), "b": Image.new("RGBA", (64, 64))}
+    held = [cache["a"]]
+    other = [Image.new("RGBA", (64, 64))]
+    tile_bytes = 64 * 64 * 4
+
+    budget = memory.MemoryBudget(max_bytes=tile_bytes)
+    budget.register("tiles", lambda: memory.buffer_bytes(*cache.values()), lambda max_bytes: cache.clear(), priority=0)
+    budget.register("other", lambda: memory.buffer_bytes(*other), lambda max_bytes: other.clear(), priority=1)
+    budget.register("outputs", lambda: memory.buffer_bytes(*held, exclude=list(cache.values())))
+    assert budget.total() == tile_bytes * 3
+
+    # Clearing the cache only releases "b": "a" is still held by an output, so "other" is trimmed too
+    assert budget.enforce() == tile_bytes * 2
+    assert not other
+    assert budget.total() == tile_bytes
+
+
+def test_enforce_does_nothing_within_budget():
+    budget = memory.MemoryBudget(max_bytes=1024)
+    trimmed = []
+    budget.register("small", lambda: 512, trimmed.append)
+    assert budget.enforce() == 0
+    assert not trimmed
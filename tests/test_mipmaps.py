@@ -0,0 +1,49 @@
+import numpy as np
+
+from conftest import random_image
+from texture_engine import mipmaps
+
+
+def build_chain(image, srgb=False):
+    chain = mipmaps.chain_for(image, srgb)
+    if not chain.complete:
+        pixels = np.asarray(image)
+        chain.begin_base()
+        for top in range(0, image.height, 8):
+            chain.feed_base_rows(pixels[top:top + 8])
+        chain.finish_base()
+    return chain
+
+
+def test_strip_fed_chain_matches_whole_reduction():
+    image = random_image(32, 24)
+    chain = build_chain(image)
+    assert chain.count == mipmaps.mip_count(32, 24)
+    expected = mipmaps.reduce_2x2(np.asarray(image), False)
+    assert np.array_equal(chain.level(1), expected)
+    for level in range(1, chain.count):
+        assert chain.level(level).shape[:2] == mipmaps.level_dimensions(32, 24, level)[::-1]
+
+
+def test_chains_are_cached_per_output():
+    image = random_image(16, 16, 1)
+    assert build_chain(image) is mipmaps.chain_for(image)
+    assert mipmaps.chain_for(image, srgb=True) is not mipmaps.chain_for(image)
+
+
+def test_release_chains_counts_and_drops_levels():
+    mipmaps.release_chains()
+    images = [random_image(64, 64, seed) for seed in range(3)]
+    for image in images:
+        build_chain(image).level(3)
+    held = mipmaps.chain_bytes()
+    assert held > 0
+
+    # Oldest chains go first, down to the byte limit
+    mipmaps.release_chains(held - 1)
+    assert mipmaps.chain_bytes() < held
+    assert mipmaps.chain_for(images[2]).complete
+    assert not mipmaps.chain_for(images[0]).complete
+
+    mipmaps.release_chains()
+    assert mipmaps.chain_bytes() == 0
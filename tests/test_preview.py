@@ -0,0 +1,31 @@
+from PIL import Image
+
+from texture_engine.preview import PreviewPyramid
+from texture_engine.tiling import TiledView
+
+
+def test_trimmed_levels_are_rebuilt_for_larger_previews():
+    pyramid = PreviewPyramid(Image.new("RGBA", (2048, 1024), (10, 20, 30, 255)))
+    assert pyramid.render((1000, 1000)).size == (1000, 500)
+    pyramid.render((200, 200))
+    pyramid.trim()
+    assert max(max(level.size) for level in pyramid.levels) < 1000
+
+    preview = pyramid.render((1000, 1000))
+    assert preview.size == (1000, 500)
+    assert pyramid.level_for(preview.size).width >= 1000
+
+
+def test_lazy_views_count_their_rendered_levels():
+    view = TiledView(Image.new("RGBA", (512, 512)), 4)
+    pyramid = PreviewPyramid(view)
+    top = pyramid.levels[0]
+    assert top is not view
+    assert pyramid.nbytes() >= top.width * top.height * 4
+
+
+def test_output_image_is_not_counted():
+    image = Image.new("RGBA", (256, 256))
+    pyramid = PreviewPyramid(image)
+    assert pyramid.levels[0] is image
+    assert pyramid.nbytes() == sum(level.width * level.height * 4 for level in pyramid.levels[1:])
@@ -0,0 +1,99 @@
+import base64
+import io
+import json
+import zipfile
+
+from conftest import random_image
+from texture_engine import project
+from texture_engine.sources import EncodedImage, full_image
+
+
+def slot(image, scale="1", label=None):
+    return {"image": image, "scale": scale, "blank_alpha": False, "label": label}
+
+
+def test_v2_stores_each_distinct_image_once(tmp_path):
+    first = random_image(16, 16, 1)
+    copy = first.copy()
+    second = random_image(8, 8, 2)
+    slots = [slot(first), slot(first, "2"), slot(copy), slot(second), slot(None)]
+    path = tmp_path / "dedup.atlasproj"
+    project.save_project(path, "1024", slots)
+
+    with zipfile.ZipFile(path) as archive:
+        members = [name for name in archive.namelist() if name.startswith("images/")]
+        manifest = json.loads(archive.read(project.MANIFEST_NAME))
+    assert len(members) == 2
+    assert manifest["version"] == project.PROJECT_VERSION
+    digests = [entry["image"] for entry in manifest["slots"]]
+    assert digests[0] == digests[1] == digests[2] != digests[3]
+    assert digests[4] is None
+
+
+def test_v2_load_is_lazy_and_shares_images(tmp_path):
+    first = random_image(16, 16, 3)
+    second = random_image(8, 8, 4)
+    path = tmp_path / "lazy.atlasproj"
+    project.save_project(path, "512", [slot(first, label="a"), slot(second, "3"), slot(first)])
+
+    loaded = project.load_project(path)
+    assert loaded["target_size"] == "512"
+    images = [entry["image"] for entry in loaded["slots"]]
+    assert all(isinstance(image, EncodedImage) for image in images)
+    assert images[0] is images[2]
+    assert images[0].decoded_bytes() == 0
+    assert [entry["scale"] for entry in loaded["slots"]] == ["1", "3", "1"]
+    assert loaded["slots"][0]["label"] == "a"
+
+    assert full_image(images[0]).tobytes() == first.tobytes()
+    assert full_image(images[1]).tobytes() == second.tobytes()
+
+
+def test_save_over_the_loaded_archive(tmp_path):
+    image = random_image(16, 16, 5)
+    path = tmp_path / "resave.atlasproj"
+    project.save_project(path, "1024", [slot(image)])
+
+    # The lazy slot image still reads its pixels from the archive that is being replaced
+    loaded = project.load_project(path)
+    project.save_project(path, "2048", [slot(entry["image"]) for entry in loaded["slots"]])
+    reloaded = project.load_project(path)
+    assert reloaded["target_size"] == "2048"
+    assert full_image(reloaded["slots"][0]["image"]).tobytes() == image.tobytes()
+
+
+def test_v1_projects_still_load(tmp_path):
+    image = random_image(8, 8, 6)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    encoded = base64.b64encode(buffer.getvalue()).decode("utf-8")
+    path = tmp_path / "old.atlasproj"
+    path.write_text(json.dumps({
+        "version": 1,
+        "target_size": "256",
+        "slots": [{"scale": "2", "image_base64": encoded}, {"scale": "1", "image_base64": encoded}, {"scale": "1"}],
+    }), encoding="utf-8")
+
+    loaded = project.load_project(path)
+    assert loaded["version"] == 1
+    images = [entry["image"] for entry in loaded["slots"]]
+    assert images[0] is images[1]
+    assert images[2] is None
+    assert "image_base64" not in loaded["slots"][0]
+    assert full_image(images[0]).tobytes() == image.tobytes()
+
+
+def test_payloads_are_cached_until_cleared(tmp_path, monkeypatch):
+    image = random_image(8, 8, 7)
+    encoded = []
+    encode_slot_image = project.encode_slot_image
+    monkeypatch.setattr(project, "encode_slot_image", lambda img: encoded.append(img) or encode_slot_image(img))
+
+    path = tmp_path / "cached.atlasproj"
+    project.save_project(path, "1024", [slot(image)])
+    project.save_project(path, "1024", [slot(image)])
+    assert encoded == [image]
+
+    project.clear_payload_cache()
+    project.save_project(path, "1024", [slot(image)])
+    assert encoded == [image, image]
@@ -0,0 +1,75 @@
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from texture_engine.image_io import save_image_with_extension
+from texture_engine.saving import SaveCancelled, SaveProgress, SaveWorker, atomic_output
+
+
+def test_atomic_output_keeps_the_old_file_on_failure(tmp_path):
+    path = tmp_path / "out.bin"
+    path.write_bytes(b"old")
+    with pytest.raises(RuntimeError):
+        with atomic_output(str(path)) as temporary:
+            with open(temporary, "wb") as file:
+                file.write(b"partial")
+            raise RuntimeError("encoder failed")
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.bin"]
+
+
+def test_cancelled_save_leaves_no_file(tmp_path):
+    image = Image.fromarray(np.zeros((64, 64, 4), dtype=np.uint8), "RGBA")
+    progress = SaveProgress()
+    progress.cancel()
+    with pytest.raises(SaveCancelled):
+        save_image_with_extension(image, str(tmp_path / "out.dds"), ".dds", progress=progress)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_progress_reaches_completion(tmp_path):
+    image = Image.fromarray(np.zeros((64, 64, 4), dtype=np.uint8), "RGBA")
+    progress = SaveProgress()
+    path = tmp_path / "out.dds"
+    save_image_with_extension(image, str(path), ".dds", dds_option="BC3 (Linear, DXT5)", progress=progress)
+    assert progress.total > 0
+    assert progress.fraction == 1.0
+    # 16 x 16 BC3 blocks of 16 bytes after the 128-byte header
+    assert path.stat().st_size == 128 + 16 * 16 * 16
+
+
+def test_save_worker_runs_jobs_in_order_and_delivers_them():
+    worker = SaveWorker()
+    release = threading.Event()
+    order = []
+    delivered = []
+
+    def blocked(progress):
+        release.wait(5)
+        order.append("first")
+        return 1
+
+    def cancelled(progress):
+        order.append("second")
+
+    first = worker.submit("first", blocked, delivered.append)
+    second = worker.submit("second", cancelled, delivered.append)
+    second.cancel()
+    release.set()
+    assert worker.wait(5)
+    while worker.deliver():
+        pass
+    assert order == ["first"]
+    assert delivered == [first, second]
+    assert first.completed and first.result == 1
+    assert not second.completed and second.error is None
+    assert worker.active() == []
+
+
+def test_unknown_dds_format_raises(tmp_path):
+    image = Image.fromarray(np.zeros((8, 8, 4), dtype=np.uint8), "RGBA")
+    with pytest.raises(ValueError, match="DXT5"):
+        save_image_with_extension(image, str(tmp_path / "out.dds"), ".dds", dds_option="DXT5")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from conftest import random_image
+from texture_engine import streaming
+from texture_engine.atlas import build_single_atlas
+from texture_engine.dds_reader import DdsImage
+from texture_engine.tiling import TiledView
+
+
+def make_outputs():
+    tiles = [random_image(64, 64, seed) for seed in range(3)]
+    return [
+        random_image(96, 80),
+        TiledView(random_image(40, 24, 5), 3),
+        build_single_atlas(tiles, 64),
+        build_single_atlas(tiles[:2], 64),
+    ]
+
+
+# Strips of 4 rows force many strips; the default holds each test output in one
+SMALL_STRIP_BYTES = 4 * 120 * 4
+
+
+@pytest.mark.parametrize("output", make_outputs())
+def test_render_rows_match_materialized_image(output):
+    image = np.asarray(output if isinstance(output, Image.Image) else output.materialize())
+    height = output.size[1]
+    for top, bottom in [(0, height), (0, 1), (3, 70), (height - 5, height)]:
+        assert np.array_equal(streaming.render_rows(output, top, bottom), image[top:bottom])
+
+
+@pytest.mark.parametrize("output", make_outputs())
+def test_streamed_png_matches_pillow(output, tmp_path):
+    image = output if isinstance(output, Image.Image) else output.materialize()
+    path = tmp_path / "streamed.png"
+    streaming.write_png_streaming(output, path, strip_bytes=SMALL_STRIP_BYTES)
+    with Image.open(path) as saved:
+        assert saved.mode == "RGBA"
+        assert saved.tobytes() == image.tobytes()
+
+
+@pytest.mark.parametrize("pixel_format", [None, "DXT1", "DXT5", "BC5U"])
+@pytest.mark.parametrize("output", make_outputs())
+def test_streamed_dds_matches_single_strip(output, pixel_format, tmp_path):
+    streamed = tmp_path / "streamed.dds"
+    whole = tmp_path / "whole.dds"
+    streaming.write_dds_streaming(output, streamed, pixel_format, strip_bytes=SMALL_STRIP_BYTES, workers=1)
+    streaming.write_dds_streaming(output, whole, pixel_format, workers=1)
+    assert streamed.read_bytes() == whole.read_bytes()
+
+
+def test_uncompressed_dds_round_trips(tmp_path):
+    output = make_outputs()[2]
+    path = tmp_path / "atlas.dds"
+    streaming.write_dds_streaming(output, path, None, strip_bytes=SMALL_STRIP_BYTES)
+    decoded = DdsImage(path.read_bytes()).full_image()
+    assert decoded.convert("RGBA").tobytes() == output.materialize().tobytes()
+
+
+def test_mipmapped_dds_streams_identically(tmp_path):
+    streamed = tmp_path / "streamed.dds"
+    whole = tmp_path / "whole.dds"
+    streaming.write_dds_streaming(make_outputs()[1], streamed, "DXT5", strip_bytes=SMALL_STRIP_BYTES, workers=1, generate_mipmaps=True)
+    streaming.write_dds_streaming(make_outputs()[1], whole, "DXT5", workers=1, generate_mipmaps=True)
+    assert streamed.read_bytes() == whole.read_bytes()
+    assert DdsImage(whole.read_bytes()).level_count > 1
@@ -0,0 +1,25 @@
+import pytest
+from PIL import Image
+
+from conftest import random_image
+from texture_engine.tiling import tile_image, tile_resample
+
+
+@pytest.mark.parametrize("size, multiplier, target", [
+    ((64, 64), 1, (64, 64)),
+    ((64, 64), 2, (100, 100)),
+    ((37, 53), 3, (256, 256)),
+    ((300, 200), 4, (128, 96)),
+    ((7, 5), 8, (1000, 333)),
+])
+def test_tile_resample_matches_tiled_resize(size, multiplier, target):
+    img = random_image(*size)
+    expected = tile_image(img, multiplier).resize(target, Image.Resampling.NEAREST)
+    assert tile_resample(img, multiplier, target).tobytes() == expected.tobytes()
+
+
+def test_tile_resample_converts_to_rgba():
+    img = random_image(16, 16).convert("RGB")
+    result = tile_resample(img, 2, (24, 24))
+    assert result.mode == "RGBA"
+    assert result.tobytes() == tile_image(img.convert("RGBA"), 2).resize((24, 24), Image.Resampling.NEAREST).tobytes()
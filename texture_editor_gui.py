@@ -0,0 +1,1533 @@
+"""Tk front end of the texture editor.
+
+Widgets only collect settings and display results: every processing step
+runs in texture_engine on plain-data configs (SlotConfig, AtlasConfig,
+SpecularConfig). Imported by vrtFS25TextureEditor.py when the editor starts.
+"""
+import customtkinter as ctk
+from tkinterdnd2 import DND_FILES, TkinterDnD
+from tkinter import filedialog, messagebox
+from PIL import ImageTk
+import os
+import queue
+import threading
+
+from texture_engine import atlas as atlas_engine
+from texture_engine import disk_cache, export, image_io, memory, mipmaps, profiling, project, sources
+from texture_engine.preview import PreviewPyramid
+from texture_engine.render_worker import RenderCancelled, RenderWorker
+from texture_engine.saving import SaveWorker
+from texture_engine.specular import SPECULAR_CHANNELS, SpecularConfig, SpecularPacker
+from texture_engine.tiling import TiledView
+
+
+
+class CTkDnD(ctk.CTk, TkinterDnD.DnDWrapper):
+    def __init__(self, *args, **kwargs):
+        ctk.CTk.__init__(self, *args, **kwargs)
+        TkinterDnD.DnDWrapper.__init__(self, *args, **kwargs)
+
+# ===== App =====
+class TileResizerApp:
+
+    ATLAS_COUNT = atlas_engine.ATLAS_COUNT
+    SLOTS_PER_ATLAS = atlas_engine.SLOTS_PER_ATLAS
+    DDS_FORMAT_OPTIONS = image_io.DDS_FORMAT_OPTIONS
+    DDS_OPTION_TO_PIXEL_FORMAT = image_io.DDS_OPTION_TO_PIXEL_FORMAT
+    TILE_CACHE_BYTES = atlas_engine.DEFAULT_TILE_CACHE_BYTES
+    # Slot tiles and atlases are rebuilt concurrently: None = one worker per core; "thread" or "process"
+    ATLAS_WORKERS = None
+    ATLAS_PARALLEL = "thread"
+    DISK_CACHE_BYTES = disk_cache.DEFAULT_DISK_CACHE_BYTES
+    MEMORY_BUDGET_BYTES = memory.DEFAULT_MEMORY_BUDGET_BYTES
+    MEMORY_POLL_MS = 1000
+    PERF_POLL_MS = 500
+    RENDER_POLL_MS = 30
+    EXPORT_POLL_MS = 100
+    SAVE_POLL_MS = 100
+    # How long the status bar keeps showing the outcome of the last save
+    SAVE_STATUS_MS = 4000
+
+    def __init__(self, root):
+        self.root = root
+        self.image = None
+        self.tiled_result = None
+        self.preview_img = None
+        self.preview_item = None
+        self.preview_shown = None
+        self.preview_pyramid = None
+        self.atlas_result = None
+        self.atlas_results = []
+        self.specular_result = None
+        self.current_output_mode = None
+        self.input_path = None
+        self.input_ext = None
+        self.input_dds_format = None
+        self.project_path = None
+        # Set once the window was asked to close; it is destroyed when saves and exports are idle
+        self.closing = False
+
+        # Export All: settings are kept between exports; export_run is the ExportRun in progress
+        self.export_directory = ""
+        self.export_pattern = export.DEFAULT_NAME_PATTERN
+        self.export_window = None
+        self.export_run = None
+
+        self.specular_packer = SpecularPacker()
+        self.specular_labels = {}
+        self.specular_input_names = {}
+        
+        # Atlas data: list of dicts with 'image' and 'scale'
+        self.atlas_slots = [
+            {'image': None, 'scale': 1}
+            for _ in range(self.ATLAS_COUNT * self.SLOTS_PER_ATLAS)
+        ]
+        # Processed slot tiles and per-group atlases, rebuilt only when a slot changes
+        self.atlas_builder = atlas_engine.AtlasBuilder(
+            atlas_engine.TileCache(self.TILE_CACHE_BYTES),
+            workers=self.ATLAS_WORKERS,
+            parallel=self.ATLAS_PARALLEL
+        )
+        sources.set_disk_cache(disk_cache.DiskCache(max_bytes=self.DISK_CACHE_BYTES))
+        self.atlas_preview_sources = None
+
+        # Previews render off the Tk thread; results come back through root.after polling
+        self.render_worker = RenderWorker()
+        self.render_poll_job = None
+
+        # Slot images are read and decoded on loader threads and applied through root.after polling;
+        # a slot's generation changes whenever it is set, so a stale load never overwrites a newer image
+        self.slot_load_results = queue.Queue()
+        self.slot_loads_running = 0
+        self.slot_load_poll_job = None
+        self.slot_load_generations = [0] * (self.ATLAS_COUNT * self.SLOTS_PER_ATLAS)
+
+        # Saves run one at a time on their own thread, so slots stay editable while a file is written
+        self.save_worker = SaveWorker()
+        self.save_poll_job = None
+        self.save_status_hide_job = None
+        self.save_message = ""
+        
+        # UI references for each slot
+        self.slot_frames = []
+        self.slot_labels = []
+        self.slot_scale_entries = []
+        self.slot_blank_vars = []
+        self.atlas_group_buttons = []
+        self.atlas_group_bodies = []
+        self.atlas_group_expanded = []
+
+        # ===== Layout =====
+        self.left_frame = ctk.CTkFrame(root, width=290, fg_color="#2b2b2b")
+        self.right_frame = ctk.CTkFrame(root, fg_color="#2b2b2b")
+
+        self.left_frame.pack(side="left", fill="y", padx=10, pady=10)
+        self.right_frame.pack(side="right", fill="both", expand=True, padx=(0, 10), pady=10)
+
+        self.controls_tabs = ctk.CTkTabview(self.left_frame, width=270)
+        self.controls_tabs.pack(fill="both", expand=True, padx=8, pady=(8, 6))
+        self.controls_tabs.add("Single")
+        self.controls_tabs.add("Multi Atlas")
+        self.controls_tabs.add("Specular Gen")
+
+        self.single_controls_frame = self.controls_tabs.tab("Single")
+        self.atlas_controls_frame = ctk.CTkScrollableFrame(self.controls_tabs.tab("Multi Atlas"), fg_color="transparent")
+        self.atlas_controls_frame.pack(fill="both", expand=True, padx=4, pady=4)
+        self.specular_controls_frame = ctk.CTkScrollableFrame(self.controls_tabs.tab("Specular Gen"), fg_color="transparent")
+        self.specular_controls_frame.pack(fill="both", expand=True, padx=4, pady=4)
+
+        self.bottom_actions = ctk.CTkFrame(self.left_frame, fg_color="transparent")
+        self.bottom_actions.pack(fill="x", padx=8, pady=(0, 8))
+
+        # ===== Single Image Controls =====
+        self.single_title = ctk.CTkLabel(self.single_controls_frame, text="Single Image Tiling", font=("Arial", 14, "bold"))
+        self.single_title.pack(pady=(5, 10))
+        
+        self.load_btn = ctk.CTkButton(self.single_controls_frame, text="Load Image", command=self.load_image)
+        self.load_btn.pack(pady=5, fill="x")
+
+        self.multiplier_label = ctk.CTkLabel(self.single_controls_frame, text="Resize Multiplier")
+        self.multiplier_label.pack(pady=(10, 0))
+
+        self.multiplier_entry = ctk.CTkEntry(self.single_controls_frame)
+        self.multiplier_entry.insert(0, "2")
+        self.multiplier_entry.pack(fill="x", pady=5)
+        self.multiplier_entry.bind("<KeyRelease>", lambda e: self.schedule_preview_update())
+
+        self.register_drop_target(self.single_title, self.on_single_section_drop)
+        self.register_drop_target(self.load_btn, self.on_single_section_drop)
+        self.register_drop_target(self.multiplier_label, self.on_single_section_drop)
+        self.register_drop_target(self.multiplier_entry, self.on_single_section_drop)
+
+        # ===== ATLAS CREATION =====
+        self.atlas_title = ctk.CTkLabel(self.atlas_controls_frame, text="Atlas Creation", font=("Arial", 14, "bold"))
+        self.atlas_title.pack(pady=5)
+
+        self.tile_size_label = ctk.CTkLabel(self.atlas_controls_frame, text="Target Atlas Width")
+        self.tile_size_label.pack(pady=(5, 0))
+
+        self.tile_size_entry = ctk.CTkEntry(self.atlas_controls_frame)
+        self.tile_size_entry.insert(0, "1024")
+        self.tile_size_entry.pack(fill="x", pady=5)
+        self.tile_size_entry.bind("<KeyRelease>", lambda e: self.schedule_atlas_update())
+
+        self.atlas_group_actions = ctk.CTkFrame(self.atlas_controls_frame, fg_color="transparent")
+        self.atlas_group_actions.pack(fill="x", pady=(2, 6))
+
+        self.expand_all_btn = ctk.CTkButton(
+            self.atlas_group_actions,
+            text="Expand All",
+            command=self.expand_all_atlas_groups,
+            height=28
+        )
+        self.expand_all_btn.pack(side="left", fill="x", expand=True, padx=(0, 4))
+
+        self.collapse_all_btn = ctk.CTkButton(
+            self.atlas_group_actions,
+            text="Collapse All",
+            command=self.collapse_all_atlas_groups,
+            height=28
+        )
+        self.collapse_all_btn.pack(side="left", fill="x", expand=True, padx=(4, 0))
+
+        self.export_all_btn = ctk.CTkButton(
+            self.atlas_controls_frame,
+            text="Export All Atlases",
+            command=self.open_export_dialog,
+            height=28
+        )
+        self.export_all_btn.pack(fill="x", pady=(0, 4))
+
+        # Create 4 atlas groups x 4 image slots
+        for atlas_index in range(self.ATLAS_COUNT):
+            atlas_toggle_btn = ctk.CTkButton(
+                self.atlas_controls_frame,
+                text="",
+                font=("Arial", 12, "bold"),
+                anchor="w",
+                command=lambda idx=atlas_index: self.toggle_atlas_group(idx)
+            )
+            atlas_toggle_btn.pack(pady=(10, 3), fill="x")
+            self.register_drop_target(atlas_toggle_btn, lambda e, idx=atlas_index: self.on_atlas_group_drop(e, idx))
+
+            atlas_group_body = ctk.CTkFrame(self.atlas_controls_frame, fg_color="transparent")
+            atlas_group_body.pack(fill="x", pady=(0, 4))
+            self.register_drop_target(atlas_group_body, lambda e, idx=atlas_index: self.on_atlas_group_drop(e, idx))
+
+            self.atlas_group_buttons.append(atlas_toggle_btn)
+            self.atlas_group_bodies.append(atlas_group_body)
+            self.atlas_group_expanded.append(True)
+
+            for slot_index in range(self.SLOTS_PER_ATLAS):
+                absolute_slot = atlas_index * self.SLOTS_PER_ATLAS + slot_index
+                self.create_atlas_slot(atlas_group_body, absolute_slot)
+
+            save_atlas_btn = ctk.CTkButton(
+                atlas_group_body,
+                text=f"Save Atlas {atlas_index + 1}",
+                command=lambda idx=atlas_index: self.save_single_atlas(idx),
+                height=28
+            )
+            save_atlas_btn.pack(fill="x", padx=5, pady=(2, 8))
+
+        for atlas_index in range(self.ATLAS_COUNT):
+            if atlas_index > 0:
+                self.atlas_group_expanded[atlas_index] = False
+                self.atlas_group_bodies[atlas_index].pack_forget()
+            self.update_atlas_group_button_text(atlas_index)
+
+        # ===== SPECULAR GENERATION =====
+        self.specular_title = ctk.CTkLabel(self.specular_controls_frame, text="Specular Generation", font=("Arial", 14, "bold"))
+        self.specular_title.pack(pady=5)
+
+        self.create_specular_input_row("roughness", "Roughness (RED)", "#FF6A6A")
+        self.create_specular_input_row("ambient_occlusion", "Ambient Occlusion (GREEN)", "#7CFC00")
+        self.create_specular_input_row("metalness", "Metalness (BLUE)", "#87CEFA")
+
+        self.invert_roughness_var = ctk.BooleanVar(value=False)
+        self.invert_roughness_check = ctk.CTkCheckBox(
+            self.specular_controls_frame,
+            text="Invert Roughness",
+            variable=self.invert_roughness_var,
+            command=self.auto_generate_specular
+        )
+        self.invert_roughness_check.pack(pady=(8, 4), anchor="w")
+
+        self.no_metalness_var = ctk.BooleanVar(value=False)
+        self.no_metalness_check = ctk.CTkCheckBox(
+            self.specular_controls_frame,
+            text="No Metalness (use black)",
+            variable=self.no_metalness_var,
+            command=self.on_no_metalness_toggle
+        )
+        self.no_metalness_check.pack(pady=(0, 4), anchor="w")
+
+        self.clear_specular_btn = ctk.CTkButton(
+            self.specular_controls_frame,
+            text="Clear Specular Inputs",
+            command=self.clear_specular_inputs
+        )
+        self.clear_specular_btn.pack(fill="x", pady=(4, 8))
+
+        self.clear_atlas_btn = ctk.CTkButton(self.bottom_actions, text="Clear All Slots", command=self.clear_atlas)
+        self.clear_atlas_btn.pack(pady=2, fill="x")
+
+        self.dds_format_label = ctk.CTkLabel(self.bottom_actions, text="DDS Save Format")
+        self.dds_format_label.pack(pady=(10, 0), anchor="w")
+
+        self.dds_format_var = ctk.StringVar(value="Auto")
+        self.dds_format_menu = ctk.CTkOptionMenu(
+            self.bottom_actions,
+            values=self.DDS_FORMAT_OPTIONS,
+            variable=self.dds_format_var
+        )
+        self.dds_format_menu.pack(fill="x", pady=(4, 6))
+
+        self.compression_preset_label = ctk.CTkLabel(self.bottom_actions, text="Compression Preset")
+        self.compression_preset_label.pack(anchor="w")
+
+        self.compression_preset_var = ctk.StringVar(value=image_io.DEFAULT_COMPRESSION_PRESET)
+        self.compression_preset_menu = ctk.CTkOptionMenu(
+            self.bottom_actions,
+            values=image_io.COMPRESSION_PRESETS,
+            variable=self.compression_preset_var
+        )
+        self.compression_preset_menu.pack(fill="x", pady=(4, 6))
+
+        self.generate_mipmaps_var = ctk.BooleanVar(value=False)
+        self.generate_mipmaps_check = ctk.CTkCheckBox(
+            self.bottom_actions,
+            text="Generate Mipmaps",
+            variable=self.generate_mipmaps_var
+        )
+        self.generate_mipmaps_check.pack(anchor="w", pady=(0, 4))
+
+        self.alpha_coverage_var = ctk.BooleanVar(value=False)
+        self.alpha_coverage_check = ctk.CTkCheckBox(
+            self.bottom_actions,
+            text="Preserve Alpha Coverage",
+            variable=self.alpha_coverage_var
+        )
+        self.alpha_coverage_check.pack(anchor="w", pady=(0, 8))
+
+        self.save_btn = ctk.CTkButton(self.bottom_actions, text="Save Image", command=self.save_image)
+        self.save_btn.pack(pady=(14, 5), fill="x")
+        self.save_btn_hidden_for_atlas = False
+
+        # ===== Preview Canvas =====
+        self.canvas = ctk.CTkCanvas(
+            self.right_frame,
+            bg="#2b2b2b",
+            highlightthickness=0
+        )
+
+        self.canvas.pack(fill="both", expand=True)
+
+        self.preview_project_actions = ctk.CTkFrame(self.right_frame, fg_color="#2b2b2b")
+
+        self.save_project_icon_btn = ctk.CTkButton(
+            self.preview_project_actions,
+            text="💾",
+            width=44,
+            height=36,
+            font=("Arial", 18),
+            command=self.save_atlas_project
+        )
+        self.save_project_icon_btn.pack(side="left", padx=(0, 4))
+
+        self.load_project_icon_btn = ctk.CTkButton(
+            self.preview_project_actions,
+            text="📂",
+            width=44,
+            height=36,
+            font=("Arial", 18),
+            command=self.load_atlas_project
+        )
+        self.load_project_icon_btn.pack(side="left")
+
+        self.memory_label = ctk.CTkLabel(self.right_frame, text="", text_color="#888888", font=("Arial", 11))
+        self.memory_label.place(relx=0.01, rely=0.99, anchor="sw")
+
+        # Status bar of the background saves; shown while saves run and briefly after
+        self.save_status_frame = ctk.CTkFrame(self.right_frame, fg_color="#1f1f1f", corner_radius=6)
+        self.save_status_label = ctk.CTkLabel(self.save_status_frame, text="", font=("Arial", 11))
+        self.save_status_label.pack(side="left", padx=(8, 6), pady=4)
+        self.save_progress = ctk.CTkProgressBar(self.save_status_frame, width=140)
+        self.save_progress.set(0)
+        self.save_progress.pack(side="left", padx=(0, 6))
+        self.save_cancel_btn = ctk.CTkButton(self.save_status_frame, text="Cancel", width=60, height=24, command=self.cancel_saves)
+        self.save_cancel_btn.pack(side="left", padx=(0, 6), pady=4)
+
+        # Per-stage timings of the pipeline; F3 or the stopwatch button toggles it
+        self.perf_toggle_btn = ctk.CTkButton(
+            self.right_frame,
+            text="⏱",
+            width=32,
+            height=28,
+            font=("Arial", 14),
+            command=self.toggle_perf_overlay
+        )
+        self.perf_toggle_btn.place(relx=0.99, rely=0.01, anchor="ne")
+        self.perf_overlay = None
+        self.perf_label = None
+        self.perf_overlay_job = None
+        self.profiler_was_enabled = profiling.profiler.enabled
+        self.root.bind("<F3>", lambda e: self.toggle_perf_overlay())
+
+        self.canvas.bind("<Configure>", self.refresh_preview)
+        self.refresh_project_buttons_visibility()
+
+        # Held buffers are accounted against one RAM budget; recomputable ones are trimmed when over it
+        self.memory_budget = memory.MemoryBudget(self.MEMORY_BUDGET_BYTES)
+        self.register_memory_pools()
+        self.update_memory_readout()
+
+    # ---------- Memory ----------
+    def register_memory_pools(self):
+        budget = self.memory_budget
+        builder = self.atlas_builder
+        packer = self.specular_packer
+
+        def trim_preview(max_bytes):
+            if self.preview_pyramid is not None:
+                self.preview_pyramid.trim()
+
+        def trim_sources(max_bytes):
+            # Encoded bytes stay (they are the loaded files); only decoded pixels can be dropped
+            sources.release_decoded(max(0, max_bytes - sources.encoded_bytes()))
+
+        # Cached mip chains only speed up saving the same output again, so they go first
+        budget.register("mipmaps", mipmaps.chain_bytes, mipmaps.release_chains, priority=0)
+        budget.register("tiles", lambda: builder.tile_cache.current_bytes, builder.trim_tiles, priority=0)
+        budget.register(
+            "preview",
+            lambda: self.preview_pyramid.nbytes() if self.preview_pyramid is not None else 0,
+            trim_preview,
+            priority=1
+        )
+        budget.register("specular", lambda: packer.input_bytes() + packer.resampled_bytes(), packer.trim, priority=2)
+        budget.register("sources", sources.held_bytes, trim_sources, priority=3)
+        budget.register("outputs", self.output_bytes)
+
+    def output_bytes(self):
+        """Results kept for display and saving (not trimmed: the user may save them).
+
+        Atlas tiles still in the tile cache are reported by the "tiles" pool only.
+        """
+        tiled = self.tiled_result
+        return memory.buffer_bytes(
+            tiled,
+            getattr(tiled, "source_pixels", None),
+            self.specular_result,
+            *self.atlas_results,
+            *self.atlas_builder.atlas_images(),
+            exclude=self.atlas_builder.cached_tiles()
+        )
+
+    def update_memory_readout(self):
+        self.memory_budget.enforce()
+        self.memory_label.configure(text=self.memory_budget.describe())
+        self.root.after(self.MEMORY_POLL_MS, self.update_memory_readout)
+
+    # ---------- Profiling ----------
+    def toggle_perf_overlay(self):
+        if self.perf_overlay is not None:
+            if self.perf_overlay_job is not None:
+                self.root.after_cancel(self.perf_overlay_job)
+                self.perf_overlay_job = None
+            self.perf_overlay.destroy()
+            self.perf_overlay = None
+            profiling.profiler.enabled = self.profiler_was_enabled
+            return
+
+        self.profiler_was_enabled = profiling.profiler.enabled
+        profiling.profiler.enabled = True
+
+        overlay = ctk.CTkFrame(self.right_frame, fg_color="#1f1f1f", corner_radius=6)
+        overlay.place(relx=0.99, rely=0.01, y=34, anchor="ne")
+        self.perf_label = ctk.CTkLabel(overlay, text="", font=("Courier New", 11), justify="left", anchor="w")
+        self.perf_label.pack(fill="x", padx=8, pady=(6, 4))
+
+        actions = ctk.CTkFrame(overlay, fg_color="transparent")
+        actions.pack(fill="x", padx=8, pady=(0, 6))
+        ctk.CTkButton(actions, text="Export Trace", width=100, height=26, command=self.export_perf_trace).pack(side="left", padx=(0, 4))
+        ctk.CTkButton(actions, text="Reset", width=60, height=26, command=profiling.profiler.clear).pack(side="left")
+
+        self.perf_overlay = overlay
+        self.update_perf_overlay()
+
+    def update_perf_overlay(self):
+        lines = profiling.profiler.describe()
+        self.perf_label.configure(text="\n".join(lines) if lines else "No stages recorded yet")
+        self.perf_overlay_job = self.root.after(self.PERF_POLL_MS, self.update_perf_overlay)
+
+    def export_perf_trace(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Chrome Trace", "*.json")],
+            title="Export Trace"
+        )
+        if not path:
+            return
+
+        try:
+            count = profiling.profiler.export_chrome_trace(path)
+            messagebox.showinfo("Exported", f"{count} events written. Open the file in chrome://tracing or Perfetto.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export trace: {str(e)}")
+
+    def refresh_project_buttons_visibility(self):
+        is_atlas_tab = self.controls_tabs.get() == "Multi Atlas"
+
+        if is_atlas_tab:
+            self.preview_project_actions.place(relx=0.99, rely=0.99, anchor="se")
+        else:
+            self.preview_project_actions.place_forget()
+
+        if is_atlas_tab and not self.save_btn_hidden_for_atlas:
+            self.save_btn.pack_forget()
+            self.save_btn_hidden_for_atlas = True
+        elif not is_atlas_tab and self.save_btn_hidden_for_atlas:
+            self.save_btn.pack(pady=(14, 5), fill="x")
+            self.save_btn_hidden_for_atlas = False
+
+        self.root.after(150, self.refresh_project_buttons_visibility)
+    
+    def create_atlas_slot(self, parent, slot_index):
+        """Create UI for one atlas slot"""
+        frame = ctk.CTkFrame(parent, fg_color="#1e1e1e")
+        frame.pack(pady=8, fill="x", padx=5)
+
+        atlas_num = (slot_index // self.SLOTS_PER_ATLAS) + 1
+        slot_num = (slot_index % self.SLOTS_PER_ATLAS) + 1
+        
+        # Title
+        title = ctk.CTkLabel(frame, text=f"A{atlas_num} / Slot {slot_num}", font=("Arial", 12, "bold"))
+        title.pack(pady=(5, 2))
+        
+        # Status label
+        status_label = ctk.CTkLabel(frame, text="No image loaded", text_color="#888888")
+        status_label.pack(pady=2)
+        
+        # Load/Replace button
+        load_btn = ctk.CTkButton(
+            frame, 
+            text="Load Image", 
+            command=lambda idx=slot_index: self.load_atlas_slot(idx),
+            height=28
+        )
+        load_btn.pack(pady=3, fill="x", padx=10)
+        
+        # Scale label and entry
+        scale_label = ctk.CTkLabel(frame, text="Scale Multiplier")
+        scale_label.pack(pady=(5, 0))
+        
+        scale_entry = ctk.CTkEntry(frame, height=28)
+        scale_entry.insert(0, "1")
+        scale_entry.pack(fill="x", pady=3, padx=10)
+        scale_entry.bind("<KeyRelease>", lambda e: self.schedule_atlas_update())
+
+        blank_var = ctk.BooleanVar(value=False)
+        blank_check = ctk.CTkCheckBox(
+            frame,
+            text="Blank Image (Alpha)",
+            variable=blank_var,
+            command=self.schedule_atlas_update
+        )
+        blank_check.pack(pady=(2, 3), anchor="w", padx=10)
+        
+        # Clear button
+        clear_btn = ctk.CTkButton(
+            frame, 
+            text="Clear", 
+            command=lambda idx=slot_index: self.clear_atlas_slot(idx),
+            height=25,
+            fg_color="#8B0000",
+            hover_color="#A52A2A"
+        )
+        clear_btn.pack(pady=(3, 8), fill="x", padx=10)
+
+        self.register_drop_target(frame, lambda e, idx=slot_index: self.on_slot_section_drop(e, idx))
+        self.register_drop_target(title, lambda e, idx=slot_index: self.on_slot_section_drop(e, idx))
+        self.register_drop_target(status_label, lambda e, idx=slot_index: self.on_slot_section_drop(e, idx))
+        self.register_drop_target(load_btn, lambda e, idx=slot_index: self.on_slot_section_drop(e, idx))
+        self.register_drop_target(scale_label, lambda e, idx=slot_index: self.on_slot_section_drop(e, idx))
+        self.register_drop_target(scale_entry, lambda e, idx=slot_index: self.on_slot_section_drop(e, idx))
+        self.register_drop_target(blank_check, lambda e, idx=slot_index: self.on_slot_section_drop(e, idx))
+        
+        # Store references
+        self.slot_frames.append(frame)
+        self.slot_labels.append(status_label)
+        self.slot_scale_entries.append(scale_entry)
+        self.slot_blank_vars.append(blank_var)
+
+    def create_specular_input_row(self, key, title_text, color):
+        row = ctk.CTkFrame(self.specular_controls_frame, fg_color="#1e1e1e")
+        row.pack(pady=6, fill="x", padx=5)
+
+        title = ctk.CTkLabel(row, text=title_text, text_color=color, font=("Arial", 12, "bold"))
+        title.pack(pady=(6, 2), anchor="w", padx=10)
+
+        status = ctk.CTkLabel(row, text="No image loaded", text_color="#888888")
+        status.pack(pady=2, anchor="w", padx=10)
+
+        load_button = ctk.CTkButton(
+            row,
+            text="Load Image",
+            command=lambda channel=key: self.load_specular_input(channel),
+            height=28
+        )
+        load_button.pack(pady=(4, 8), fill="x", padx=10)
+
+        self.specular_labels[key] = status
+
+        self.register_drop_target(row, lambda e, channel=key: self.on_specular_section_drop(e, channel))
+        self.register_drop_target(title, lambda e, channel=key: self.on_specular_section_drop(e, channel))
+        self.register_drop_target(status, lambda e, channel=key: self.on_specular_section_drop(e, channel))
+        self.register_drop_target(load_button, lambda e, channel=key: self.on_specular_section_drop(e, channel))
+
+    # ---------- Single Image Load ----------
+    def load_image(self):
+        path = filedialog.askopenfilename(
+            filetypes=[("Images", "*.png *.jpg *.jpeg *.dds")]
+        )
+
+        if path:
+            self.open_image(path)
+
+    def open_image(self, path):
+        try:
+            self.input_path = path
+            self.input_ext = os.path.splitext(path)[1].lower()
+            self.image, self.input_dds_format = image_io.open_source(path)
+            self.tiled_result = None
+            self.auto_generate_preview()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+
+    # ---------- Specular Generation ----------
+    def load_specular_input(self, channel_key):
+        path = filedialog.askopenfilename(
+            filetypes=[("Images", "*.png *.jpg *.jpeg *.dds")]
+        )
+
+        if path:
+            self.open_specular_input(channel_key, path)
+
+    def open_specular_input(self, channel_key, path):
+        try:
+            source, input_dds_format = image_io.open_source(path)
+            self.specular_packer.set_input(channel_key, source)
+
+            if self.input_ext is None:
+                self.input_ext = os.path.splitext(path)[1].lower()
+                self.input_dds_format = input_dds_format
+
+            filename = os.path.basename(path)
+            if len(filename) > 20:
+                filename = filename[:17] + "..."
+
+            self.specular_input_names[channel_key] = filename
+            self.specular_labels[channel_key].configure(text=filename, text_color="#00FF00")
+            self.auto_generate_specular()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load image: {str(e)}")
+
+    def clear_specular_inputs(self):
+        self.specular_packer.clear()
+        for channel_key in SPECULAR_CHANNELS:
+            self.specular_input_names[channel_key] = None
+            if channel_key in self.specular_labels:
+                self.specular_labels[channel_key].configure(text="No image loaded", text_color="#888888")
+
+        self.no_metalness_var.set(False)
+
+        self.render_worker.cancel("specular")
+        self.specular_result = None
+        if self.current_output_mode == "specular":
+            self.current_output_mode = None
+            self.tiled_result = None
+            self.clear_preview()
+
+    def on_no_metalness_toggle(self):
+        if self.no_metalness_var.get():
+            self.specular_labels["metalness"].configure(text="Using black image", text_color="#AAAAAA")
+        else:
+            if not self.specular_packer.has_input("metalness"):
+                self.specular_labels["metalness"].configure(text="No image loaded", text_color="#888888")
+            else:
+                display_name = self.specular_input_names.get("metalness") or "Image loaded"
+                self.specular_labels["metalness"].configure(text=display_name, text_color="#00FF00")
+
+        self.auto_generate_specular()
+
+    def get_specular_config(self):
+        """Snapshot the specular options as plain data for the engine"""
+        return SpecularConfig(
+            invert_roughness=bool(self.invert_roughness_var.get()),
+            use_black_metalness=bool(self.no_metalness_var.get())
+        )
+
+    def auto_generate_specular(self):
+        packer = self.specular_packer
+        config = self.get_specular_config()
+
+        if not packer.ready(config):
+            self.render_worker.cancel("specular")
+            if self.current_output_mode == "specular":
+                self.specular_result = None
+                self.tiled_result = None
+                self.clear_preview()
+            return
+
+        def render(cancelled):
+            return packer.pack(config)
+
+        self.submit_render("specular", render, self.show_specular_result)
+
+    def show_specular_result(self, combined_rgba):
+        self.specular_result = combined_rgba
+        self.tiled_result = combined_rgba
+        self.atlas_results = []
+        self.current_output_mode = "specular"
+        self.refresh_preview()
+
+    def register_drop_target(self, widget, handler):
+        try:
+            widget.drop_target_register(DND_FILES)
+            widget.dnd_bind("<<Drop>>", handler)
+        except Exception:
+            pass
+
+    def get_first_supported_path(self, event_data):
+        paths = self.parse_dnd_paths(event_data)
+        if not paths:
+            return None
+
+        path = paths[0]
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in {".png", ".jpg", ".jpeg", ".dds"}:
+            messagebox.showwarning("Unsupported File", "Please drop a PNG, JPG, JPEG, or DDS file.")
+            return None
+
+        return path
+
+    def on_single_section_drop(self, event):
+        path = self.get_first_supported_path(event.data)
+        if path:
+            self.open_image(path)
+
+    def on_slot_section_drop(self, event, slot_index):
+        path = self.get_first_supported_path(event.data)
+        if path:
+            self.open_atlas_slot_image(slot_index, path)
+
+    def on_atlas_group_drop(self, event, atlas_index):
+        paths = self.parse_dnd_paths(event.data)
+        if not paths:
+            return
+
+        # Dropped folders contribute their images in name order
+        expanded_paths = []
+        for path in paths:
+            if os.path.isdir(path):
+                expanded_paths.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+            else:
+                expanded_paths.append(path)
+
+        supported_paths = []
+        for path in expanded_paths:
+            ext = os.path.splitext(path)[1].lower()
+            if ext in {".png", ".jpg", ".jpeg", ".dds"}:
+                supported_paths.append(path)
+
+        if not supported_paths:
+            messagebox.showwarning("Unsupported File", "Please drop PNG, JPG, JPEG, or DDS files.")
+            return
+
+        base_slot = atlas_index * self.SLOTS_PER_ATLAS
+        self.open_atlas_slot_images(
+            [(base_slot + i, path) for i, path in enumerate(supported_paths[:self.SLOTS_PER_ATLAS])]
+        )
+
+        skipped = [os.path.basename(path) for path in supported_paths[self.SLOTS_PER_ATLAS:]]
+        if skipped:
+            messagebox.showwarning(
+                "Too Many Files",
+                f"Atlas {atlas_index + 1} has {self.SLOTS_PER_ATLAS} slots; skipped {len(skipped)} file(s):\n"
+                + "\n".join(skipped[:8])
+            )
+
+    def on_specular_section_drop(self, event, channel_key):
+        path = self.get_first_supported_path(event.data)
+        if path:
+            self.open_specular_input(channel_key, path)
+
+    def update_atlas_group_button_text(self, atlas_index):
+        icon = "▼" if self.atlas_group_expanded[atlas_index] else "▶"
+        text = f"{icon} Atlas {atlas_index + 1}"
+        self.atlas_group_buttons[atlas_index].configure(text=text)
+
+    def toggle_atlas_group(self, atlas_index):
+        self.set_atlas_group_expanded(atlas_index, not self.atlas_group_expanded[atlas_index])
+
+    def set_atlas_group_expanded(self, atlas_index, expanded):
+        is_expanded = self.atlas_group_expanded[atlas_index]
+        if expanded == is_expanded:
+            return
+
+        if expanded:
+            if atlas_index + 1 < len(self.atlas_group_buttons):
+                self.atlas_group_bodies[atlas_index].pack(
+                    fill="x",
+                    pady=(0, 4),
+                    before=self.atlas_group_buttons[atlas_index + 1]
+                )
+            else:
+                self.atlas_group_bodies[atlas_index].pack(fill="x", pady=(0, 4))
+        else:
+            self.atlas_group_bodies[atlas_index].pack_forget()
+
+        self.atlas_group_expanded[atlas_index] = expanded
+        self.update_atlas_group_button_text(atlas_index)
+
+    def expand_all_atlas_groups(self):
+        for atlas_index in range(self.ATLAS_COUNT):
+            self.set_atlas_group_expanded(atlas_index, True)
+
+    def collapse_all_atlas_groups(self):
+        for atlas_index in range(self.ATLAS_COUNT):
+            self.set_atlas_group_expanded(atlas_index, False)
+
+    def parse_dnd_paths(self, raw_data):
+        try:
+            return list(self.root.tk.splitlist(raw_data))
+        except Exception:
+            return [raw_data]
+
+    # ---------- Atlas Slot Management ----------
+    def load_atlas_slot(self, slot_index):
+        """Load or replace an image in a specific atlas slot"""
+        path = filedialog.askopenfilename(
+            filetypes=[("Images", "*.png *.jpg *.jpeg *.dds")]
+        )
+        
+        if path:
+            self.open_atlas_slot_image(slot_index, path)
+
+    def open_atlas_slot_image(self, slot_index, path):
+        self.open_atlas_slot_images([(slot_index, path)])
+
+    def open_atlas_slot_images(self, assignments):
+        """Load (slot_index, path) pairs concurrently off the Tk thread, then rebuild the atlas once"""
+        requests = []
+        for slot_index, path in assignments:
+            self.slot_load_generations[slot_index] += 1
+            requests.append((slot_index, path, self.slot_load_generations[slot_index]))
+
+        paths = [path for _, path in assignments]
+
+        def load():
+            self.slot_load_results.put((requests, image_io.open_encoded_many(paths)))
+
+        self.slot_loads_running += 1
+        threading.Thread(target=load, name="slot-loader", daemon=True).start()
+        if self.slot_load_poll_job is None:
+            self.slot_load_poll_job = self.root.after(self.RENDER_POLL_MS, self.poll_slot_loads)
+
+    def poll_slot_loads(self):
+        self.slot_load_poll_job = None
+        while True:
+            try:
+                requests, results = self.slot_load_results.get_nowait()
+            except queue.Empty:
+                break
+            self.slot_loads_running -= 1
+            self.apply_slot_images(requests, results)
+        if self.slot_loads_running:
+            self.slot_load_poll_job = self.root.after(self.RENDER_POLL_MS, self.poll_slot_loads)
+
+    def apply_slot_images(self, requests, results):
+        """Put loaded images into their slots (unless the slot was set meanwhile) and rebuild the atlas"""
+        errors = []
+        applied = 0
+        for (slot_index, path, generation), (img, error) in zip(requests, results):
+            if generation != self.slot_load_generations[slot_index]:
+                continue
+            if error is not None:
+                errors.append(f"{os.path.basename(path)}: {error}")
+                continue
+
+            self.set_atlas_slot_image(slot_index, img)
+            self.slot_blank_vars[slot_index].set(False)
+
+            filename = path.split('/')[-1].split('\\')[-1]
+            if len(filename) > 20:
+                filename = filename[:17] + "..."
+            self.slot_labels[slot_index].configure(
+                text=filename,
+                text_color="#00FF00"
+            )
+            applied += 1
+
+        if applied:
+            self.auto_generate_atlas()
+        if errors:
+            messagebox.showerror("Error", "Failed to load image: " + "\n".join(errors))
+    
+    def set_atlas_slot_image(self, slot_index, image):
+        self.slot_load_generations[slot_index] += 1
+        previous = self.atlas_slots[slot_index]['image']
+        self.atlas_slots[slot_index]['image'] = image
+        # Sources are shared between slots opened from the same file; keep tiles another slot still uses
+        if previous is not None and previous is not image and not any(
+            slot['image'] is previous for slot in self.atlas_slots
+        ):
+            self.atlas_builder.forget_image(previous)
+
+    def clear_atlas_slot(self, slot_index):
+        """Clear a specific atlas slot"""
+        self.set_atlas_slot_image(slot_index, None)
+        self.slot_blank_vars[slot_index].set(False)
+        self.slot_labels[slot_index].configure(
+            text="No image loaded",
+            text_color="#888888"
+        )
+        self.schedule_atlas_update()
+    
+    def clear_atlas(self):
+        """Clear all atlas slots"""
+        for i in range(self.ATLAS_COUNT * self.SLOTS_PER_ATLAS):
+            self.slot_load_generations[i] += 1
+            self.atlas_slots[i]['image'] = None
+            self.slot_blank_vars[i].set(False)
+            self.slot_labels[i].configure(
+                text="No image loaded",
+                text_color="#888888"
+            )
+        self.render_worker.cancel("atlas")
+        self.atlas_builder.clear()
+        self.atlas_preview_sources = None
+        self.atlas_result = None
+        self.atlas_results = []
+        if self.current_output_mode == "atlas":
+            self.current_output_mode = None
+        self.tiled_result = None
+        self.clear_preview()
+
+    def save_atlas_project(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".atlasproj",
+            filetypes=[("Atlas Project", "*.atlasproj")],
+            title="Save Atlas Project"
+        )
+        if not path:
+            return
+
+        slots = [
+            {
+                "scale": self.slot_scale_entries[i].get().strip() or "1",
+                "blank_alpha": bool(self.slot_blank_vars[i].get()),
+                "label": self.slot_labels[i].cget("text"),
+                "image": self.atlas_slots[i]['image'],
+            }
+            for i in range(self.ATLAS_COUNT * self.SLOTS_PER_ATLAS)
+        ]
+
+        target_size = self.tile_size_entry.get().strip() or "1024"
+
+        def saved(result):
+            self.project_path = path
+
+        self.submit_save(
+            os.path.basename(path),
+            lambda progress: project.save_project(path, target_size, slots, progress=progress),
+            saved
+        )
+
+    def load_atlas_project(self):
+        path = filedialog.askopenfilename(
+            filetypes=[("Atlas Project", "*.atlasproj"), ("JSON", "*.json")],
+            title="Load Atlas Project"
+        )
+        if not path:
+            return
+
+        try:
+            project_data = project.load_project(path)
+            self.project_path = path
+            slots = project_data.get("slots", [])
+            target_size = str(project_data.get("target_size", "1024"))
+
+            self.tile_size_entry.delete(0, "end")
+            self.tile_size_entry.insert(0, target_size)
+
+            total_slots = self.ATLAS_COUNT * self.SLOTS_PER_ATLAS
+            for i in range(total_slots):
+                slot_data = slots[i] if i < len(slots) else {}
+
+                scale_value = str(slot_data.get("scale", "1"))
+                self.slot_scale_entries[i].delete(0, "end")
+                self.slot_scale_entries[i].insert(0, scale_value)
+
+                blank_alpha = bool(slot_data.get("blank_alpha", False))
+                self.slot_blank_vars[i].set(blank_alpha)
+
+                image = slot_data.get("image")
+                if image is not None:
+                    self.set_atlas_slot_image(i, image)
+                    label_text = slot_data.get("label", "Loaded")
+                    self.slot_labels[i].configure(text=label_text, text_color="#00FF00")
+                else:
+                    self.set_atlas_slot_image(i, None)
+                    if blank_alpha:
+                        self.slot_labels[i].configure(text="Blank alpha", text_color="#AAAAAA")
+                    else:
+                        self.slot_labels[i].configure(text="No image loaded", text_color="#888888")
+
+            self.controls_tabs.set("Multi Atlas")
+            self.auto_generate_atlas()
+            messagebox.showinfo("Loaded", "Atlas project loaded successfully.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load project: {str(e)}")
+
+    # ---------- Preview ----------
+    def schedule_preview_update(self):
+        """Debounce preview updates"""
+        if hasattr(self, '_preview_job'):
+            self.root.after_cancel(self._preview_job)
+        self._preview_job = self.root.after(300, self.auto_generate_preview)
+    
+    def schedule_atlas_update(self):
+        """Debounce atlas updates"""
+        if hasattr(self, '_atlas_job'):
+            self.root.after_cancel(self._atlas_job)
+        self._atlas_job = self.root.after(300, self.auto_generate_atlas)
+    
+    def auto_generate_preview(self):
+        """Auto-generate preview for single image (silent)"""
+        if self.image is None:
+            return
+
+        try:
+            multiplier = int(self.multiplier_entry.get())
+            if multiplier <= 0:
+                return
+        except:
+            return
+
+        image = self.image
+        self.submit_render("single", lambda cancelled: TiledView(image, multiplier), self.show_single_result)
+
+    def show_single_result(self, tiled_result):
+        self.tiled_result = tiled_result
+        self.atlas_results = []
+        self.current_output_mode = "single"
+        self.refresh_preview()
+
+    # ---------- Background Rendering ----------
+    def submit_render(self, kind, render, on_done, display_of=None):
+        """Run render(cancelled) on the render worker and on_done(result) back on the Tk thread"""
+        canvas_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+
+        def render_with_preview(cancelled):
+            result = render(cancelled)
+            display_image = display_of(result) if display_of else result
+            if cancelled():
+                raise RenderCancelled()
+            pyramid = None
+            if display_image is not None:
+                with profiling.stage("preview pyramid"):
+                    pyramid = PreviewPyramid(display_image)
+                    pyramid.render(canvas_size)
+            return result, pyramid
+
+        def deliver(payload):
+            result, pyramid = payload
+            if pyramid is not None:
+                self.preview_pyramid = pyramid
+            on_done(result)
+
+        self.render_worker.submit(kind, render_with_preview, deliver)
+        if self.render_poll_job is None:
+            self.render_poll_job = self.root.after(self.RENDER_POLL_MS, self.poll_render_worker)
+
+    def poll_render_worker(self):
+        self.render_poll_job = None
+        if self.render_worker.deliver():
+            self.render_poll_job = self.root.after(self.RENDER_POLL_MS, self.poll_render_worker)
+
+    def refresh_preview(self, event=None):
+        if self.tiled_result is None:
+            return
+
+        canvas_w = self.canvas.winfo_width()
+        canvas_h = self.canvas.winfo_height()
+
+        pyramid = self.preview_pyramid
+        with profiling.stage("preview pyramid"):
+            if pyramid is None or pyramid.source is not self.tiled_result:
+                pyramid = PreviewPyramid(self.tiled_result)
+                self.preview_pyramid = pyramid
+            preview = pyramid.render((canvas_w, canvas_h))
+
+        # Reuse the PhotoImage and canvas item while the preview size is unchanged
+        if (
+            self.preview_item is not None
+            and self.preview_img is not None
+            and (self.preview_img.width(), self.preview_img.height()) == preview.size
+        ):
+            if preview is not self.preview_shown:
+                with profiling.stage("PhotoImage", mode="paste"):
+                    self.preview_img.paste(preview)
+            self.canvas.coords(self.preview_item, canvas_w // 2, canvas_h // 2)
+        else:
+            with profiling.stage("PhotoImage", mode="create"):
+                self.preview_img = ImageTk.PhotoImage(preview)
+            self.canvas.delete("all")
+            self.preview_item = self.canvas.create_image(
+                canvas_w // 2,
+                canvas_h // 2,
+                image=self.preview_img,
+                anchor="center"
+            )
+        self.preview_shown = preview
+
+    def clear_preview(self):
+        self.canvas.delete("all")
+        self.preview_item = None
+        self.preview_shown = None
+        self.preview_pyramid = None
+
+    # ---------- Save ----------
+    def save_single_atlas(self, atlas_index):
+        try:
+            target_size = int(self.tile_size_entry.get())
+            if target_size <= 0:
+                messagebox.showwarning("Invalid Size", "Target Atlas Width must be a positive number.")
+                return
+        except Exception:
+            messagebox.showwarning("Invalid Size", "Target Atlas Width must be a positive number.")
+            return
+
+        config = self.get_atlas_config(atlas_index, target_size)
+        if config.is_empty():
+            messagebox.showwarning("Nothing to Save", f"Atlas {atlas_index + 1} has no content.")
+            return
+
+        default_ext = ".dds" if self.input_ext == ".dds" else ".png"
+        path = filedialog.asksaveasfilename(
+            defaultextension=default_ext,
+            filetypes=[("DDS", "*.dds"), ("PNG", "*.png"), ("JPEG", "*.jpg")],
+            title=f"Save Atlas {atlas_index + 1}"
+        )
+
+        if not path:
+            return
+
+        ext = os.path.splitext(path)[1].lower() or default_ext
+        if ext not in {".dds", ".png", ".jpg", ".jpeg"}:
+            ext = default_ext
+            path = path + ext
+
+        # The atlas is built (or taken from the cache) on the save worker as well
+        builder = self.atlas_builder
+        save_output = self.save_output_job(path, ext)
+        self.submit_save(
+            os.path.basename(path),
+            lambda progress: save_output(builder.build(atlas_index, config), progress)
+        )
+
+    def save_image(self):
+        if self.tiled_result is None:
+            messagebox.showwarning("Nothing to Save", "Generate preview first.")
+            return
+
+        if self.current_output_mode == "atlas" and self.atlas_results:
+            self.open_export_dialog()
+            return
+
+        default_ext = ".dds" if self.input_ext == ".dds" else ".png"
+        path = filedialog.asksaveasfilename(
+            defaultextension=default_ext,
+            filetypes=[("DDS", "*.dds"), ("PNG", "*.png"), ("JPEG", "*.jpg")]
+        )
+
+        if path:
+            ext = os.path.splitext(path)[1].lower()
+            image = self.tiled_result
+            save_output = self.save_output_job(path, ext)
+            self.submit_save(os.path.basename(path), lambda progress: save_output(image, progress))
+
+    def save_options(self):
+        """Keyword arguments for image_io.save_image_with_extension from the DDS save options"""
+        return {
+            "dds_option": self.dds_format_var.get(),
+            "generate_mipmaps": bool(self.generate_mipmaps_var.get()),
+            "input_dds_format": self.input_dds_format,
+            "preset": self.compression_preset_var.get(),
+            "preserve_alpha_coverage": bool(self.alpha_coverage_var.get()),
+        }
+
+    def save_output_job(self, path, ext):
+        """save_output(image, progress) for the save worker, with the save options as they are now"""
+        options = self.save_options()
+
+        def save_output(image, progress):
+            return image_io.save_image_with_extension(image, path, ext, progress=progress, **options)
+        return save_output
+
+    # ---------- Background Saves ----------
+    def submit_save(self, label, run, on_saved=None):
+        """Run run(progress) on the save worker; on_saved(result) is called on the Tk thread once it succeeded"""
+        def deliver(job):
+            if job.error is not None:
+                self.save_message = f"Failed to save {label}"
+                messagebox.showerror("Error", f"Failed to save {label}: {str(job.error)}")
+            elif job.completed:
+                self.save_message = f"Saved {label}"
+                if on_saved is not None:
+                    on_saved(job.result)
+            else:
+                self.save_message = f"Cancelled {label}"
+
+        self.save_worker.submit(label, run, deliver)
+        if self.save_status_hide_job is not None:
+            self.root.after_cancel(self.save_status_hide_job)
+            self.save_status_hide_job = None
+        self.save_status_frame.place(relx=0.5, rely=0.99, anchor="s")
+        self.save_cancel_btn.configure(state="normal")
+        if self.save_poll_job is None:
+            self.poll_save_worker()
+
+    def poll_save_worker(self):
+        self.save_poll_job = None
+        if self.save_worker.deliver():
+            jobs = self.save_worker.active()
+            job = jobs[0]
+            fraction = job.progress.fraction
+            if job.cancelled:
+                text = f"Cancelling {job.label}..."
+            else:
+                text = f"Saving {job.label}... {fraction:.0%}"
+            if len(jobs) > 1:
+                text += f" (+{len(jobs) - 1} queued)"
+            if self.closing:
+                text += " - closing when done"
+            self.save_status_label.configure(text=text)
+            self.save_progress.set(fraction)
+            self.save_poll_job = self.root.after(self.SAVE_POLL_MS, self.poll_save_worker)
+            return
+
+        self.save_status_label.configure(text=self.save_message)
+        self.save_progress.set(1)
+        self.save_cancel_btn.configure(state="disabled")
+        self.save_status_hide_job = self.root.after(self.SAVE_STATUS_MS, self.hide_save_status)
+
+    def hide_save_status(self):
+        self.save_status_hide_job = None
+        self.save_status_frame.place_forget()
+
+    def cancel_saves(self):
+        """Cancel the running and queued saves; partly written files are removed"""
+        self.save_worker.cancel_all()
+        self.save_status_label.configure(text="Cancelling...")
+
+    def on_close(self):
+        """Cancel running saves and exports, or wait for them, then close the window"""
+        if self.closing:
+            return
+        busy = []
+        if self.save_worker.active():
+            busy.append("a save")
+        if self.export_run is not None:
+            busy.append("an export")
+        if busy:
+            answer = messagebox.askyesnocancel(
+                "Quit",
+                f"{' and '.join(busy).capitalize()} still running.\n\n"
+                "Yes: cancel and quit.\nNo: quit once finished.\nCancel: keep working."
+            )
+            if answer is None:
+                return
+            if answer:
+                self.save_worker.cancel_all()
+                if self.export_run is not None:
+                    self.export_run.cancel()
+        self.closing = True
+        self.close_when_idle()
+
+    def close_when_idle(self):
+        """Destroy the window once saves and exports are done; polled through after() so Tk keeps running"""
+        if self.save_worker.active() or self.export_run is not None:
+            self.root.after(self.SAVE_POLL_MS, self.close_when_idle)
+            return
+        self.render_worker.cancel()
+        self.render_worker.stop()
+        self.root.destroy()
+
+    # ---------- Export All ----------
+    def open_export_dialog(self):
+        """Ask once for a folder, a file name pattern and the formats, then export every atlas"""
+        if self.export_window is not None:
+            self.export_window.focus()
+            return
+
+        window = ctk.CTkToplevel(self.root)
+        window.title("Export All Atlases")
+        window.geometry("440x300")
+        window.resizable(False, False)
+        window.transient(self.root)
+        window.protocol("WM_DELETE_WINDOW", self.close_export_dialog)
+        self.export_window = window
+
+        ctk.CTkLabel(window, text="Folder").pack(anchor="w", padx=12, pady=(12, 0))
+        folder_row = ctk.CTkFrame(window, fg_color="transparent")
+        folder_row.pack(fill="x", padx=12)
+        self.export_dir_entry = ctk.CTkEntry(folder_row)
+        self.export_dir_entry.insert(0, self.export_directory)
+        self.export_dir_entry.pack(side="left", fill="x", expand=True, padx=(0, 6))
+        ctk.CTkButton(folder_row, text="Browse", width=70, command=self.browse_export_directory).pack(side="left")
+
+        ctk.CTkLabel(window, text="File name pattern ({index}, {name}, {width}, {height})").pack(anchor="w", padx=12, pady=(8, 0))
+        self.export_pattern_entry = ctk.CTkEntry(window)
+        self.export_pattern_entry.insert(0, self.export_pattern)
+        self.export_pattern_entry.pack(fill="x", padx=12)
+
+        format_row = ctk.CTkFrame(window, fg_color="transparent")
+        format_row.pack(fill="x", padx=12, pady=(8, 0))
+        self.export_dds_var = ctk.BooleanVar(value=self.input_ext == ".dds" or self.input_ext is None)
+        self.export_png_var = ctk.BooleanVar(value=not self.export_dds_var.get())
+        ctk.CTkCheckBox(format_row, text="DDS", variable=self.export_dds_var).pack(side="left", padx=(0, 12))
+        ctk.CTkCheckBox(format_row, text="PNG", variable=self.export_png_var).pack(side="left")
+
+        self.export_progress = ctk.CTkProgressBar(window)
+        self.export_progress.set(0)
+        self.export_progress.pack(fill="x", padx=12, pady=(14, 4))
+        self.export_status = ctk.CTkLabel(window, text="", text_color="#AAAAAA")
+        self.export_status.pack(anchor="w", padx=12)
+
+        actions = ctk.CTkFrame(window, fg_color="transparent")
+        actions.pack(fill="x", padx=12, pady=(8, 12))
+        self.export_start_btn = ctk.CTkButton(actions, text="Export", command=self.start_export)
+        self.export_start_btn.pack(side="left", fill="x", expand=True, padx=(0, 4))
+        self.export_cancel_btn = ctk.CTkButton(actions, text="Close", command=self.close_export_dialog)
+        self.export_cancel_btn.pack(side="left", fill="x", expand=True, padx=(4, 0))
+
+    def browse_export_directory(self):
+        directory = filedialog.askdirectory(title="Export Folder", initialdir=self.export_dir_entry.get() or None)
+        if directory:
+            self.export_dir_entry.delete(0, "end")
+            self.export_dir_entry.insert(0, directory)
+
+    def start_export(self):
+        if self.export_run is not None:
+            return
+
+        directory = self.export_dir_entry.get().strip()
+        pattern = self.export_pattern_entry.get().strip() or export.DEFAULT_NAME_PATTERN
+        extensions = [ext for ext, var in ((".dds", self.export_dds_var), (".png", self.export_png_var)) if var.get()]
+        if not directory or not os.path.isdir(directory):
+            messagebox.showwarning("Export", "Choose an existing folder.", parent=self.export_window)
+            return
+        if not extensions:
+            messagebox.showwarning("Export", "Choose at least one format.", parent=self.export_window)
+            return
+
+        try:
+            target_size = int(self.tile_size_entry.get())
+            if target_size <= 0:
+                raise ValueError()
+        except Exception:
+            messagebox.showwarning("Invalid Size", "Target Atlas Width must be a positive number.", parent=self.export_window)
+            return
+
+        # File names only need the atlas sizes; the atlases are built on the export's thread
+        configs = [self.get_atlas_config(atlas_index, target_size) for atlas_index in range(self.ATLAS_COUNT)]
+        outputs = [
+            (atlas_index + 1, config.atlas_size())
+            for atlas_index, config in enumerate(configs)
+            if not config.is_empty()
+        ]
+        if not outputs:
+            messagebox.showwarning("Nothing to Save", "No atlas has content.", parent=self.export_window)
+            return
+
+        name = os.path.splitext(os.path.basename(self.project_path))[0] if self.project_path else "atlas"
+        try:
+            tasks = export.export_tasks(outputs, directory, pattern, extensions, name)
+        except ValueError as e:
+            messagebox.showwarning("Export", str(e), parent=self.export_window)
+            return
+
+        existing = [os.path.basename(path) for _, path, _ in tasks if os.path.exists(path)]
+        if existing and not messagebox.askyesno(
+            "Overwrite",
+            f"{len(existing)} file(s) already exist:\n" + "\n".join(existing[:8]) + "\n\nOverwrite?",
+            parent=self.export_window
+        ):
+            return
+
+        self.export_directory = directory
+        self.export_pattern = pattern
+        builder = self.atlas_builder
+
+        def build_atlases():
+            atlases = builder.build_all(configs)
+            return {atlas_index + 1: atlas for atlas_index, atlas in enumerate(atlases)}
+
+        self.export_run = export.ExportRun(tasks, build_atlases, self.save_options()).start()
+        self.export_start_btn.configure(state="disabled")
+        self.export_cancel_btn.configure(text="Cancel")
+        self.export_progress.set(0)
+        self.export_status.configure(text="Building atlases...")
+        self.root.after(self.EXPORT_POLL_MS, self.poll_export)
+
+    def poll_export(self):
+        run = self.export_run
+        status = run.poll()
+        if not status["finished"]:
+            if self.export_window is not None:
+                self.export_progress.set(status["fraction"])
+                if run.cancelled:
+                    text = "Cancelling..."
+                elif status["building"]:
+                    text = "Building atlases..."
+                else:
+                    text = f"Exporting: {status['fraction']:.0%} ({status['done']} of {status['total']} file(s) done)"
+                self.export_status.configure(text=text)
+            self.root.after(self.EXPORT_POLL_MS, self.poll_export)
+            return
+
+        self.export_run = None
+        saved = [os.path.basename(path) for path in status["saved"]]
+        summary = f"Exported {len(saved)} file(s) to {self.export_directory}"
+        if status["skipped"]:
+            summary += f" ({len(status['skipped'])} cancelled)"
+        if self.export_window is not None:
+            self.export_progress.set(1)
+            self.export_status.configure(text=summary)
+            self.export_start_btn.configure(state="normal")
+            self.export_cancel_btn.configure(text="Close")
+
+        if status["failed"]:
+            details = "\n".join(f"{os.path.basename(path)}: {error}" for path, error in status["failed"])
+            messagebox.showerror("Export", f"{summary}.\n\nFailed:\n{details}")
+        elif not run.cancelled:
+            messagebox.showinfo("Exported", f"{summary}:\n" + "\n".join(saved))
+            self.close_export_dialog()
+
+    def close_export_dialog(self):
+        """Cancel a running export (partly written files are removed), or close the dialog"""
+        if self.export_run is not None:
+            self.export_run.cancel()
+            self.export_status.configure(text="Cancelling...")
+            return
+        if self.export_window is not None:
+            self.export_window.destroy()
+            self.export_window = None
+
+    # ---------- Atlas Creation ----------
+    def get_atlas_config(self, atlas_index, target_size):
+        """Snapshot the slots of one atlas group as plain data for the engine"""
+        start = atlas_index * self.SLOTS_PER_ATLAS
+        end = start + self.SLOTS_PER_ATLAS
+
+        slots = [
+            atlas_engine.SlotConfig(
+                self.atlas_slots[i]['image'],
+                atlas_engine.parse_scale(self.slot_scale_entries[i].get()),
+                bool(self.slot_blank_vars[i].get())
+            )
+            for i in range(start, end)
+        ]
+        return atlas_engine.AtlasConfig(slots, target_size)
+
+    def build_atlas_for_index(self, atlas_index, target_size):
+        return self.atlas_builder.build(atlas_index, self.get_atlas_config(atlas_index, target_size))
+
+    def auto_generate_atlas(self):
+        """Auto-generate atlas (silent)"""
+        # Check if at least one image is loaded
+        has_content = any(
+            slot['image'] is not None or self.slot_blank_vars[i].get()
+            for i, slot in enumerate(self.atlas_slots)
+        )
+        if not has_content:
+            # Clear canvas if no images
+            self.render_worker.cancel("atlas")
+            self.tiled_result = None
+            self.atlas_results = []
+            self.clear_preview()
+            return
+        
+        try:
+            target_size = int(self.tile_size_entry.get())
+            if target_size <= 0:
+                return
+        except:
+            return
+
+        configs = [self.get_atlas_config(atlas_index, target_size) for atlas_index in range(self.ATLAS_COUNT)]
+        builder = self.atlas_builder
+        previous_sources = self.atlas_preview_sources or []
+        previous_preview = self.tiled_result if self.current_output_mode == "atlas" else None
+
+        def render(cancelled):
+            # Decode every new slot image at once (e.g. after a project load or a multi-file drop)
+            builder.prefetch(configs)
+            if cancelled():
+                raise RenderCancelled()
+            # Missing slot tiles of every changed atlas, then the atlases, are built across the cores
+            atlas_results = [atlas for atlas in builder.build_all(configs) if atlas is not None]
+
+            if not atlas_results:
+                return atlas_results, None
+
+            # Unchanged atlases come back as the same objects; skip recomposing the preview then
+            preview_is_current = (
+                previous_preview is not None
+                and len(previous_sources) == len(atlas_results)
+                and all(old is new for old, new in zip(previous_sources, atlas_results))
+            )
+            if preview_is_current:
+                return atlas_results, previous_preview
+            # A lazy sheet: the pyramid renders it from the atlas tiles, so no full-size composite is held
+            return atlas_results, atlas_engine.AtlasSheetView(atlas_results, target_size)
+
+        self.submit_render("atlas", render, self.show_atlas_results, display_of=lambda result: result[1])
+
+    def show_atlas_results(self, result):
+        atlas_results, preview = result
+        if not atlas_results:
+            self.atlas_results = []
+            self.tiled_result = None
+            self.clear_preview()
+            return
+
+        self.atlas_results = atlas_results
+        self.atlas_result = atlas_results[0]
+        self.atlas_preview_sources = atlas_results
+        self.tiled_result = preview
+        self.current_output_mode = "atlas"
+        self.refresh_preview()
+
+
+# ===== Main =====
+def run():
+    root = TkinterDnD.Tk()
+
+    ctk.set_appearance_mode("dark")
+    ctk.set_default_color_theme("blue")
+
+    root.configure(bg="#242424")
+
+    root.title("VRT FS25 Texture Editor")
+    root.geometry("1000x650")
+    root.minsize(800, 550)
+
+    app = TileResizerApp(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
+
+    root.update()
+    root.mainloop()
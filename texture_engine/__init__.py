@@ -0,0 +1 @@
+"""GUI-free image processing shared by the texture editor and its batch CLI."""
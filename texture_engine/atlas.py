@@ -0,0 +1,467 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from . import profiling
+from .sources import image_for_size, prefetch
+from .tiling import tile_resample
+
+
+ATLAS_COUNT = 4
+SLOTS_PER_ATLAS = 4
+DEFAULT_TILE_CACHE_BYTES = 512 * 1024 * 1024
+# Slot tiles and atlases are built on threads (Pillow and NumPy release the GIL
+# while converting, gathering and pasting), or on a process pool
+PARALLEL_MODES = ("thread", "process")
+
+_process_executor = None
+_process_executor_workers = 0
+
+
+@dataclass
+class SlotConfig:
+    """One atlas slot: its image (or lazy source, None when empty), repeat count and blank-alpha state"""
+    image: object = None
+    scale: int = 1
+    blank_alpha: bool = False
+
+    def key(self, target_size):
+        """Cache key describing the processed tile of this slot (None for empty slots)"""
+        if self.image is not None:
+            return (id(self.image), self.scale, False, target_size)
+        if self.blank_alpha:
+            return (None, 1, True, target_size)
+        return None
+
+
+@dataclass
+class AtlasConfig:
+    """Slots of one atlas (top to bottom) and the atlas width"""
+    slots: list
+    target_size: int
+
+    def keys(self):
+        return tuple(slot.key(self.target_size) for slot in self.slots)
+
+    def is_empty(self):
+        """True when no slot has an image or blank alpha (build_atlas would return None)"""
+        return all(key is None for key in self.keys())
+
+    def atlas_size(self):
+        """(width, height) build_atlas will give, without building it; None when empty"""
+        tile_count = sum(key is not None for key in self.keys())
+        if not tile_count:
+            return None
+        return (self.target_size, self.target_size * atlas_slot_count(tile_count))
+
+
+def atlas_slot_count(tile_count):
+    """Slots an atlas of tile_count tiles has: three tiles get a fourth, filled slot"""
+    return 4 if tile_count == 3 else tile_count
+
+
+def parse_scale(value):
+    """Parse a slot scale multiplier, falling back to 1"""
+    try:
+        scale = int(value)
+        if scale <= 0:
+            scale = 1
+    except Exception:
+        scale = 1
+    return scale
+
+
+def repeat_size(scale, target_size):
+    """Pixels one repetition of a slot image covers in its tile"""
+    size = -(-target_size // scale)
+    return (size, size)
+
+
+def process_slot_image(slot, target_size):
+    """Return the square tile for one SlotConfig, or None for an empty slot.
+
+    Mipmapped DDS slots are sampled from the smallest level that still covers
+    one repetition of the tile.
+    """
+    if slot.image is not None:
+        source = image_for_size(slot.image, repeat_size(slot.scale, target_size))
+        return tile_resample(source, slot.scale, (target_size, target_size))
+    if slot.blank_alpha:
+        return Image.new("RGBA", (target_size, target_size), (0, 0, 0, 0))
+    return None
+
+
+def get_process_executor(workers):
+    """Shared process pool of workers processes (replaced only when a different size is asked for)"""
+    global _process_executor, _process_executor_workers
+    if _process_executor is None or _process_executor_workers != workers:
+        if _process_executor is not None:
+            _process_executor.shutdown(wait=False)
+        _process_executor = ProcessPoolExecutor(max_workers=workers)
+        _process_executor_workers = workers
+    return _process_executor
+
+
+def parallel_map(function, *iterables, workers=None, parallel="thread"):
+    """list(map(function, ...)) spread over workers threads or processes (None = one per item, up to the cores)"""
+    if parallel not in PARALLEL_MODES:
+        raise ValueError(f"Unknown parallel mode: {parallel}")
+    items = list(zip(*iterables))
+    workers = workers or os.cpu_count() or 1
+    if min(workers, len(items)) <= 1:
+        return [function(*item) for item in items]
+    if parallel == "process":
+        # Sources and tiles are pickled across; lazy sources travel encoded and decode in the worker.
+        # The pool keeps its size whatever the item count, so it is spawned once, not per build
+        return list(get_process_executor(workers).map(function, *zip(*items)))
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(function, *zip(*items)))
+
+
+def build_atlas(config, workers=None, parallel="thread"):
+    """Build the atlas of an AtlasConfig (None when every slot is empty); slot tiles are built concurrently"""
+    target_sizes = [config.target_size] * len(config.slots)
+    processed_images = parallel_map(process_slot_image, config.slots, target_sizes, workers=workers, parallel=parallel)
+    return build_single_atlas(processed_images, config.target_size)
+
+
+class TileCache:
+    """LRU cache of processed square slot tiles, bounded by a byte budget.
+
+    Entries keep a reference to their source image so id()-based keys stay
+    unique while the entry is alive.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_TILE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """Cached tile for a slot key (counted as a hit or a miss), or None"""
+        entry = self.entries.get(key)
+        profiling.cache("tile cache", entry is not None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def store(self, key, image, tile):
+        nbytes = tile.width * tile.height * 4
+        if key in self.entries or nbytes > self.max_bytes:
+            return
+        self.entries[key] = (image, tile, nbytes)
+        self.current_bytes += nbytes
+        self.evict()
+
+    def evict(self, max_bytes=None):
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        while self.current_bytes > max_bytes and self.entries:
+            _, (_, _, nbytes) = self.entries.popitem(last=False)
+            self.current_bytes -= nbytes
+
+    def forget_image(self, image):
+        """Drop every tile derived from image (e.g. after its slot was replaced)"""
+        for key in [key for key, entry in self.entries.items() if entry[0] is image and image is not None]:
+            self.current_bytes -= self.entries.pop(key)[2]
+
+    def clear(self):
+        self.entries.clear()
+        self.current_bytes = 0
+
+
+class AtlasBuilder:
+    """Rebuilds atlases incrementally: only groups whose slot keys changed are recomposed.
+
+    build_all() builds the missing slot tiles of every changed atlas, then
+    the changed atlases, concurrently on workers threads (or processes with
+    parallel="process"). Safe to share between the UI thread and the render
+    worker.
+    """
+
+    def __init__(self, tile_cache=None, workers=None, parallel="thread"):
+        if parallel not in PARALLEL_MODES:
+            raise ValueError(f"Unknown parallel mode: {parallel}")
+        self.tile_cache = tile_cache if tile_cache is not None else TileCache()
+        self.atlas_cache = {}
+        self.workers = workers
+        self.parallel = parallel
+        self.lock = threading.RLock()
+
+    def cached_atlas(self, atlas_index, keys):
+        cached = self.atlas_cache.get(atlas_index)
+        hit = cached is not None and cached[0] == keys
+        profiling.cache("atlas cache", hit)
+        return cached[2] if hit else False
+
+    def build(self, atlas_index, config):
+        """Return the atlas for an AtlasConfig, reusing clean results"""
+        keys = config.keys()
+        with self.lock:
+            cached = self.cached_atlas(atlas_index, keys)
+            if cached is not False:
+                return cached
+            tiles = {None: None}
+            for key in keys:
+                if key not in tiles:
+                    tiles[key] = self.tile_cache.lookup(key)
+
+        # Tiles are resampled outside the lock, as in build_all(), so the UI thread never waits on them
+        for slot, key in zip(config.slots, keys):
+            if tiles[key] is None and key is not None:
+                tiles[key] = process_slot_image(slot, config.target_size)
+                with self.lock:
+                    self.tile_cache.store(key, slot.image, tiles[key])
+        atlas = build_single_atlas([tiles[key] for key in keys], config.target_size)
+        with self.lock:
+            # Hold the slot images so the id()-based keys cannot be reused
+            self.atlas_cache[atlas_index] = (keys, [slot.image for slot in config.slots], atlas)
+        return atlas
+
+    def build_all(self, configs):
+        """Atlases of several AtlasConfigs (atlas index = position; None for empty ones), built concurrently"""
+        results = [None] * len(configs)
+        with self.lock:
+            dirty = []
+            for atlas_index, config in enumerate(configs):
+                keys = config.keys()
+                cached = self.cached_atlas(atlas_index, keys)
+                if cached is False:
+                    dirty.append((atlas_index, config, keys))
+                else:
+                    results[atlas_index] = cached
+
+            # Distinct tiles the changed atlases need (slots repeating an image and scale share one)
+            tiles = {None: None}
+            missing = {}
+            for _, config, keys in dirty:
+                for slot, key in zip(config.slots, keys):
+                    if key in tiles or key in missing:
+                        continue
+                    tile = self.tile_cache.lookup(key)
+                    if tile is None:
+                        missing[key] = (slot, config.target_size)
+                    else:
+                        tiles[key] = tile
+        if not dirty:
+            return results
+
+        # Tiles and atlases are built outside the lock, so trimming from the UI thread never waits on them
+        built = parallel_map(
+            process_slot_image,
+            [slot for slot, _ in missing.values()],
+            [target_size for _, target_size in missing.values()],
+            workers=self.workers,
+            parallel=self.parallel
+        )
+        with self.lock:
+            for key, tile in zip(missing, built):
+                self.tile_cache.store(key, missing[key][0].image, tile)
+                tiles[key] = tile
+        groups = [[tiles[key] for key in keys] for _, _, keys in dirty]
+
+        # Composition only pastes, which releases the GIL, so threads suffice here
+        atlases = parallel_map(
+            build_single_atlas,
+            groups,
+            [config.target_size for _, config, _ in dirty],
+            workers=self.workers
+        )
+        with self.lock:
+            for (atlas_index, config, keys), atlas in zip(dirty, atlases):
+                # Hold the slot images so the id()-based keys cannot be reused
+                self.atlas_cache[atlas_index] = (keys, [slot.image for slot in config.slots], atlas)
+                results[atlas_index] = atlas
+        return results
+
+    def prefetch(self, configs, workers=None):
+        """Decode, concurrently, the slot images of several AtlasConfigs whose tiles are not cached yet.
+
+        Skipped with parallel="process": the workers decode their own copies.
+        """
+        if self.parallel == "process":
+            return
+        with self.lock:
+            requests = {}
+            for config in configs:
+                for slot in config.slots:
+                    key = slot.key(config.target_size)
+                    if slot.image is not None and key not in self.tile_cache.entries:
+                        requests[key] = (slot.image, repeat_size(slot.scale, config.target_size))
+        prefetch(requests.values(), workers)
+
+    def forget_image(self, image):
+        with self.lock:
+            self.tile_cache.forget_image(image)
+
+    def trim_tiles(self, max_bytes):
+        """Evict least recently used tiles down to max_bytes (e.g. under memory pressure)"""
+        with self.lock:
+            self.tile_cache.evict(max_bytes)
+
+    def cached_tiles(self):
+        """Tiles held by the tile cache"""
+        with self.lock:
+            return [entry[1] for entry in self.tile_cache.entries.values()]
+
+    def atlas_images(self):
+        with self.lock:
+            return [entry[2] for entry in self.atlas_cache.values()]
+
+    def clear(self):
+        with self.lock:
+            self.tile_cache.clear()
+            self.atlas_cache.clear()
+
+
+class AtlasView:
+    """Lazy atlas: square slot tiles stacked top to bottom, plus an optional solid fill tile.
+
+    The tiles are referenced, not copied into a canvas, so saving streams the
+    atlas rows straight from the tiles (render_rows) and the full atlas image
+    is only built by materialize() for outputs that need one.
+    """
+
+    mode = "RGBA"
+
+    def __init__(self, tiles, target_size, fill_color=None):
+        self.tiles = tiles
+        self.target_size = target_size
+        self.fill_color = fill_color
+        slot_count = len(tiles) + (fill_color is not None)
+        self.size = (target_size, target_size * slot_count)
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def buffers(self):
+        return list(self.tiles)
+
+    def parts(self):
+        """(y, tile image) of every slot, the fill tile included"""
+        parts = [(index * self.target_size, tile) for index, tile in enumerate(self.tiles)]
+        if self.fill_color is not None:
+            fill = Image.new("RGBA", (self.target_size, self.target_size), self.fill_color)
+            parts.append((len(self.tiles) * self.target_size, fill))
+        return parts
+
+    def render_rows(self, top, bottom):
+        """Rows [top, bottom) as an (rows, width, 4) uint8 array"""
+        rows = np.empty((bottom - top, self.width, 4), dtype=np.uint8)
+        size = self.target_size
+        for index in range(top // size, (bottom - 1) // size + 1):
+            start = max(top, index * size)
+            end = min(bottom, (index + 1) * size)
+            if index < len(self.tiles):
+                tile = self.tiles[index]
+                rows[start - top:end - top] = np.asarray(tile.crop((0, start - index * size, size, end - index * size)))
+            else:
+                rows[start - top:end - top] = self.fill_color
+        return rows
+
+    def materialize(self):
+        atlas = Image.new("RGBA", self.size)
+        for y, tile in self.parts():
+            atlas.paste(tile, (0, y))
+        return atlas
+
+
+@profiling.profiled("build_single_atlas")
+def build_single_atlas(processed_images, target_size):
+    """AtlasView of the non-empty tiles (None if all are empty); three tiles get an inverted-average fill"""
+    loaded_images = [img for img in processed_images if img is not None]
+    if not loaded_images:
+        return None
+
+    fill_color = None
+    if atlas_slot_count(len(loaded_images)) > len(loaded_images):
+        fill_color = invert_color(get_average_color(loaded_images[-1]))
+    return AtlasView(loaded_images, target_size, fill_color)
+
+
+class AtlasSheetView:
+    """Lazy side-by-side sheet of several atlases (the atlas tab's preview).
+
+    Previews are resampled tile by tile straight from the atlases, so the
+    full sheet, one target_size column per atlas, is only composed by
+    materialize().
+    """
+
+    mode = "RGBA"
+
+    def __init__(self, atlases, target_size):
+        self.atlases = atlases
+        self.target_size = target_size
+        self.size = (target_size * len(atlases), max(atlas.height for atlas in atlases))
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def buffers(self):
+        return list(self.atlases)
+
+    def render_preview(self, size):
+        """Render the sheet at exactly `size`, resampling each tile into its box"""
+        scale_x = size[0] / self.width
+        scale_y = size[1] / self.height
+        preview = Image.new("RGBA", size)
+        for i, atlas in enumerate(self.atlases):
+            parts = atlas.parts() if isinstance(atlas, AtlasView) else [(0, atlas)]
+            for y, tile in parts:
+                left, right = round(i * self.target_size * scale_x), round((i * self.target_size + tile.width) * scale_x)
+                top, bottom = round(y * scale_y), round((y + tile.height) * scale_y)
+                if right > left and bottom > top:
+                    box_size = (right - left, bottom - top)
+                    preview.paste(tile.resize(box_size, Image.Resampling.BICUBIC, reducing_gap=2.0), (left, top))
+        return preview
+
+    def materialize(self):
+        return build_multi_atlas_preview(self.atlases, self.target_size)
+
+
+@profiling.profiled("build_multi_atlas_preview")
+def build_multi_atlas_preview(atlas_results, target_size):
+    max_height = max(atlas.height for atlas in atlas_results)
+
+    preview = Image.new("RGBA", (target_size * len(atlas_results), max_height))
+    for i, atlas in enumerate(atlas_results):
+        x_offset = i * target_size
+        if isinstance(atlas, AtlasView):
+            for y, tile in atlas.parts():
+                preview.paste(tile, (x_offset, y))
+        else:
+            preview.paste(atlas, (x_offset, 0))
+    return preview
+
+
+@profiling.profiled("get_average_color")
+def get_average_color(img):
+    """Calculate the average color of an image"""
+    # Resize to 1x1 to get average color
+    avg_img = img.resize((1, 1), Image.Resampling.LANCZOS)
+    return avg_img.getpixel((0, 0))
+
+
+def invert_color(color):
+    """Invert an RGBA color"""
+    r, g, b, a = color
+    return (255 - r, 255 - g, 255 - b, a)
@@ -0,0 +1,459 @@
+"""Headless batch processing.
+
+Run through the editor entry point, e.g.::
+
+    python vrtFS25TextureEditor.py batch tile a.dds b.dds -m 4 -o out
+    python vrtFS25TextureEditor.py batch atlas terrain.atlasproj -o out --ext .dds
+    python vrtFS25TextureEditor.py batch specular --roughness r.png --ao ao.png --no-metalness -o spec.dds
+    python vrtFS25TextureEditor.py batch specular-dir materials -o out --ext .dds
+    python vrtFS25TextureEditor.py batch jobs jobs.json
+
+A jobs file is a JSON list of job objects using the same keys as the jobs
+built by the other subcommands ("type" is "tile", "atlas" or "specular").
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .atlas import ATLAS_COUNT, SLOTS_PER_ATLAS, AtlasConfig, SlotConfig, build_atlas, parse_scale
+from .image_io import (
+    COMPRESSION_PRESETS,
+    DDS_FORMAT_OPTIONS,
+    DEFAULT_COMPRESSION_PRESET,
+    SUPPORTED_EXTENSIONS,
+    open_rgba,
+    open_source,
+    save_image_with_extension,
+)
+from . import profiling
+from .project import load_project
+from .sources import EncodedImage, full_image
+from .specular import SpecularConfig, pack_specular
+from .tiling import TiledView
+
+
+# ---------- Jobs ----------
+def load_slot_image(slot):
+    if slot.get("image") is not None:
+        return slot["image"]
+    if slot.get("path"):
+        return open_source(slot["path"])[0]
+    if slot.get("image_base64"):
+        return EncodedImage(base64.b64decode(slot["image_base64"].encode("utf-8")), ".png")
+    return None
+
+
+def run_tile_job(job, workers=None):
+    image, input_dds_format = open_source(job["input"])
+    return TiledView(image, int(job["multiplier"])), input_dds_format
+
+
+def run_atlas_job(job, workers=None):
+    slots = [
+        SlotConfig(load_slot_image(slot), parse_scale(slot.get("scale", 1)), bool(slot.get("blank_alpha", False)))
+        for slot in job["slots"]
+    ]
+    return build_atlas(AtlasConfig(slots, int(job["target_size"])), workers=workers), None
+
+
+def run_specular_job(job, workers=None):
+    for key, name in (("roughness", "roughness"), ("ambient_occlusion", "ambient occlusion")):
+        if not job.get(key):
+            raise ValueError(f"{name} input missing")
+
+    roughness, input_dds_format = open_source(job["roughness"])
+    roughness = full_image(roughness)
+    ambient_occlusion = open_rgba(job["ambient_occlusion"])
+    no_metalness = bool(job.get("no_metalness", False))
+    metalness = None if no_metalness or not job.get("metalness") else open_rgba(job["metalness"])
+    if metalness is None and not no_metalness:
+        raise ValueError("metalness input missing (use no_metalness to pack black)")
+
+    result = pack_specular(
+        roughness,
+        ambient_occlusion,
+        metalness,
+        SpecularConfig(invert_roughness=bool(job.get("invert_roughness", False)), use_black_metalness=no_metalness),
+    )
+    return result, input_dds_format
+
+
+JOB_RUNNERS = {
+    "tile": run_tile_job,
+    "atlas": run_atlas_job,
+    "specular": run_specular_job,
+}
+
+
+def run_job(job, save_options=None, job_workers=None, trace=False):
+    """Run one job and save its output; executed inside pool workers.
+
+    save_options are keyword arguments for save_image_with_extension
+    (dds_option, generate_mipmaps, preset, ...). job_workers caps the cores
+    the job uses itself, for atlas slot tiles and the DDS block encoder (1
+    when jobs already run in parallel, None to let a lone job use every
+    core). With trace, the job's profiling events are returned under "trace".
+    """
+    if trace:
+        profiling.profiler.enabled = True
+    with profiling.stage("job", kind=job.get("type"), job=describe_job(job)):
+        result = build_and_save(job, save_options, job_workers)
+    if trace:
+        result["trace"] = profiling.profiler.drain()
+    return result
+
+
+def build_and_save(job, save_options, job_workers):
+    start = time.perf_counter()
+    runner = JOB_RUNNERS.get(job.get("type"))
+    if runner is None:
+        raise ValueError(f"Unknown job type: {job.get('type')!r}")
+
+    result, input_dds_format = runner(job, job_workers)
+    if result is None:
+        return {"output": None, "size": None, "seconds": time.perf_counter() - start, "encode": None}
+
+    output = job["output"]
+    output_dir = os.path.dirname(output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    ext = os.path.splitext(output)[1].lower()
+    stats = save_image_with_extension(
+        result, output, ext, input_dds_format=input_dds_format, workers=job_workers, **(save_options or {})
+    )
+    return {
+        "output": output,
+        "size": result.size,
+        "seconds": time.perf_counter() - start,
+        "encode": stats.describe() if stats is not None else None,
+    }
+
+
+# ---------- Job construction ----------
+# File name suffixes (before the extension, case-insensitive) that mark the inputs of a material set
+SPECULAR_SUFFIXES = {
+    "roughness": ["_roughness", "_rough"],
+    "ambient_occlusion": ["_ambientocclusion", "_occlusion", "_ao"],
+    "metalness": ["_metalness", "_metallic", "_metal"],
+}
+
+
+def output_path(out_dir, stem, ext):
+    return os.path.join(out_dir, stem + ext)
+
+
+def match_suffix(stem, suffixes):
+    """(material name, channel) for a file stem ending in one of the suffixes, else None"""
+    lowered = stem.lower()
+    matches = [
+        (len(suffix), channel)
+        for channel, channel_suffixes in suffixes.items()
+        for suffix in channel_suffixes
+        if lowered.endswith(suffix.lower()) and len(suffix) < len(stem)
+    ]
+    if not matches:
+        return None
+    length, channel = max(matches)
+    return stem[:-length], channel
+
+
+def find_material_sets(root, suffixes=SPECULAR_SUFFIXES):
+    """{(relative dir, material name): {channel: path}} for images under root.
+
+    When a channel has several candidates (e.g. a .png and a .dds), the
+    first in name order wins.
+    """
+    material_sets = {}
+    for directory, subdirectories, names in os.walk(root):
+        subdirectories.sort()
+        relative = os.path.relpath(directory, root)
+        for name in sorted(names):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in SUPPORTED_EXTENSIONS:
+                continue
+            match = match_suffix(stem, suffixes)
+            if match is None:
+                continue
+            material, channel = match
+            material_set = material_sets.setdefault(("" if relative == "." else relative, material), {})
+            material_set.setdefault(channel, os.path.join(directory, name))
+    return material_sets
+
+
+def tile_jobs(args):
+    jobs = []
+    for path in args.inputs:
+        stem, input_ext = os.path.splitext(os.path.basename(path))
+        ext = args.ext or (input_ext.lower() if input_ext.lower() in SUPPORTED_EXTENSIONS else ".png")
+        jobs.append({
+            "type": "tile",
+            "input": path,
+            "multiplier": args.multiplier,
+            "output": output_path(args.out_dir, f"{stem}{args.suffix}", ext),
+        })
+    return jobs
+
+
+def atlas_jobs(args):
+    jobs = []
+    for path in args.projects:
+        project_data = load_project(path)
+        target_size = args.target_size or int(project_data.get("target_size", 1024))
+        slots = project_data.get("slots", [])
+        stem = os.path.splitext(os.path.basename(path))[0]
+        for atlas_index in range(ATLAS_COUNT):
+            start = atlas_index * SLOTS_PER_ATLAS
+            atlas_slots = [
+                slots[i] if i < len(slots) else {}
+                for i in range(start, start + SLOTS_PER_ATLAS)
+            ]
+            if not any(slot.get("image") is not None or slot.get("blank_alpha") for slot in atlas_slots):
+                continue
+
+            jobs.append({
+                "type": "atlas",
+                "name": f"{os.path.basename(path)} atlas {atlas_index + 1}",
+                "target_size": target_size,
+                "slots": atlas_slots,
+                "output": output_path(args.out_dir, f"{stem}_atlas{atlas_index + 1}", args.ext or ".png"),
+            })
+    return jobs
+
+
+def specular_jobs(args):
+    return [{
+        "type": "specular",
+        "roughness": args.roughness,
+        "ambient_occlusion": args.ao,
+        "metalness": args.metalness,
+        "invert_roughness": args.invert_roughness,
+        "no_metalness": args.no_metalness,
+        "output": args.output,
+    }]
+
+
+def specular_dir_jobs(args):
+    """One specular job per material set found under the given folders (outputs mirror the folder layout)"""
+    suffixes = {
+        "roughness": args.roughness_suffix or SPECULAR_SUFFIXES["roughness"],
+        "ambient_occlusion": args.ao_suffix or SPECULAR_SUFFIXES["ambient_occlusion"],
+        "metalness": args.metalness_suffix or SPECULAR_SUFFIXES["metalness"],
+    }
+    jobs = []
+    for root in args.roots:
+        for (relative, material), paths in sorted(find_material_sets(root, suffixes).items()):
+            jobs.append({
+                "type": "specular",
+                "name": os.path.join(relative, material),
+                "roughness": paths.get("roughness"),
+                "ambient_occlusion": paths.get("ambient_occlusion"),
+                "metalness": paths.get("metalness"),
+                "invert_roughness": args.invert_roughness,
+                # Sets without a metalness map are packed with black metalness
+                "no_metalness": args.no_metalness or "metalness" not in paths,
+                "output": output_path(os.path.join(args.out_dir, relative), f"{material}{args.suffix}", args.ext),
+            })
+    return jobs
+
+
+def file_jobs(args):
+    with open(args.jobs_file, "r", encoding="utf-8") as jobs_file:
+        jobs = json.load(jobs_file)
+    if not isinstance(jobs, list):
+        raise ValueError("Jobs file must contain a JSON list")
+    return jobs
+
+
+# ---------- Runner ----------
+def describe_job(job):
+    if job.get("name"):
+        return job["name"]
+    if job.get("type") == "specular":
+        return os.path.basename(job.get("roughness", "?"))
+    return os.path.basename(job.get("input", "?"))
+
+
+def default_worker_count(job_count):
+    return max(1, min(os.cpu_count() or 1, job_count))
+
+
+def run_jobs(jobs, workers=None, save_options=None, stream=sys.stdout, trace=False):
+    """Run jobs across a process pool and print per-job timing and a summary.
+
+    With trace, the profiling events of every job are collected into
+    profiling.profiler. Returns the number of failed jobs.
+    """
+    if not jobs:
+        print("No jobs to run.", file=stream)
+        return 0
+
+    workers = workers or default_worker_count(len(jobs))
+    print(f"Running {len(jobs)} job(s) on {workers} worker(s)", file=stream)
+
+    results = []
+    failures = 0
+    wall_start = time.perf_counter()
+
+    def report(job, result=None, error=None):
+        nonlocal failures
+        label = f"{job.get('type', '?'):<8} {describe_job(job)}"
+        if error is not None:
+            failures += 1
+            print(f"[FAIL]          {label}: {error}", file=stream)
+        elif result["output"] is None:
+            print(f"[skip] {result['seconds']:7.2f}s {label}: nothing to build", file=stream)
+        else:
+            results.append(result)
+            profiling.profiler.extend(result.get("trace") or [])
+            w, h = result["size"]
+            encode = f", {result['encode']}" if result["encode"] else ""
+            print(f"[ ok ] {result['seconds']:7.2f}s {label} -> {result['output']} ({w}x{h}{encode})", file=stream)
+
+    if workers == 1:
+        for job in jobs:
+            try:
+                report(job, run_job(job, save_options, None, trace))
+            except Exception as e:
+                report(job, error=e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(run_job, job, save_options, 1, trace): job
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                try:
+                    report(futures[future], future.result())
+                except Exception as e:
+                    report(futures[future], error=e)
+
+    wall_time = time.perf_counter() - wall_start
+    job_time = sum(result["seconds"] for result in results)
+    megapixels = sum(result["size"][0] * result["size"][1] for result in results) / 1_000_000
+
+    print(
+        f"\n{len(results)} written, {failures} failed in {wall_time:.2f}s wall "
+        f"({job_time:.2f}s of job time, {job_time / wall_time if wall_time else 0:.1f}x parallel speedup)",
+        file=stream
+    )
+    if wall_time > 0:
+        print(
+            f"Throughput: {len(results) / wall_time:.2f} jobs/s, {megapixels / wall_time:.1f} output MP/s",
+            file=stream
+        )
+    return failures
+
+
+# ---------- CLI ----------
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU cores)")
+    common.add_argument("--trace", metavar="PATH", help="Write a Chrome trace (JSON) of the pipeline stages")
+    common.add_argument(
+        "--dds-format",
+        default="Auto",
+        choices=DDS_FORMAT_OPTIONS,
+        metavar="LABEL",
+        help="DDS save format label as shown in the editor, e.g. \"BC1 (Linear, DXT1)\""
+    )
+    common.add_argument("--mipmaps", action="store_true", help="Generate mipmaps for DDS outputs")
+    common.add_argument(
+        "--alpha-coverage",
+        action="store_true",
+        help="Keep the alpha-test coverage of the base level in every mipmap"
+    )
+    common.add_argument(
+        "--preset",
+        default=DEFAULT_COMPRESSION_PRESET,
+        choices=COMPRESSION_PRESETS,
+        help="Block compression speed/quality preset"
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="vrtFS25TextureEditor.py batch",
+        description="Run tiling, atlas and specular jobs without the GUI."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    tile_parser = subparsers.add_parser("tile", parents=[common], help="Tile images by a multiplier")
+    tile_parser.add_argument("inputs", nargs="+")
+    tile_parser.add_argument("-m", "--multiplier", type=int, required=True)
+    tile_parser.add_argument("-o", "--out-dir", required=True)
+    tile_parser.add_argument("--ext", choices=sorted(SUPPORTED_EXTENSIONS), help="Output extension (default: input's)")
+    tile_parser.add_argument("--suffix", default="_tiled", help="Appended to output file names")
+    tile_parser.set_defaults(build_jobs=tile_jobs)
+
+    atlas_parser = subparsers.add_parser("atlas", parents=[common], help="Build every atlas of .atlasproj projects")
+    atlas_parser.add_argument("projects", nargs="+")
+    atlas_parser.add_argument("-o", "--out-dir", required=True)
+    atlas_parser.add_argument("--ext", choices=sorted(SUPPORTED_EXTENSIONS), help="Output extension (default: .png)")
+    atlas_parser.add_argument("--target-size", type=int, help="Override the project's target atlas width")
+    atlas_parser.set_defaults(build_jobs=atlas_jobs)
+
+    specular_parser = subparsers.add_parser("specular", parents=[common], help="Pack one roughness/AO/metalness set")
+    specular_parser.add_argument("--roughness", required=True)
+    specular_parser.add_argument("--ao", required=True)
+    specular_parser.add_argument("--metalness")
+    specular_parser.add_argument("--no-metalness", action="store_true")
+    specular_parser.add_argument("--invert-roughness", action="store_true")
+    specular_parser.add_argument("-o", "--output", required=True)
+    specular_parser.set_defaults(build_jobs=specular_jobs)
+
+    specular_dir_parser = subparsers.add_parser(
+        "specular-dir", parents=[common], help="Pack every roughness/AO/metalness set found under folders"
+    )
+    specular_dir_parser.add_argument("roots", nargs="+")
+    specular_dir_parser.add_argument("-o", "--out-dir", required=True)
+    specular_dir_parser.add_argument("--ext", default=".png", choices=sorted(SUPPORTED_EXTENSIONS))
+    specular_dir_parser.add_argument("--suffix", default="_specular", help="Appended to output file names")
+    for option, channel in (("--roughness-suffix", "roughness"), ("--ao-suffix", "ambient_occlusion"), ("--metalness-suffix", "metalness")):
+        specular_dir_parser.add_argument(
+            option,
+            action="append",
+            metavar="SUFFIX",
+            help=f"Input file suffix (repeatable, default: {' '.join(SPECULAR_SUFFIXES[channel])})"
+        )
+    specular_dir_parser.add_argument("--no-metalness", action="store_true", help="Pack black metalness for every set")
+    specular_dir_parser.add_argument("--invert-roughness", action="store_true")
+    specular_dir_parser.set_defaults(build_jobs=specular_dir_jobs)
+
+    jobs_parser = subparsers.add_parser("jobs", parents=[common], help="Run jobs from a JSON file")
+    jobs_parser.add_argument("jobs_file")
+    jobs_parser.set_defaults(build_jobs=file_jobs)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "specular" and not args.metalness and not args.no_metalness:
+        parser.error("specular needs --metalness or --no-metalness")
+    if getattr(args, "multiplier", 1) <= 0:
+        parser.error("--multiplier must be a positive number")
+
+    try:
+        jobs = args.build_jobs(args)
+    except Exception as e:
+        print(f"Failed to prepare jobs: {e}", file=sys.stderr)
+        return 2
+
+    save_options = {
+        "dds_option": args.dds_format,
+        "generate_mipmaps": args.mipmaps,
+        "preset": args.preset,
+        "preserve_alpha_coverage": args.alpha_coverage,
+    }
+    failures = run_jobs(jobs, args.workers, save_options, trace=bool(args.trace))
+    if args.trace:
+        count = profiling.profiler.export_chrome_trace(args.trace)
+        print(f"Trace: {count} events -> {args.trace}")
+        for line in profiling.profiler.describe():
+            print(f"  {line}")
+    return 1 if failures else 0
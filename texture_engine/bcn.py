@@ -0,0 +1,427 @@
+"""Vectorized BC1-BC7 block compression.
+
+Every 4x4 block of a chunk is encoded at once with NumPy, so the output
+depends only on the pixels (not on the installed Pillow version). Large
+images are split into block-row chunks that are encoded on a process pool.
+
+Codecs: "BC1" (DXT1, 1-bit alpha), "BC2" (DXT3), "BC3" (DXT5), "BC4" and
+"BC5" (unsigned red / red+green), "BC4S" and "BC5S" (signed variants), plus
+"BC6H" and "BC7" from the bptc module.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from . import bptc, endpoints, profiling
+
+
+BLOCK_BYTES = {
+    "BC1": 8,
+    "BC2": 16,
+    "BC3": 16,
+    "BC4": 8,
+    "BC4S": 8,
+    "BC5": 16,
+    "BC5S": 16,
+    "BC6H": 16,
+    "BC7": 16,
+}
+
+# Pillow's C "bcn" decoder (mode, decoder args) per codec; BC4S has none and uses decode_blocks
+PILLOW_DECODERS = {
+    "BC1": ("RGBA", (1, "BC1")),
+    "BC2": ("RGBA", (2, "BC2")),
+    "BC3": ("RGBA", (3, "BC3")),
+    "BC4": ("L", (4, "BC4")),
+    "BC5": ("RGB", (5, "BC5")),
+    "BC5S": ("RGB", (5, "BC5S")),
+    "BC6H": ("RGB", (6, "BC6H")),
+    "BC7": ("RGBA", (7, "BC7")),
+}
+
+# Blocks encoded per vectorized pass; bounds the temporary arrays to a few tens of MB
+CHUNK_BLOCKS = 32768
+PARALLEL_MIN_PIXELS = 1024 * 1024
+
+# Palette position (0 = endpoint 0 ... 3 = endpoint 1) -> BC1 index code
+BC1_CODES_4 = np.array([0, 2, 3, 1], dtype=np.uint32)
+BC1_CODES_3 = np.array([0, 2, 1], dtype=np.uint32)
+# Palette position (0 = endpoint 0 ... 7 = endpoint 1) -> BC4 index code
+BC4_CODES_8 = np.array([0, 2, 3, 4, 5, 6, 7, 1], dtype=np.uint64)
+
+_executor = None
+_executor_workers = 0
+
+
+# ---------- Blocks ----------
+def to_blocks(pixels):
+    """(H, W, C) array -> (blocks_y, blocks_x, 16, C), padding edges by replication"""
+    height, width = pixels.shape[:2]
+    pad_y = (-height) % 4
+    pad_x = (-width) % 4
+    if pad_y or pad_x:
+        pixels = np.pad(pixels, ((0, pad_y), (0, pad_x), (0, 0)), mode="edge")
+    blocks_y = pixels.shape[0] // 4
+    blocks_x = pixels.shape[1] // 4
+    channels = pixels.shape[2]
+    return pixels.reshape(blocks_y, 4, blocks_x, 4, channels).transpose(0, 2, 1, 3, 4).reshape(
+        blocks_y, blocks_x, 16, channels
+    )
+
+
+def from_blocks(blocks, width, height):
+    """Inverse of to_blocks, cropping the padding"""
+    blocks_y, blocks_x = blocks.shape[:2]
+    channels = blocks.shape[-1]
+    pixels = blocks.reshape(blocks_y, blocks_x, 4, 4, channels).transpose(0, 2, 1, 3, 4).reshape(
+        blocks_y * 4, blocks_x * 4, channels
+    )
+    return pixels[:height, :width]
+
+
+# ---------- BC1 color ----------
+def quantize_565(colors):
+    """Float RGB endpoints (N, 3) -> packed 565 values (N,) as uint32"""
+    colors = np.clip(colors, 0.0, 255.0)
+    r = np.rint(colors[:, 0] * (31.0 / 255.0)).astype(np.uint32)
+    g = np.rint(colors[:, 1] * (63.0 / 255.0)).astype(np.uint32)
+    b = np.rint(colors[:, 2] * (31.0 / 255.0)).astype(np.uint32)
+    return (r << 11) | (g << 5) | b
+
+
+def expand_565(packed):
+    """Packed 565 values (N,) -> float RGB (N, 3) as decoders reconstruct them"""
+    packed = packed.astype(np.uint32)
+    r = (packed >> 11) & 31
+    g = (packed >> 5) & 63
+    b = packed & 31
+    return np.stack(((r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)), axis=1).astype(np.float32)
+
+
+def fit_positions(colors, start, end, steps):
+    """Nearest palette position (0..steps) of each color on the start->end segment"""
+    direction = end - start
+    length_sq = (direction * direction).sum(axis=1)
+    t = np.einsum("nki,ni->nk", colors - start[:, None, :], direction)
+    t = t / np.maximum(length_sq, 1e-12)[:, None]
+    positions = np.clip(np.rint(t * steps), 0, steps)
+    return np.where(length_sq[:, None] > 0, positions, 0).astype(np.float32)
+
+
+def palette_error(colors, weights, c0, c1, positions, steps):
+    start = expand_565(c0)
+    end = expand_565(c1)
+    beta = (positions / steps)[..., None]
+    residual = start[:, None, :] + (end - start)[:, None, :] * beta - colors
+    return np.einsum("nki,nki,nk->n", residual, residual, weights)
+
+
+def encode_color_blocks(blocks, punch_through, passes=1):
+    """BC1 color blocks (N, 8) for RGBA blocks (N, 16, 4).
+
+    With punch_through (BC1 proper) blocks containing alpha < 128 use the
+    3-color mode with index 3 as transparent; BC2/BC3 always use 4 colors.
+    """
+    count = blocks.shape[0]
+    colors = blocks[..., :3].astype(np.float32)
+    transparent = blocks[..., 3] < 128 if punch_through else np.zeros(blocks.shape[:2], dtype=bool)
+    three_color = transparent.any(axis=1)
+    weights = (~transparent).astype(np.float32)
+    steps = np.where(three_color, 2, 3).astype(np.float32)[:, None]
+
+    start, end = endpoints.principal_endpoints(colors, weights)
+    c0 = quantize_565(start)
+    c1 = quantize_565(end)
+    positions = fit_positions(colors, expand_565(c0), expand_565(c1), steps)
+    error = palette_error(colors, weights, c0, c1, positions, steps)
+
+    # Least-squares refinement passes, kept per block only where they help
+    for _ in range(passes):
+        start, end = endpoints.least_squares_endpoints(colors, weights, positions, steps, start, end)
+        c0_ls = quantize_565(start)
+        c1_ls = quantize_565(end)
+        positions_ls = fit_positions(colors, expand_565(c0_ls), expand_565(c1_ls), steps)
+        error_ls = palette_error(colors, weights, c0_ls, c1_ls, positions_ls, steps)
+        better = error_ls < error
+        c0 = np.where(better, c0_ls, c0)
+        c1 = np.where(better, c1_ls, c1)
+        positions = np.where(better[:, None], positions_ls, positions)
+        error = np.minimum(error, error_ls)
+
+    # Order endpoints for the mode: c0 > c1 selects 4 colors, c0 <= c1 selects 3 colors
+    swap = np.where(three_color, c0 > c1, c0 < c1)
+    c0, c1 = np.where(swap, c1, c0), np.where(swap, c0, c1)
+    positions = np.where(swap[:, None], steps - positions, positions)
+
+    positions = positions.astype(np.int64)
+    codes = np.where(
+        three_color[:, None],
+        BC1_CODES_3[np.minimum(positions, 2)],
+        BC1_CODES_4[positions],
+    )
+    # Equal endpoints cannot express a 4-color block; index 0 reproduces the color exactly
+    codes = np.where((c0 == c1)[:, None] & ~three_color[:, None], 0, codes)
+    codes = np.where(transparent, 3, codes).astype(np.uint32)
+
+    indices = (codes << (2 * np.arange(16, dtype=np.uint32))).sum(axis=1, dtype=np.uint32)
+    out = np.empty((count, 8), dtype=np.uint8)
+    out[:, 0:2] = c0.astype("<u2").view(np.uint8).reshape(count, 2)
+    out[:, 2:4] = c1.astype("<u2").view(np.uint8).reshape(count, 2)
+    out[:, 4:8] = indices.astype("<u4").view(np.uint8).reshape(count, 4)
+    return out
+
+
+# ---------- BC4 / alpha ----------
+def encode_bc4_blocks(values, signed=False):
+    """BC4 blocks (N, 8) for single-channel blocks (N, 16); signed expects -127..127"""
+    count = values.shape[0]
+    values = values.astype(np.float32)
+    a0 = values.max(axis=1)
+    a1 = values.min(axis=1)
+    span = a0 - a1
+
+    t = (a0[:, None] - values) / np.maximum(span, 1e-6)[:, None]
+    positions = np.clip(np.rint(t * 7), 0, 7).astype(np.int64)
+    codes = np.where(span[:, None] > 0, BC4_CODES_8[positions], 0).astype(np.uint64)
+    indices = (codes << (3 * np.arange(16, dtype=np.uint64))).sum(axis=1, dtype=np.uint64)
+
+    out = np.empty((count, 8), dtype=np.uint8)
+    endpoint_type = np.int8 if signed else np.uint8
+    out[:, 0] = a0.astype(endpoint_type).view(np.uint8)
+    out[:, 1] = a1.astype(endpoint_type).view(np.uint8)
+    out[:, 2:8] = indices.astype("<u8").view(np.uint8).reshape(count, 8)[:, :6]
+    return out
+
+
+def encode_explicit_alpha_blocks(alpha):
+    """BC2 explicit 4-bit alpha blocks (N, 8) for alpha blocks (N, 16)"""
+    count = alpha.shape[0]
+    nibbles = ((alpha.astype(np.uint32) * 15 + 127) // 255).astype(np.uint64)
+    packed = (nibbles << (4 * np.arange(16, dtype=np.uint64))).sum(axis=1, dtype=np.uint64)
+    return packed.astype("<u8").view(np.uint8).reshape(count, 8)
+
+
+def to_snorm(values):
+    return np.clip(values.astype(np.int16) - 128, -127, 127)
+
+
+def encode_blocks(blocks, codec, preset=endpoints.DEFAULT_PRESET):
+    """Encode RGBA blocks (N, 16, 4) uint8 into (N, BLOCK_BYTES[codec]) uint8"""
+    passes = endpoints.PRESETS[preset]
+    if codec == "BC1":
+        return encode_color_blocks(blocks, punch_through=True, passes=passes)
+    if codec == "BC2":
+        return np.concatenate(
+            (
+                encode_explicit_alpha_blocks(blocks[..., 3]),
+                encode_color_blocks(blocks, punch_through=False, passes=passes),
+            ),
+            axis=1
+        )
+    if codec == "BC3":
+        return np.concatenate(
+            (
+                encode_bc4_blocks(blocks[..., 3]),
+                encode_color_blocks(blocks, punch_through=False, passes=passes),
+            ),
+            axis=1
+        )
+    if codec == "BC4":
+        return encode_bc4_blocks(blocks[..., 0])
+    if codec == "BC4S":
+        return encode_bc4_blocks(to_snorm(blocks[..., 0]), signed=True)
+    if codec == "BC5":
+        return np.concatenate((encode_bc4_blocks(blocks[..., 0]), encode_bc4_blocks(blocks[..., 1])), axis=1)
+    if codec == "BC5S":
+        return np.concatenate(
+            (
+                encode_bc4_blocks(to_snorm(blocks[..., 0]), signed=True),
+                encode_bc4_blocks(to_snorm(blocks[..., 1]), signed=True),
+            ),
+            axis=1
+        )
+    if codec == "BC6H":
+        return bptc.encode_bc6h_blocks(blocks, preset)
+    if codec == "BC7":
+        return bptc.encode_bc7_blocks(blocks, preset)
+    raise ValueError(f"Unsupported block codec: {codec}")
+
+
+def encode_rows(pixels, codec, preset=endpoints.DEFAULT_PRESET):
+    """Encode an (H, W, 4) uint8 band; returns the block data in row-major block order"""
+    blocks = to_blocks(pixels)
+    flat = blocks.reshape(-1, 16, 4)
+    encoded = [
+        encode_blocks(flat[start:start + CHUNK_BLOCKS], codec, preset)
+        for start in range(0, flat.shape[0], CHUNK_BLOCKS)
+    ]
+    return np.concatenate(encoded).tobytes()
+
+
+# ---------- Parallel compression ----------
+def get_executor(workers):
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_workers = workers
+    return _executor
+
+
+def compress(pixels, codec, workers=None, preset=endpoints.DEFAULT_PRESET):
+    """Block-compress an (H, W, 4) uint8 array, splitting block rows across processes.
+
+    workers=None uses every core for images above PARALLEL_MIN_PIXELS;
+    workers=1 always encodes in-process. preset is one of endpoints.PRESETS.
+    """
+    if codec not in BLOCK_BYTES:
+        raise ValueError(f"Unsupported block codec: {codec}")
+    if preset not in endpoints.PRESETS:
+        raise ValueError(f"Unknown compression preset: {preset}")
+
+    height, width = pixels.shape[:2]
+    if workers is None:
+        workers = (os.cpu_count() or 1) if height * width >= PARALLEL_MIN_PIXELS else 1
+
+    block_rows = (height + 3) // 4
+    if workers <= 1 or block_rows < 2:
+        return encode_rows(pixels, codec, preset)
+
+    rows_per_task = max(1, -(-block_rows // (workers * 4)))
+    bands = [pixels[row * 4:(row + rows_per_task) * 4] for row in range(0, block_rows, rows_per_task)]
+    executor = get_executor(workers)
+    return b"".join(executor.map(encode_rows, bands, [codec] * len(bands), [preset] * len(bands)))
+
+
+class CompressionStats:
+    """Accumulates encode time and input size to report MB/s"""
+
+    def __init__(self, codec, preset=endpoints.DEFAULT_PRESET):
+        self.codec = codec
+        self.preset = preset
+        self.seconds = 0.0
+        self.input_bytes = 0
+
+    def compress(self, pixels, workers=None):
+        start = time.perf_counter()
+        with profiling.stage("encode", nbytes=pixels.nbytes, codec=self.codec, preset=self.preset):
+            data = compress(pixels, self.codec, workers, self.preset)
+        self.seconds += time.perf_counter() - start
+        self.input_bytes += pixels.shape[0] * pixels.shape[1] * 4
+        return data
+
+    @property
+    def megabytes_per_second(self):
+        if self.seconds <= 0:
+            return 0.0
+        return self.input_bytes / (1024 * 1024) / self.seconds
+
+    def describe(self):
+        return f"{self.codec} {self.input_bytes / (1024 * 1024):.1f} MB in {self.seconds:.2f}s ({self.megabytes_per_second:.1f} MB/s)"
+
+
+# ---------- Decoding ----------
+def decode_color_blocks(data, four_color_only=False):
+    """BC1 color blocks (N, 8) uint8 -> RGBA pixels (N, 16, 4) uint8"""
+    c0 = data[:, 0].astype(np.uint32) | (data[:, 1].astype(np.uint32) << 8)
+    c1 = data[:, 2].astype(np.uint32) | (data[:, 3].astype(np.uint32) << 8)
+    indices = data[:, 4:8].copy().view("<u4").reshape(-1)
+    codes = (indices[:, None] >> (2 * np.arange(16, dtype=np.uint32))) & 3
+
+    start = expand_565(c0).astype(np.int32)
+    end = expand_565(c1).astype(np.int32)
+    four_color = (c0 > c1) | four_color_only
+    palette = np.empty((data.shape[0], 4, 4), dtype=np.int32)
+    palette[:, 0, :3] = start
+    palette[:, 1, :3] = end
+    palette[:, 2, :3] = np.where(four_color[:, None], (2 * start + end) // 3, (start + end) // 2)
+    palette[:, 3, :3] = np.where(four_color[:, None], (start + 2 * end) // 3, 0)
+    palette[:, :, 3] = 255
+    palette[:, 3, 3] = np.where(four_color, 255, 0)
+    return np.take_along_axis(palette, codes[..., None].astype(np.int64), axis=1).astype(np.uint8)
+
+
+def decode_bc4_blocks(data, signed=False):
+    """BC4 blocks (N, 8) uint8 -> values (N, 16) uint8 (signed data is re-biased by +128)"""
+    if signed:
+        a0 = data[:, 0].view(np.int8).astype(np.int32)
+        a1 = data[:, 1].view(np.int8).astype(np.int32)
+    else:
+        a0 = data[:, 0].astype(np.int32)
+        a1 = data[:, 1].astype(np.int32)
+
+    packed = np.zeros((data.shape[0], 8), dtype=np.uint8)
+    packed[:, :6] = data[:, 2:8]
+    indices = packed.view("<u8").reshape(-1)
+    codes = ((indices[:, None] >> (3 * np.arange(16, dtype=np.uint64))) & 7).astype(np.int64)
+
+    palette = np.empty((data.shape[0], 8), dtype=np.int32)
+    palette[:, 0] = a0
+    palette[:, 1] = a1
+    eight = a0 > a1
+    for i in range(1, 7):
+        interpolated_8 = ((7 - i) * a0 + i * a1) // 7
+        palette[:, i + 1] = interpolated_8
+    for i in range(1, 5):
+        palette[:, i + 1] = np.where(eight, palette[:, i + 1], ((5 - i) * a0 + i * a1) // 5)
+    low, high = (-127, 127) if signed else (0, 255)
+    palette[:, 6] = np.where(eight, palette[:, 6], low)
+    palette[:, 7] = np.where(eight, palette[:, 7], high)
+
+    values = np.take_along_axis(palette, codes, axis=1)
+    if signed:
+        values = values + 128
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+
+def decode_blocks(data, codec):
+    """Block data (N, BLOCK_BYTES[codec]) uint8 -> RGBA pixels (N, 16, 4) uint8"""
+    if codec == "BC1":
+        return decode_color_blocks(data)
+    if codec in ("BC2", "BC3"):
+        pixels = decode_color_blocks(data[:, 8:16], four_color_only=True)
+        if codec == "BC2":
+            nibbles = data[:, :8].copy().view("<u8").reshape(-1)
+            alpha = ((nibbles[:, None] >> (4 * np.arange(16, dtype=np.uint64))) & 15).astype(np.uint8)
+            pixels[..., 3] = alpha * 17
+        else:
+            pixels[..., 3] = decode_bc4_blocks(data[:, :8])
+        return pixels
+
+    signed = codec.endswith("S")
+    red = decode_bc4_blocks(data[:, :8], signed)
+    pixels = np.empty(red.shape + (4,), dtype=np.uint8)
+    pixels[..., 0] = red
+    if codec.startswith("BC5"):
+        pixels[..., 1] = decode_bc4_blocks(data[:, 8:16], signed)
+        pixels[..., 2] = 128 if signed else 0
+    else:
+        pixels[..., 1] = red
+        pixels[..., 2] = red
+    pixels[..., 3] = 255
+    return pixels
+
+
+def decompress_image(data, width, height, codec):
+    """Decode a whole BCn level into an RGBA Pillow image"""
+    if codec in PILLOW_DECODERS:
+        mode, args = PILLOW_DECODERS[codec]
+        return Image.frombytes(mode, (width, height), data, "bcn", args).convert("RGBA")
+    return Image.fromarray(decompress(data, width, height, codec), "RGBA")
+
+
+def decompress(data, width, height, codec):
+    """Decode a whole BCn level into an (H, W, 4) uint8 array"""
+    if codec in PILLOW_DECODERS:
+        return np.asarray(decompress_image(data, width, height, codec))
+
+    block_bytes = BLOCK_BYTES[codec]
+    blocks_x = max(1, (width + 3) // 4)
+    blocks_y = max(1, (height + 3) // 4)
+    raw = np.frombuffer(data, dtype=np.uint8, count=blocks_x * blocks_y * block_bytes)
+    pixels = decode_blocks(raw.reshape(-1, block_bytes), codec)
+    return from_blocks(pixels.reshape(blocks_y, blocks_x, 16, 4), width, height)
@@ -0,0 +1,461 @@
+"""Benchmarks of the image pipeline on synthetic textures.
+
+Runs headless (no Tk import), e.g.::
+
+    python -m texture_engine.benchmark --sizes 1024 2048 -o baseline.json
+    python -m texture_engine.benchmark --sizes 1024 2048 --baseline baseline.json
+    python vrtFS25TextureEditor.py bench --only "save_image_with_extension.bc7"
+
+Textures are generated deterministically (1K to 8K, RGBA and grayscale), so
+results of the same machine are comparable across commits. Every case is
+run once to warm up and measure peak memory, then timed --repeat times.
+Results are written as JSON; given a baseline, cases slower (or bigger)
+than the baseline by more than the threshold are reported and the exit
+code is 1.
+
+The GUI's build_atlas_for_index, auto_generate_atlas and
+auto_generate_specular are thin wrappers; their cases time the engine calls
+they make (AtlasBuilder.build and build_all on a cold builder,
+SpecularPacker.pack).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from . import project
+from .atlas import (
+    AtlasBuilder,
+    AtlasConfig,
+    SlotConfig,
+    build_multi_atlas_preview,
+    build_single_atlas,
+    process_slot_image,
+)
+from .image_io import save_image_with_extension
+from .sources import full_image
+from .specular import SpecularConfig, SpecularPacker
+from .tiling import tile_image
+
+
+BASELINE_VERSION = 1
+DEFAULT_SIZES = (1024, 2048, 4096, 8192)
+MODES = ("RGBA", "L")
+# Atlases are built at most this wide (like a typical FS25 atlas), from sources of every size
+MAX_ATLAS_SIZE = 2048
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_MEMORY_THRESHOLD = 0.25
+# Time differences below this are noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.005
+
+SAVE_FORMATS = {
+    "png": (".png", "Auto"),
+    "jpg": (".jpg", "Auto"),
+    "bc1": (".dds", "BC1 (Linear, DXT1)"),
+    "bc3": (".dds", "BC3 (Linear, DXT5)"),
+    "bc4": (".dds", "BC4 (Linear, Unsigned)"),
+    "bc5": (".dds", "BC5 (Linear, Unsigned)"),
+    "bc6h": (".dds", "BC6H (Linear, Unsigned, DX 11+)"),
+    "bc7": (".dds", "BC7 (Linear, DX 11+)"),
+}
+DEFAULT_SAVE_FORMATS = ("png", "jpg", "bc1", "bc3", "bc4", "bc5", "bc7")
+
+
+# ---------- Synthetic textures ----------
+def synthetic_texture(size, mode="RGBA", seed=0):
+    """Deterministic size x size texture: gradients, a blocky pattern and noise.
+
+    The mix gives encoders both smooth and high-frequency content, and the
+    alpha channel varies so alpha-aware formats do real work.
+    """
+    rng = np.random.default_rng([seed, size])
+    ramp = (np.arange(size, dtype=np.uint32) * 256 // size).astype(np.uint8)
+    ramp_x = ramp[np.newaxis, :]
+    ramp_y = ramp[:, np.newaxis]
+    blocks = (ramp_x >> 4) ^ (ramp_y >> 4)
+
+    def channel(base):
+        noise = rng.integers(0, 24, size=(size, size), dtype=np.uint8)
+        return base + noise
+
+    if mode == "L":
+        return Image.fromarray(channel(ramp_x // 2 + (blocks << 3)))
+
+    pixels = np.empty((size, size, 4), dtype=np.uint8)
+    pixels[..., 0] = channel(ramp_x)
+    pixels[..., 1] = channel(ramp_y)
+    pixels[..., 2] = channel(blocks << 4)
+    pixels[..., 3] = 255 - (blocks << 2)
+    return Image.fromarray(pixels)
+
+
+# ---------- Memory ----------
+def read_proc_status(field):
+    """Bytes of a /proc/self/status field (e.g. VmRSS), or None off Linux"""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS counter (Linux 4.0+); False when unsupported"""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        return False
+    return read_proc_status("VmHWM") is not None
+
+
+def measure_peak(function):
+    """(seconds, peak bytes above the starting memory, method) of one call.
+
+    Uses the process peak RSS where the kernel allows resetting it, which
+    counts Pillow and NumPy buffers alike; otherwise tracemalloc, which only
+    sees Python and NumPy allocations.
+    """
+    gc.collect()
+    if reset_peak_rss():
+        before = read_proc_status("VmRSS")
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        return seconds, max(0, read_proc_status("VmHWM") - before), "rss"
+
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak, "tracemalloc"
+
+
+# ---------- Cases ----------
+class Case:
+    """One benchmark: prepare() builds untimed state and returns the call to time"""
+
+    def __init__(self, name, size, mode, prepare):
+        self.name = name
+        self.size = size
+        self.mode = mode
+        self.prepare = prepare
+
+    @property
+    def key(self):
+        return f"{self.name} {self.size} {self.mode}"
+
+
+def atlas_target(size):
+    return min(size, MAX_ATLAS_SIZE)
+
+
+def build_cases(size, mode, texture, workdir, formats, workers, mipmaps):
+    """Cases for one synthetic texture"""
+    target_size = atlas_target(size)
+    cases = []
+
+    def add(name, prepare):
+        cases.append(Case(name, size, mode, prepare))
+
+    add("tile_image", lambda: lambda: tile_image(texture, 2))
+
+    def atlas_for_index():
+        config = AtlasConfig([SlotConfig(texture, scale) for scale in (1, 2, 3, 4)], target_size)
+        builder = AtlasBuilder()
+        return lambda: builder.build(0, config)
+
+    add("build_atlas_for_index", atlas_for_index)
+
+    def auto_generate_atlas():
+        # Four atlases of four distinct slots, rebuilt from scratch across the cores
+        configs = [
+            AtlasConfig([SlotConfig(texture, group * 4 + slot + 1) for slot in range(4)], target_size)
+            for group in range(4)
+        ]
+        builder = AtlasBuilder()
+        return lambda: builder.build_all(configs)
+
+    add("auto_generate_atlas", auto_generate_atlas)
+
+    def single_atlas():
+        # Three tiles, so the fourth slot gets the inverted average colour fill; the lazy atlas is
+        # materialized so the case still times the composition
+        tiles = [process_slot_image(SlotConfig(texture, scale), target_size) for scale in (1, 2, 4)]
+        return lambda: build_single_atlas(tiles, target_size).materialize()
+
+    add("build_single_atlas", single_atlas)
+
+    def multi_atlas_preview():
+        tiles = [process_slot_image(SlotConfig(texture, scale), target_size) for scale in (1, 2, 3, 4)]
+        atlas = build_single_atlas(tiles, target_size)
+        return lambda: build_multi_atlas_preview([atlas] * 4, target_size)
+
+    add("build_multi_atlas_preview", multi_atlas_preview)
+
+    if mode == "L":
+        def specular():
+            packer = SpecularPacker()
+            packer.set_input("roughness", texture)
+            packer.set_input("ambient_occlusion", synthetic_texture(size // 2, "L", seed=1))
+            packer.set_input("metalness", synthetic_texture(size, "L", seed=2))
+
+            def pack():
+                # Resampled inputs are cached by the packer; time the first pack after new inputs
+                packer.trim()
+                return packer.pack(SpecularConfig(invert_roughness=True))
+            return pack
+
+        add("auto_generate_specular", specular)
+
+    project_path = os.path.join(workdir, f"bench_{size}_{mode}.atlasproj")
+    project_images = []
+
+    def project_slots():
+        # Four distinct in-memory images, so every slot is encoded and stored
+        if not project_images:
+            project_images.extend([texture] + [synthetic_texture(size, mode, seed=seed) for seed in (1, 2, 3)])
+        images = project_images
+        return [{"scale": "1", "blank_alpha": False, "label": f"slot {i + 1}", "image": image} for i, image in enumerate(images)]
+
+    def project_encode():
+        slots = project_slots()
+
+        def save():
+            # Forget payloads of the previous run, so each run encodes every slot
+            project.clear_payload_cache()
+            project.save_project(project_path, str(target_size), slots)
+        return save
+
+    add("project_encode", project_encode)
+
+    decode_path = os.path.join(workdir, f"bench_{size}_{mode}_decode.atlasproj")
+
+    def project_decode():
+        if not os.path.exists(decode_path):
+            project.save_project(decode_path, str(target_size), project_slots())
+
+        def load():
+            loaded = project.load_project(decode_path)
+            return [full_image(slot["image"]) for slot in loaded["slots"] if slot["image"] is not None]
+        return load
+
+    add("project_decode", project_decode)
+
+    for name in formats:
+        ext, dds_option = SAVE_FORMATS[name]
+        path = os.path.join(workdir, f"bench_{size}_{mode}_{name}{ext}")
+
+        def save(path=path, ext=ext, dds_option=dds_option):
+            return lambda: save_image_with_extension(
+                texture, path, ext, dds_option, generate_mipmaps=mipmaps, workers=workers
+            )
+
+        add(f"save_image_with_extension.{name}", save)
+
+    return cases
+
+
+def run_case(case, repeat):
+    """{"seconds", "mean_seconds", "peak_bytes", "memory"} of a case (best of repeat timed runs)"""
+    _, peak_bytes, method = measure_peak(case.prepare())
+    timings = []
+    for _ in range(repeat):
+        function = case.prepare()
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+        del function
+    return {
+        "seconds": min(timings),
+        "mean_seconds": sum(timings) / len(timings),
+        "peak_bytes": peak_bytes,
+        "memory": method,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, modes=MODES, formats=DEFAULT_SAVE_FORMATS, only=None,
+                   repeat=3, workers=1, mipmaps=False, on_result=None):
+    """Run every selected case; returns {case key: result}.
+
+    only is a regular expression matched against case keys
+    ("tile_image 2048 RGBA"); on_result(case, result) is called as each
+    case finishes.
+    """
+    pattern = re.compile(only) if only else None
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="vrt_bench_") as workdir:
+        for size in sizes:
+            for mode in modes:
+                texture = synthetic_texture(size, mode)
+                for case in build_cases(size, mode, texture, workdir, formats, workers, mipmaps):
+                    if pattern is not None and not pattern.search(case.key):
+                        continue
+                    result = run_case(case, repeat)
+                    results[case.key] = result
+                    if on_result is not None:
+                        on_result(case, result)
+                del texture
+    return results
+
+
+# ---------- Baselines ----------
+def machine_info():
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pillow": Image.__version__,
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_results(path, results):
+    data = {
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as results_file:
+        json.dump(data, results_file, indent=1, sort_keys=True)
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as results_file:
+        return json.load(results_file)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, memory_threshold=DEFAULT_MEMORY_THRESHOLD):
+    """[(case key, what, old, new)] of cases over the thresholds relative to the baseline results"""
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        if (
+            result["seconds"] > old["seconds"] * (1 + threshold)
+            and result["seconds"] - old["seconds"] > MIN_REGRESSION_SECONDS
+        ):
+            regressions.append((key, "time", old["seconds"], result["seconds"]))
+        if (
+            old.get("memory") == result["memory"]
+            and result["peak_bytes"] > old["peak_bytes"] * (1 + memory_threshold)
+            and result["peak_bytes"] - old["peak_bytes"] > 1024 * 1024
+        ):
+            regressions.append((key, "memory", old["peak_bytes"], result["peak_bytes"]))
+    return regressions
+
+
+# ---------- CLI ----------
+def format_change(new, old):
+    if old is None or not old.get("seconds"):
+        return ""
+    return f"{(new['seconds'] / old['seconds'] - 1) * 100:+7.1f}%"
+
+
+def format_value(what, value):
+    if what == "time":
+        return f"{value * 1000:.1f} ms"
+    return f"{value / (1024 * 1024):.1f} MB"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="vrtFS25TextureEditor.py bench",
+        description="Time the image pipeline on synthetic textures and compare against a baseline."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Texture sizes (default: 1024 2048 4096 8192)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="Texture modes (default: RGBA L)")
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=sorted(SAVE_FORMATS),
+        default=list(DEFAULT_SAVE_FORMATS),
+        help="Formats timed through save_image_with_extension"
+    )
+    parser.add_argument("--only", metavar="REGEX", help='Only run cases matching this, e.g. "tile_image|2048"')
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is kept (default: 3)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="DDS encoder processes (default: 1; memory of extra processes is not measured)"
+    )
+    parser.add_argument("--mipmaps", action="store_true", help="Generate mipmaps when saving DDS")
+    parser.add_argument("-o", "--output", help="Write the results as JSON (usable as a baseline)")
+    parser.add_argument("--baseline", help="Compare against results saved with --output")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown as a fraction (default: 0.15)"
+    )
+    parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=DEFAULT_MEMORY_THRESHOLD,
+        help="Allowed peak memory growth as a fraction (default: 0.25)"
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.repeat <= 0:
+        parser.error("--repeat must be a positive number")
+
+    baseline = {}
+    if args.baseline:
+        try:
+            baseline = load_results(args.baseline)["results"]
+        except Exception as e:
+            print(f"Failed to read baseline: {e}", file=sys.stderr)
+            return 2
+
+    print(f"{'case':<44} {'best':>10} {'mean':>10} {'peak':>10} {'change':>8}")
+
+    def report(case, result):
+        print(
+            f"{case.key:<44} {result['seconds'] * 1000:8.1f}ms {result['mean_seconds'] * 1000:8.1f}ms "
+            f"{result['peak_bytes'] / (1024 * 1024):8.1f}MB {format_change(result, baseline.get(case.key)):>8}",
+            flush=True
+        )
+
+    results = run_benchmarks(
+        args.sizes, args.modes, args.formats, args.only, args.repeat, args.workers, args.mipmaps, report
+    )
+    if args.output:
+        save_results(args.output, results)
+        print(f"Results: {len(results)} cases -> {args.output}")
+
+    if not baseline:
+        return 0
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+    for key, what, old, new in regressions:
+        print(f"REGRESSION {key}: {what} {format_value(what, old)} -> {format_value(what, new)}")
+    compared = sum(1 for key in results if key in baseline)
+    print(f"{compared} case(s) compared with the baseline, {len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
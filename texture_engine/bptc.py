@@ -0,0 +1,233 @@
+"""Vectorized BC7 and BC6H (BPTC) block encoders.
+
+BC7 uses mode 6 (one subset, RGBA 7-bit endpoints with p-bits and 4-bit
+indices), which suits albedo and specular maps. The "quality" preset also
+tries mode 5 (separate colour/alpha indices) per block and keeps whichever
+reconstructs better. BC6H writes unsigned mode 11 (one region, 10-bit
+endpoints, 4-bit indices), fitted in half-float bit space.
+
+Presets (see endpoints.PRESETS) set the number of least-squares endpoint
+refinement passes.
+"""
+import numpy as np
+
+from .endpoints import DEFAULT_PRESET, PRESETS, least_squares_endpoints, principal_endpoints
+
+
+WEIGHTS_2 = np.array([0, 21, 43, 64], dtype=np.int32)
+WEIGHTS_4 = np.array([0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64], dtype=np.int32)
+
+
+class BitWriter:
+    """Packs per-block bit fields, LSB first, into 128-bit blocks"""
+
+    def __init__(self, count):
+        self.low = np.zeros(count, dtype=np.uint64)
+        self.high = np.zeros(count, dtype=np.uint64)
+        self.position = 0
+
+    def write(self, values, bits):
+        values = np.asarray(values).astype(np.uint64) & np.uint64((1 << bits) - 1)
+        position = self.position
+        if position < 64:
+            self.low |= values << np.uint64(position)
+            if position + bits > 64:
+                self.high |= values >> np.uint64(64 - position)
+        else:
+            self.high |= values << np.uint64(position - 64)
+        self.position += bits
+
+    def write_indices(self, indices, bits, anchor_bits):
+        for pixel in range(16):
+            self.write(indices[:, pixel], anchor_bits if pixel == 0 else bits)
+
+    def blocks(self):
+        return np.stack((self.low, self.high), axis=1).astype("<u8").view(np.uint8)
+
+
+def nearest_weight(t, weights):
+    """Index of the interpolation weight (0..64 scale) closest to t in [0, 1]"""
+    midpoints = (weights[1:] + weights[:-1]) / 2.0 / 64.0
+    return np.searchsorted(midpoints, t, side="left")
+
+
+def fit_indices(values, start, end, weights):
+    """Indices along start->end for (N, 16, C) values, by projection"""
+    direction = end - start
+    length_sq = (direction * direction).sum(axis=1)
+    t = np.einsum("nki,ni->nk", values - start[:, None, :], direction)
+    t = t / np.maximum(length_sq, 1e-12)[:, None]
+    indices = nearest_weight(np.clip(t, 0.0, 1.0), weights)
+    return np.where(length_sq[:, None] > 0, indices, 0)
+
+
+def interpolate(start, end, indices, weights):
+    """BPTC integer interpolation of (N, C) endpoints for (N, 16) indices"""
+    w = weights[indices][..., None]
+    return ((64 - w) * start[:, None, :].astype(np.int32) + w * end[:, None, :].astype(np.int32) + 32) >> 6
+
+
+def block_error(values, reconstructed):
+    diff = reconstructed.astype(np.float32) - values
+    return np.einsum("nki,nki->n", diff, diff)
+
+
+def fix_anchor(indices, weights, *endpoint_pairs):
+    """Swap endpoints where pixel 0 uses the upper half of the index range"""
+    top = len(weights) - 1
+    swap = indices[:, 0] > top // 2
+    indices = np.where(swap[:, None], top - indices, indices)
+    swapped = []
+    for start, end in endpoint_pairs:
+        mask = swap.reshape((-1,) + (1,) * (start.ndim - 1))
+        swapped.append((np.where(mask, end, start), np.where(mask, start, end)))
+    return indices, swapped
+
+
+def refine(values, indices, weights, start, end, passes, quantize, unquantize):
+    """Least-squares endpoint passes, keeping per block only improvements"""
+    q_start, q_end = quantize(start), quantize(end)
+    best = (q_start, q_end, indices)
+    best_error = block_error(values, interpolate(unquantize(q_start), unquantize(q_end), indices, weights))
+    ones = np.ones(values.shape[:2], dtype=np.float32)
+    for _ in range(passes):
+        positions = weights[best[2]].astype(np.float32)
+        start, end = least_squares_endpoints(values, ones, positions, 64.0, start, end)
+        q_start, q_end = quantize(start), quantize(end)
+        indices = fit_indices(values, unquantize(q_start).astype(np.float32), unquantize(q_end).astype(np.float32), weights)
+        error = block_error(values, interpolate(unquantize(q_start), unquantize(q_end), indices, weights))
+        better = error < best_error
+        best = tuple(
+            np.where(better.reshape((-1,) + (1,) * (new.ndim - 1)), new, old)
+            for new, old in zip((q_start, q_end, indices), best)
+        )
+        best_error = np.minimum(error, best_error)
+    return best, best_error
+
+
+# ---------- BC7 ----------
+def quantize_7p(endpoints):
+    """Float RGBA endpoints (N, 4) -> 8-bit values of the form (q7 << 1) | p, best p-bit per endpoint"""
+    candidates = []
+    for p_bit in (0, 1):
+        q = np.clip(np.rint((endpoints - p_bit) / 2.0), 0, 127)
+        value = q * 2 + p_bit
+        candidates.append((((value - endpoints) ** 2).sum(axis=1), value))
+    use_one = candidates[1][0] < candidates[0][0]
+    return np.where(use_one[:, None], candidates[1][1], candidates[0][1]).astype(np.int32)
+
+
+def encode_mode6(values, passes):
+    """(blocks, error) for BC7 mode 6"""
+    ones = np.ones(values.shape[:2], dtype=np.float32)
+    start, end = principal_endpoints(values, ones)
+    q_start, q_end = quantize_7p(start), quantize_7p(end)
+    indices = fit_indices(values, q_start.astype(np.float32), q_end.astype(np.float32), WEIGHTS_4)
+    (q_start, q_end, indices), error = refine(
+        values, indices, WEIGHTS_4, start, end, passes, quantize_7p, lambda q: q
+    )
+    indices, ((q_start, q_end),) = fix_anchor(indices, WEIGHTS_4, (q_start, q_end))
+
+    writer = BitWriter(values.shape[0])
+    writer.write(1 << 6, 7)
+    for channel in range(4):
+        writer.write(q_start[:, channel] >> 1, 7)
+        writer.write(q_end[:, channel] >> 1, 7)
+    writer.write(q_start[:, 0] & 1, 1)
+    writer.write(q_end[:, 0] & 1, 1)
+    writer.write_indices(indices, 4, 3)
+    return writer.blocks(), error
+
+
+def quantize_7(endpoints):
+    return np.clip(np.rint(endpoints * (127.0 / 255.0)), 0, 127).astype(np.int32)
+
+
+def unquantize_7(q):
+    return (q << 1) | (q >> 6)
+
+
+def encode_mode5(values, passes):
+    """(blocks, error) for BC7 mode 5 without channel rotation"""
+    colors = values[..., :3]
+    ones = np.ones(values.shape[:2], dtype=np.float32)
+    start, end = principal_endpoints(colors, ones)
+    q_start, q_end = quantize_7(start), quantize_7(end)
+    color_indices = fit_indices(
+        colors, unquantize_7(q_start).astype(np.float32), unquantize_7(q_end).astype(np.float32), WEIGHTS_2
+    )
+    (q_start, q_end, color_indices), color_error = refine(
+        colors, color_indices, WEIGHTS_2, start, end, passes, quantize_7, unquantize_7
+    )
+
+    alpha = values[..., 3:]
+    a_start = alpha.min(axis=1).astype(np.int32)
+    a_end = alpha.max(axis=1).astype(np.int32)
+    alpha_indices = fit_indices(alpha, a_start.astype(np.float32), a_end.astype(np.float32), WEIGHTS_2)
+    alpha_error = block_error(alpha, interpolate(a_start, a_end, alpha_indices, WEIGHTS_2))
+
+    color_indices, ((q_start, q_end),) = fix_anchor(color_indices, WEIGHTS_2, (q_start, q_end))
+    alpha_indices, ((a_start, a_end),) = fix_anchor(alpha_indices, WEIGHTS_2, (a_start, a_end))
+
+    writer = BitWriter(values.shape[0])
+    writer.write(1 << 5, 6)
+    writer.write(0, 2)
+    for channel in range(3):
+        writer.write(q_start[:, channel], 7)
+        writer.write(q_end[:, channel], 7)
+    writer.write(a_start[:, 0], 8)
+    writer.write(a_end[:, 0], 8)
+    writer.write_indices(color_indices, 2, 1)
+    writer.write_indices(alpha_indices, 2, 1)
+    return writer.blocks(), color_error + alpha_error
+
+
+def encode_bc7_blocks(blocks, preset=DEFAULT_PRESET):
+    """BC7 blocks (N, 16) for RGBA blocks (N, 16, 4) uint8"""
+    passes = PRESETS[preset]
+    values = blocks.astype(np.float32)
+    encoded, error = encode_mode6(values, passes)
+    if preset == "quality":
+        mode5, mode5_error = encode_mode5(values, passes)
+        encoded = np.where((mode5_error < error)[:, None], mode5, encoded)
+    return encoded
+
+
+# ---------- BC6H ----------
+# 8-bit channel value -> bits of the half float value / 255
+HALF_BITS = (np.arange(256, dtype=np.float32) / 255.0).astype(np.float16).view(np.uint16).astype(np.int32)
+
+
+def quantize_10(endpoints):
+    """Unquantized 16-bit endpoints (N, 3) -> 10-bit unsigned mode 11 endpoints"""
+    return np.clip(np.rint((endpoints - 32.0) / 64.0), 0, 1023).astype(np.int32)
+
+
+def unquantize_10(q):
+    return np.where(q == 0, 0, np.where(q == 1023, 0xFFFF, ((q << 16) + 0x8000) >> 10))
+
+
+def encode_bc6h_blocks(blocks, preset=DEFAULT_PRESET):
+    """BC6H unsigned blocks (N, 16) for RGBA blocks (N, 16, 4) uint8 (alpha is dropped)"""
+    passes = PRESETS[preset]
+    # Work on unquantized 16-bit values; the decoder finishes them with (x * 31) >> 6
+    values = (HALF_BITS[blocks[..., :3]] * (64.0 / 31.0)).astype(np.float32)
+    ones = np.ones(values.shape[:2], dtype=np.float32)
+    start, end = principal_endpoints(values, ones)
+    q_start, q_end = quantize_10(start), quantize_10(end)
+    indices = fit_indices(
+        values, unquantize_10(q_start).astype(np.float32), unquantize_10(q_end).astype(np.float32), WEIGHTS_4
+    )
+    (q_start, q_end, indices), _ = refine(
+        values, indices, WEIGHTS_4, start, end, passes, quantize_10, unquantize_10
+    )
+    indices, ((q_start, q_end),) = fix_anchor(indices, WEIGHTS_4, (q_start, q_end))
+
+    writer = BitWriter(values.shape[0])
+    writer.write(0x03, 5)
+    for channel in range(3):
+        writer.write(q_start[:, channel], 10)
+    for channel in range(3):
+        writer.write(q_end[:, channel], 10)
+    writer.write_indices(indices, 4, 3)
+    return writer.blocks()
@@ -0,0 +1,132 @@
+import struct
+
+from . import bcn
+
+
+DDS_MAGIC = b"DDS "
+
+DDSD_CAPS = 0x1
+DDSD_HEIGHT = 0x2
+DDSD_WIDTH = 0x4
+DDSD_PITCH = 0x8
+DDSD_PIXELFORMAT = 0x1000
+DDSD_MIPMAPCOUNT = 0x20000
+DDSD_LINEARSIZE = 0x80000
+
+DDPF_ALPHAPIXELS = 0x1
+DDPF_FOURCC = 0x4
+DDPF_RGB = 0x40
+
+DDSCAPS_COMPLEX = 0x8
+DDSCAPS_TEXTURE = 0x1000
+DDSCAPS_MIPMAP = 0x400000
+
+DX10_FOURCC = b"DX10"
+DDS_DIMENSION_TEXTURE2D = 3
+
+# Block-compressed pixel formats: name -> (block codec, FourCC, DXGI format).
+# Legacy names are written with their FourCC; DXGI-style names get a DX10 header.
+BLOCK_FORMATS = {
+    "DXT1": ("BC1", b"DXT1", 71),
+    "DXT3": ("BC2", b"DXT3", 74),
+    "DXT5": ("BC3", b"DXT5", 77),
+    "ATI1": ("BC4", b"ATI1", 80),
+    "ATI2": ("BC5", b"ATI2", 83),
+    "BC4U": ("BC4", b"BC4U", 80),
+    "BC5U": ("BC5", b"BC5U", 83),
+    "BC1_UNORM": ("BC1", DX10_FOURCC, 71),
+    "BC1_UNORM_SRGB": ("BC1", DX10_FOURCC, 72),
+    "BC2_UNORM": ("BC2", DX10_FOURCC, 74),
+    "BC2_UNORM_SRGB": ("BC2", DX10_FOURCC, 75),
+    "BC3_UNORM": ("BC3", DX10_FOURCC, 77),
+    "BC3_UNORM_SRGB": ("BC3", DX10_FOURCC, 78),
+    "BC4_UNORM": ("BC4", DX10_FOURCC, 80),
+    "BC4_SNORM": ("BC4S", DX10_FOURCC, 81),
+    "BC5_UNORM": ("BC5", DX10_FOURCC, 83),
+    "BC5_SNORM": ("BC5S", DX10_FOURCC, 84),
+    "BC6H_UF16": ("BC6H", DX10_FOURCC, 95),
+    "BC7_UNORM": ("BC7", DX10_FOURCC, 98),
+    "BC7_UNORM_SRGB": ("BC7", DX10_FOURCC, 99),
+}
+
+FOURCC_TO_PIXEL_FORMAT = {
+    fourcc: name for name, (_, fourcc, _) in BLOCK_FORMATS.items() if fourcc != DX10_FOURCC
+}
+DXGI_TO_PIXEL_FORMAT = {
+    dxgi: name for name, (_, fourcc, dxgi) in BLOCK_FORMATS.items() if fourcc == DX10_FOURCC
+}
+
+
+def is_srgb(pixel_format):
+    return pixel_format is not None and pixel_format.endswith("_SRGB")
+
+
+def block_codec(pixel_format):
+    return BLOCK_FORMATS[pixel_format][0]
+
+
+def level_size(width, height, pixel_format):
+    """Bytes of one mip level (pixel_format None means uncompressed RGBA8)"""
+    if pixel_format is None:
+        return width * height * 4
+    block_bytes = bcn.BLOCK_BYTES[block_codec(pixel_format)]
+    return max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * block_bytes
+
+
+def build_header(width, height, pixel_format=None, mip_count=1):
+    """DDS header for uncompressed RGBA8 (pixel_format None) or a BLOCK_FORMATS entry"""
+    flags = DDSD_CAPS | DDSD_HEIGHT | DDSD_WIDTH | DDSD_PIXELFORMAT
+    caps = DDSCAPS_TEXTURE
+    if mip_count > 1:
+        flags |= DDSD_MIPMAPCOUNT
+        caps |= DDSCAPS_COMPLEX | DDSCAPS_MIPMAP
+
+    if pixel_format is None:
+        flags |= DDSD_PITCH
+        pitch_or_linear_size = width * 4
+        pixel_format_block = struct.pack(
+            "<8I", 32, DDPF_RGB | DDPF_ALPHAPIXELS, 0, 32,
+            0x000000FF, 0x0000FF00, 0x00FF0000, 0xFF000000
+        )
+    else:
+        flags |= DDSD_LINEARSIZE
+        pitch_or_linear_size = level_size(width, height, pixel_format)
+        _, fourcc, dxgi_format = BLOCK_FORMATS[pixel_format]
+        pixel_format_block = struct.pack("<2I4s5I", 32, DDPF_FOURCC, fourcc, 0, 0, 0, 0, 0)
+
+    header = struct.pack(
+        "<7I44x", 124, flags, height, width, pitch_or_linear_size, 0, mip_count if mip_count > 1 else 0
+    )
+    header += pixel_format_block
+    header += struct.pack("<5I", caps, 0, 0, 0, 0)
+    if pixel_format is not None and fourcc == DX10_FOURCC:
+        header += struct.pack("<5I", dxgi_format, DDS_DIMENSION_TEXTURE2D, 0, 1, 0)
+    return DDS_MAGIC + header
+
+
+def parse_header(data):
+    """(width, height, pixel_format, data_offset) of a DDS file's leading bytes.
+
+    pixel_format is a BLOCK_FORMATS name, None for RGBA8 with the masks
+    build_header writes, or raises ValueError for anything else.
+    """
+    if len(data) < 128 or data[:4] != DDS_MAGIC:
+        raise ValueError("Not a DDS file")
+
+    height, width = struct.unpack_from("<2I", data, 12)
+    pf_flags, fourcc, bit_count, r_mask, g_mask, b_mask, a_mask = struct.unpack_from("<I4s5I", data, 80)
+    if pf_flags & DDPF_FOURCC:
+        if fourcc == DX10_FOURCC:
+            if len(data) < 148:
+                raise ValueError("Truncated DX10 header")
+            dxgi_format = struct.unpack_from("<I", data, 128)[0]
+            if dxgi_format not in DXGI_TO_PIXEL_FORMAT:
+                raise ValueError(f"Unsupported DXGI format {dxgi_format}")
+            return width, height, DXGI_TO_PIXEL_FORMAT[dxgi_format], 148
+        if fourcc not in FOURCC_TO_PIXEL_FORMAT:
+            raise ValueError(f"Unsupported FourCC {fourcc!r}")
+        return width, height, FOURCC_TO_PIXEL_FORMAT[fourcc], 128
+
+    if bit_count == 32 and (r_mask, g_mask, b_mask, a_mask) == (0xFF, 0xFF00, 0xFF0000, 0xFF000000):
+        return width, height, None, 128
+    raise ValueError("Unsupported uncompressed DDS layout")
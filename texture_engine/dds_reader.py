@@ -0,0 +1,137 @@
+"""Mip-aware DDS loading.
+
+The header and mip table are parsed once, so a single level can be decoded
+without touching the others. DdsImage keeps the compressed file in memory (a
+fraction of the decoded size, and the file itself stays free to be
+overwritten) and decodes a level only when it is asked for: previews and
+small atlas slots use the smallest sufficient mip, and the full-resolution
+base is decoded only when an output needs it.
+"""
+import struct
+import threading
+
+from PIL import Image
+
+from . import bcn, dds, profiling
+
+
+# Bigger levels decode from blocks about as fast as they read back from a level cache
+MAX_CACHED_LEVEL_PIXELS = 2048 * 2048
+
+
+def read_mip_table(buffer):
+    """(width, height, pixel_format, levels) of a DDS buffer; levels are (width, height, offset, size)"""
+    width, height, pixel_format, offset = dds.parse_header(buffer[:148])
+    flags = struct.unpack_from("<I", buffer, 8)[0]
+    declared = struct.unpack_from("<I", buffer, 28)[0] if flags & dds.DDSD_MIPMAPCOUNT else 1
+
+    levels = []
+    level_width, level_height = width, height
+    for _ in range(max(1, declared)):
+        size = dds.level_size(level_width, level_height, pixel_format)
+        if offset + size > len(buffer):
+            break
+        levels.append((level_width, level_height, offset, size))
+        offset += size
+        if level_width == 1 and level_height == 1:
+            break
+        level_width, level_height = max(1, level_width // 2), max(1, level_height // 2)
+
+    if not levels:
+        raise ValueError("DDS file is truncated")
+    return width, height, pixel_format, levels
+
+
+def decode_level_image(data, width, height, pixel_format):
+    if pixel_format is None:
+        return Image.frombytes("RGBA", (width, height), data)
+    return bcn.decompress_image(data, width, height, dds.block_codec(pixel_format))
+
+
+class DdsImage:
+    """Lazily decoded RGBA image backed by the compressed mip levels of a DDS file.
+
+    Built from the file's bytes. Exposes size/width/height like a Pillow
+    image; use image_for_size() and full_image() to obtain actual Pillow
+    images. encoded_data/encoded_ext keep the original file so it can be
+    stored without re-encoding. With a
+    level_cache (disk_cache.DiskCache) and cache_key (content hash), decoded
+    levels are also looked up in and written to that cache.
+    """
+
+    mode = "RGBA"
+    encoded_ext = ".dds"
+
+    def __init__(self, data):
+        self.encoded_data = data
+        width, height, self.pixel_format, self.levels = read_mip_table(data)
+        self.size = (width, height)
+        self.decoded = {}
+        self.level_cache = None
+        self.cache_key = None
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # Picklable for process pools: decoded levels, the cache and the lock stay behind
+        state = self.__dict__.copy()
+        state["decoded"] = {}
+        state["level_cache"] = None
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    @property
+    def level_count(self):
+        return len(self.levels)
+
+    def level_for(self, min_size):
+        best = 0
+        for index, (width, height, _, _) in enumerate(self.levels):
+            if width >= min_size[0] and height >= min_size[1]:
+                best = index
+        return best
+
+    def level(self, index):
+        """Pillow image of one mip level, decoded once"""
+        with self.lock:
+            image = self.decoded.get(index)
+            if image is None:
+                width, height, offset, size = self.levels[index]
+                cache = self.level_cache if width * height <= MAX_CACHED_LEVEL_PIXELS else None
+                if cache is not None:
+                    image = cache.load(self.cache_key, (width, height))
+                if image is None:
+                    data = memoryview(self.encoded_data)[offset:offset + size]
+                    with profiling.stage("decode", nbytes=width * height * 4, format=self.pixel_format, level=index):
+                        image = decode_level_image(data, width, height, self.pixel_format)
+                    if cache is not None:
+                        cache.store(self.cache_key, image)
+                self.decoded[index] = image
+            return image
+
+    def decoded_bytes(self):
+        with self.lock:
+            return sum(image.width * image.height * 4 for image in self.decoded.values())
+
+    def release(self):
+        """Drop the decoded levels (they are decoded again when next needed)"""
+        with self.lock:
+            self.decoded = {}
+
+    def image_for_size(self, min_size):
+        """Smallest decoded level that is at least min_size"""
+        return self.level(self.level_for(min_size))
+
+    def full_image(self):
+        return self.level(0)
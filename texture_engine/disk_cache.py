@@ -0,0 +1,182 @@
+"""Persistent cache of decoded source pixels.
+
+Decoded images (a PNG/JPG source, or one DDS mip level) are written as .npy
+files named after the SHA-256 of the source file and the decoded size, and
+memory-mapped back on the next launch instead of being decoded again. The
+directory is capped in bytes; the least recently used files (by mtime,
+refreshed on every hit) are deleted first.
+
+    python vrtFS25TextureEditor.py cache stats
+    python vrtFS25TextureEditor.py cache cleanup --max-mb 1024
+    python vrtFS25TextureEditor.py cache clear
+"""
+import argparse
+import os
+import sys
+import threading
+import uuid
+
+import numpy as np
+from PIL import Image
+
+from . import profiling
+
+
+DEFAULT_DISK_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+# Levels smaller than this decode faster than a file round trip
+MIN_CACHED_PIXELS = 256 * 256
+CACHE_DIR_ENV = "VRT_TEXTURE_CACHE_DIR"
+
+
+def default_directory():
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "vrtFS25TextureEditor", "decoded")
+
+
+class DiskCache:
+    """Directory of decoded RGBA arrays keyed by (content hash, size)"""
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_DISK_CACHE_BYTES):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.total_bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def path_for(self, digest, size):
+        return os.path.join(self.directory, f"{digest}_{size[0]}x{size[1]}.npy")
+
+    def load(self, digest, size):
+        """Memory-mapped RGBA image cached for (digest, size), or None"""
+        path = self.path_for(digest, size)
+        try:
+            pixels = np.load(path, mmap_mode="r")
+            os.utime(path)
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            profiling.cache("disk cache", False)
+            return None
+        if pixels.shape != (size[1], size[0], 4) or pixels.dtype != np.uint8:
+            return None
+        with self.lock:
+            self.hits += 1
+        profiling.cache("disk cache", True)
+        return Image.fromarray(pixels)
+
+    def store(self, digest, image):
+        """Write image for later launches (small images are skipped); failures are ignored"""
+        if image.width * image.height < MIN_CACHED_PIXELS:
+            return
+        path = self.path_for(digest, image.size)
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary, "wb") as file:
+                np.save(file, np.asarray(image.convert("RGBA")))
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            return
+
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = sum(size for _, size, _ in self.files())
+            else:
+                self.total_bytes += os.path.getsize(path)
+            over_budget = self.total_bytes > self.max_bytes
+        if over_budget:
+            self.cleanup()
+
+    def files(self):
+        """[(path, bytes, mtime)] of the cached arrays"""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(".npy"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def cleanup(self, max_bytes=None):
+        """Delete least recently used files until the cache fits max_bytes; returns bytes freed"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.files(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for path, size, _ in entries:
+            if total - freed <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                # Still mapped by a running editor (Windows); try again next time
+                continue
+        with self.lock:
+            self.total_bytes = total - freed
+        return freed
+
+    def clear(self):
+        return self.cleanup(0)
+
+    def stats(self):
+        entries = self.files()
+        return {
+            "directory": self.directory,
+            "files": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def format_mb(nbytes):
+    return f"{nbytes / (1024 * 1024):.1f} MB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="vrtFS25TextureEditor.py cache",
+        description="Inspect or trim the persistent decoded-image cache."
+    )
+    parser.add_argument("command", choices=["stats", "cleanup", "clear"])
+    parser.add_argument("--dir", help=f"Cache directory (default: {default_directory()})")
+    parser.add_argument(
+        "--max-mb",
+        type=int,
+        default=DEFAULT_DISK_CACHE_BYTES // (1024 * 1024),
+        help="Size cap used by cleanup"
+    )
+    args = parser.parse_args(argv)
+
+    cache = DiskCache(args.dir, args.max_mb * 1024 * 1024)
+    if args.command == "cleanup":
+        print(f"Freed {format_mb(cache.cleanup())}")
+    elif args.command == "clear":
+        print(f"Freed {format_mb(cache.clear())}")
+
+    stats = cache.stats()
+    print(f"Directory: {stats['directory']}")
+    print(f"Files:     {stats['files']}")
+    print(f"Size:      {format_mb(stats['bytes'])} of {format_mb(stats['max_bytes'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
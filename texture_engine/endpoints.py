@@ -0,0 +1,52 @@
+"""Endpoint fitting shared by the BC1-BC5 and BC6H/BC7 block encoders."""
+import numpy as np
+
+
+# Compression speed presets -> least-squares endpoint refinement passes
+PRESETS = {"fast": 0, "balanced": 1, "quality": 2}
+DEFAULT_PRESET = "balanced"
+
+
+def principal_endpoints(colors, weights):
+    """Endpoints spanning the weighted principal axis of each block's colors"""
+    weight_sum = np.maximum(weights.sum(axis=1, keepdims=True), 1e-6)
+    mean = (colors * weights[..., None]).sum(axis=1) / weight_sum
+    centered = colors - mean[:, None, :]
+    covariance = np.einsum("nki,nkj->nij", centered * weights[..., None], centered)
+
+    # Power iteration from the largest-variance channel axis
+    axis = np.eye(colors.shape[2], dtype=np.float32)[np.argmax(np.diagonal(covariance, axis1=1, axis2=2), axis=1)]
+    for _ in range(6):
+        axis = np.einsum("nij,nj->ni", covariance, axis)
+        axis /= np.maximum(np.linalg.norm(axis, axis=1, keepdims=True), 1e-12)
+
+    projection = np.einsum("nki,ni->nk", centered, axis)
+    masked = weights > 0
+    t_max = np.where(masked, projection, -np.inf).max(axis=1)
+    t_min = np.where(masked, projection, np.inf).min(axis=1)
+    t_max = np.where(np.isfinite(t_max), t_max, 0.0)
+    t_min = np.where(np.isfinite(t_min), t_min, 0.0)
+    return mean + axis * t_max[:, None], mean + axis * t_min[:, None]
+
+
+def least_squares_endpoints(colors, weights, positions, steps, fallback_start, fallback_end):
+    """Endpoints minimizing the squared error for fixed palette positions"""
+    beta = positions / steps
+    alpha = np.float32(1.0) - beta
+    w_alpha = weights * alpha
+    w_beta = weights * beta
+    aa = (w_alpha * alpha).sum(axis=1)
+    ab = (w_alpha * beta).sum(axis=1)
+    bb = (w_beta * beta).sum(axis=1)
+    ax = (w_alpha[..., None] * colors).sum(axis=1)
+    bx = (w_beta[..., None] * colors).sum(axis=1)
+
+    det = aa * bb - ab * ab
+    valid = np.abs(det) > 1e-6
+    safe_det = np.where(valid, det, 1.0)[:, None]
+    start = (bb[:, None] * ax - ab[:, None] * bx) / safe_det
+    end = (aa[:, None] * bx - ab[:, None] * ax) / safe_det
+    return (
+        np.where(valid[:, None], start, fallback_start),
+        np.where(valid[:, None], end, fallback_end),
+    )
@@ -0,0 +1,203 @@
+"""Saving several outputs at once (e.g. every atlas) on a process pool.
+
+Each output, and each format variant of it, is encoded by its own worker
+process, so exporting four DDS atlases takes about as long as the slowest
+one instead of the sum. A run is started without blocking: the outputs are
+built on a background thread first (build()), then encoded. Poll it (e.g.
+from Tk's after() loop) for progress, which the workers report per strip
+through shared memory; cancelling stops the encodes at their next strip and
+removes their partly written files.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from .image_io import save_image_with_extension
+from .saving import SaveCancelled, SaveProgress
+
+
+DEFAULT_NAME_PATTERN = "atlas{index}"
+
+# Set in each pool worker by init_worker: [done, total] pairs per task, and the cancel flag
+_shared_progress = None
+_shared_cancel = None
+
+
+def format_name(pattern, index, size, name=""):
+    """File name stem from a pattern using {index} (1-based), {name}, {width} and {height} (size is (width, height))"""
+    try:
+        stem = pattern.format(index=index, name=name, width=size[0], height=size[1])
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"Invalid name pattern {pattern!r}: {e}") from e
+    if not stem or stem != os.path.basename(stem):
+        raise ValueError(f"Name pattern {pattern!r} must give a plain file name")
+    return stem
+
+
+def export_tasks(outputs, directory, pattern, extensions, name=""):
+    """[(index, path, ext)] for (index, size) outputs in every extension; raises ValueError on clashing names"""
+    tasks = []
+    paths = set()
+    for index, size in outputs:
+        stem = format_name(pattern, index, size, name)
+        for ext in extensions:
+            path = os.path.join(directory, stem + ext)
+            if os.path.normcase(path) in paths:
+                raise ValueError(f"Name pattern {pattern!r} gives {os.path.basename(path)} more than once (use {{index}})")
+            paths.add(os.path.normcase(path))
+            tasks.append((index, path, ext))
+    return tasks
+
+
+def init_worker(shared_progress, shared_cancel):
+    global _shared_progress, _shared_cancel
+    _shared_progress = shared_progress
+    _shared_cancel = shared_cancel
+
+
+class SharedProgress(SaveProgress):
+    """SaveProgress of one task, mirrored into the run's shared memory"""
+
+    def __init__(self, slot):
+        super().__init__()
+        self.slot = slot
+
+    def add_work(self, units):
+        super().add_work(units)
+        _shared_progress[2 * self.slot + 1] = self.total
+
+    def step(self, units=1):
+        super().step(units)
+        _shared_progress[2 * self.slot] = self.done
+
+    def check(self):
+        if _shared_cancel.value:
+            raise SaveCancelled()
+
+
+def save_task(slot, image, path, ext, save_options):
+    # Outputs are already spread across processes; each encodes on one core
+    save_image_with_extension(image, path, ext, workers=1, progress=SharedProgress(slot), **save_options)
+    return path
+
+
+class ExportRun:
+    """Saves (index, path, ext) tasks concurrently; poll() from the UI thread for progress.
+
+    images maps each index to its output, or is a callable returning that
+    mapping, which start() runs on a background thread before encoding.
+    save_options are keyword arguments for save_image_with_extension
+    (dds_option, generate_mipmaps, preset, ...).
+    """
+
+    def __init__(self, tasks, images, save_options=None, workers=None):
+        self.tasks = list(tasks)
+        self.images = images
+        self.save_options = dict(save_options or {})
+        self.workers = workers or min(len(self.tasks), os.cpu_count() or 1) or 1
+        self.shared_progress = multiprocessing.RawArray("q", 2 * len(self.tasks))
+        self.shared_cancel = multiprocessing.RawValue("b", 0)
+        self.thread = None
+        self.futures = None
+        self.error = None
+        self.cancelled = False
+
+    @property
+    def total(self):
+        return len(self.tasks)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="export", daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        try:
+            images = self.images() if callable(self.images) else self.images
+            if self.cancelled:
+                futures = []
+                for _ in self.tasks:
+                    future = Future()
+                    future.cancel()
+                    futures.append(future)
+                self.futures = futures
+                return
+
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.shared_progress, self.shared_cancel)
+            )
+            self.futures = [
+                executor.submit(save_task, slot, images[index], path, ext, self.save_options)
+                for slot, (index, path, ext) in enumerate(self.tasks)
+            ]
+            # Workers exit once the submitted tasks are done
+            executor.shutdown(wait=False)
+        except Exception as e:
+            self.error = e
+
+    def poll(self):
+        """{"done", "total", "fraction", "building", "saved", "failed", "skipped", "finished"}.
+
+        saved/failed/skipped list paths (failed: (path, error)); building is
+        True until the outputs are built and their encodes submitted.
+        """
+        futures = self.futures
+        if futures is None:
+            building = self.error is None
+            failed = [] if building else [(path, self.error) for _, path, _ in self.tasks]
+            return {
+                "done": len(failed),
+                "total": self.total,
+                "fraction": 0.0 if building else 1.0,
+                "building": building,
+                "saved": [],
+                "failed": failed,
+                "skipped": [],
+                "finished": not building,
+            }
+
+        saved = []
+        failed = []
+        skipped = []
+        fraction = 0.0
+        for slot, ((_, path, _), future) in enumerate(zip(self.tasks, futures)):
+            if not future.done():
+                done, total = self.shared_progress[2 * slot], self.shared_progress[2 * slot + 1]
+                fraction += min(1.0, done / total) if total else 0.0
+                continue
+            fraction += 1.0
+            if future.cancelled() or isinstance(future.exception(), SaveCancelled):
+                skipped.append(path)
+            elif future.exception() is not None:
+                failed.append((path, future.exception()))
+            else:
+                saved.append(path)
+        done = len(saved) + len(failed) + len(skipped)
+        return {
+            "done": done,
+            "total": self.total,
+            "fraction": fraction / self.total if self.total else 1.0,
+            "building": False,
+            "saved": saved,
+            "failed": failed,
+            "skipped": skipped,
+            "finished": done == self.total,
+        }
+
+    def cancel(self):
+        """Drop outputs that have not started and stop the running encodes at their next strip"""
+        self.cancelled = True
+        self.shared_cancel.value = 1
+        for future in self.futures or []:
+            future.cancel()
+
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+        for future in self.futures or []:
+            if not future.cancelled():
+                future.exception()
+        return self.poll()
@@ -0,0 +1,183 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from . import dds, endpoints, profiling, source_cache, streaming
+from .dds_reader import DdsImage
+from .saving import SaveProgress, atomic_output
+from .sources import full_image
+from .tiling import materialize
+
+
+SUPPORTED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".dds"}
+
+DDS_FORMAT_OPTIONS = [
+    "Auto",
+    "BC1 (Linear, DXT1)",
+    "BC1 (sRGB, DX 10+)",
+    "BC2 (Linear, DXT3)",
+    "BC2 (sRGB, DX 10+)",
+    "BC3 (Linear, DXT5)",
+    "BC3 (sRGB, DX 10+)",
+    "BC3 (Linear, RGB)",
+    "BC4 (Linear, Unsigned)",
+    "BC4 (Linear, Unsigned, ATI1)",
+    "BC5 (Linear, Unsigned)",
+    "BC5 (Linear, Unsigned, ATI2)",
+    "BC5 (Linear, Signed)",
+    "BC6H (Linear, Unsigned, DX 11+)",
+    "BC7 (Linear, DX 11+)",
+    "BC7 (sRGB, DX 11+)",
+]
+
+DDS_OPTION_TO_PIXEL_FORMAT = {
+    "BC1 (Linear, DXT1)": "DXT1",
+    "BC1 (sRGB, DX 10+)": "BC1_UNORM_SRGB",
+    "BC2 (Linear, DXT3)": "DXT3",
+    "BC2 (sRGB, DX 10+)": "BC2_UNORM_SRGB",
+    "BC3 (Linear, DXT5)": "DXT5",
+    "BC3 (sRGB, DX 10+)": "BC3_UNORM_SRGB",
+    "BC3 (Linear, RGB)": "DXT5",
+    "BC4 (Linear, Unsigned)": "BC4_UNORM",
+    "BC4 (Linear, Unsigned, ATI1)": "ATI1",
+    "BC5 (Linear, Unsigned)": "BC5_UNORM",
+    "BC5 (Linear, Unsigned, ATI2)": "ATI2",
+    "BC5 (Linear, Signed)": "BC5_SNORM",
+    "BC6H (Linear, Unsigned, DX 11+)": "BC6H_UF16",
+    "BC7 (Linear, DX 11+)": "BC7_UNORM",
+    "BC7 (sRGB, DX 11+)": "BC7_UNORM_SRGB",
+}
+
+COMPRESSION_PRESETS = list(endpoints.PRESETS)
+DEFAULT_COMPRESSION_PRESET = endpoints.DEFAULT_PRESET
+
+
+def open_source(path):
+    """(image, dds_pixel_format) for an input file, with a None pixel format for non-DDS inputs.
+
+    The image is the lazy source shared by every open of the same file (see
+    source_cache); decode it with image_for_size()/full_image(). DDS files in
+    a format the built-in reader knows decode one mip level at a time.
+    """
+    image = open_encoded(path)
+    if os.path.splitext(path)[1].lower() == ".dds":
+        decoded = image.decoded()
+        if isinstance(decoded, DdsImage):
+            return image, decoded.pixel_format
+        return image, detect_dds_pixel_format(path)
+    return image, None
+
+
+def open_encoded(path):
+    """Shared lazy EncodedImage holding the file's bytes (kept as-is in project files)"""
+    return source_cache.shared_cache.open(path)
+
+
+def open_encoded_many(paths, workers=None):
+    """[(image, error)] for paths in order, read and decoded concurrently on a thread pool.
+
+    Non-DDS images are fully decoded here (they will be needed whole);
+    DDS files only get their mip table parsed.
+    """
+    def open_one(path):
+        try:
+            image = open_encoded(path)
+            image.decoded()
+            return image, None
+        except Exception as e:
+            return None, e
+
+    if len(paths) <= 1:
+        return [open_one(path) for path in paths]
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(open_one, paths))
+
+
+def open_rgba(path):
+    """Full-resolution RGBA Pillow image of an input file"""
+    return full_image(open_source(path)[0])
+
+
+def detect_dds_pixel_format(path):
+    try:
+        with open(path, "rb") as file:
+            header = file.read(132)
+
+        if len(header) < 128 or header[:4] != b"DDS ":
+            return None
+
+        fourcc = header[84:88]
+        if fourcc in dds.FOURCC_TO_PIXEL_FORMAT:
+            return dds.FOURCC_TO_PIXEL_FORMAT[fourcc]
+
+        if fourcc == dds.DX10_FOURCC and len(header) >= 132:
+            dxgi_format = int.from_bytes(header[128:132], byteorder="little", signed=False)
+            return dds.DXGI_TO_PIXEL_FORMAT.get(dxgi_format)
+    except Exception:
+        return None
+
+    return None
+
+
+def resolve_dds_pixel_format(dds_option, input_dds_format=None):
+    """Pixel format for a DDS save format label; raises ValueError for unknown labels"""
+    if dds_option == "Auto":
+        return input_dds_format or "DXT5"
+    if dds_option not in DDS_OPTION_TO_PIXEL_FORMAT:
+        raise ValueError(f"Unknown DDS save format: {dds_option!r}")
+    return DDS_OPTION_TO_PIXEL_FORMAT[dds_option]
+
+
+@profiling.profiled("save")
+def save_image_with_extension(
+    image, path, ext, dds_option="Auto", generate_mipmaps=False, input_dds_format=None, workers=None,
+    preset=DEFAULT_COMPRESSION_PRESET, preserve_alpha_coverage=False, progress=None
+):
+    """Save an output (Pillow image or lazy view); oversized PNG/DDS outputs are streamed in strips.
+
+    DDS files are always written by the built-in block encoder (workers is its
+    process count, None = all cores for large images; preset is one of
+    COMPRESSION_PRESETS); the returned bcn.CompressionStats reports its
+    throughput. Mipmaps come from the output's cached mipmaps.MipChain (sRGB
+    formats are filtered in linear light). Other formats return None.
+
+    The file is written under a temporary name and renamed over path once
+    complete. progress (a saving.SaveProgress) is advanced as strips are
+    written; cancelling it aborts the save with saving.SaveCancelled. An
+    unknown dds_option raises ValueError before anything is written.
+    """
+    strip_bytes = streaming.STRIP_BYTES if progress is None else streaming.PROGRESS_STRIP_BYTES
+    progress = progress or SaveProgress()
+    pixel_format = resolve_dds_pixel_format(dds_option, input_dds_format) if ext == ".dds" else None
+
+    with atomic_output(path) as temporary:
+        if ext == ".dds":
+            return streaming.write_dds_streaming(
+                image,
+                temporary,
+                pixel_format,
+                strip_bytes=strip_bytes,
+                workers=workers,
+                preset=preset,
+                generate_mipmaps=generate_mipmaps,
+                preserve_alpha_coverage=preserve_alpha_coverage,
+                progress=progress
+            )
+
+        if streaming.should_stream(image, ext):
+            streaming.write_png_streaming(image, temporary, strip_bytes=strip_bytes, progress=progress)
+            return None
+
+        progress.add_work(1)
+        progress.check()
+        image = materialize(image)
+        # The temporary name has no image extension, so the format comes from ext
+        image_format = Image.registered_extensions().get(ext)
+        if ext in {".jpg", ".jpeg"}:
+            image.convert("RGB").save(temporary, format=image_format)
+        else:
+            image.save(temporary, format=image_format)
+        progress.step(1)
+    return None
@@ -0,0 +1,116 @@
+"""Accounting of the large image buffers held by the editor.
+
+Holders register named pools that report their current size in bytes.
+Pools whose contents can be recomputed (tiles, preview levels, decoded
+pixels of sources) also get a trim(max_bytes) callback; enforce() trims
+them, cheapest to rebuild first, until the total fits the budget.
+"""
+import threading
+
+import numpy as np
+from PIL import Image
+
+
+DEFAULT_MEMORY_BUDGET_BYTES = 3 * 1024 * 1024 * 1024
+
+
+def buffer_bytes(*buffers, exclude=()):
+    """Bytes held by Pillow images and NumPy arrays, counting each object once.
+
+    Lazy views with a buffers() method (atlas.AtlasView) count the buffers
+    they reference; other objects count 0. Buffers in exclude (e.g. those
+    another pool already reports) are skipped.
+    """
+    seen = {id(buffer) for buffer in exclude}
+    total = 0
+    pending = list(buffers)
+    while pending:
+        buffer = pending.pop()
+        if buffer is None or id(buffer) in seen:
+            continue
+        seen.add(id(buffer))
+        if isinstance(buffer, Image.Image):
+            total += buffer.width * buffer.height * len(buffer.getbands())
+        elif isinstance(buffer, np.ndarray):
+            total += buffer.nbytes
+        elif hasattr(buffer, "buffers"):
+            pending.extend(buffer.buffers())
+    return total
+
+
+def format_bytes(nbytes):
+    if nbytes >= 1024 ** 3:
+        return f"{nbytes / 1024 ** 3:.1f} GB"
+    return f"{nbytes / 1024 ** 2:.0f} MB"
+
+
+class MemoryPool:
+    def __init__(self, name, size, trim=None, priority=0):
+        self.name = name
+        self.size = size
+        self.trim = trim
+        self.priority = priority
+
+
+class MemoryBudget:
+    """Tracks registered pools against a byte budget.
+
+    size() callbacks are cheap and may be polled (e.g. for a live readout);
+    trim callbacks run in priority order, lowest first.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY_BUDGET_BYTES):
+        self.max_bytes = max_bytes
+        self.pools = {}
+        self.trimmed_bytes = 0
+        self.lock = threading.Lock()
+
+    def register(self, name, size, trim=None, priority=0):
+        with self.lock:
+            self.pools[name] = MemoryPool(name, size, trim, priority)
+
+    def unregister(self, name):
+        with self.lock:
+            self.pools.pop(name, None)
+
+    def usage(self):
+        """[(name, bytes)] of every pool"""
+        with self.lock:
+            pools = list(self.pools.values())
+        return [(pool.name, pool.size()) for pool in pools]
+
+    def total(self):
+        return sum(nbytes for _, nbytes in self.usage())
+
+    def enforce(self):
+        """Trim recomputable pools until the total fits the budget; returns bytes freed.
+
+        Freed bytes are measured on the total after each trim, so buffers a
+        pool drops but another pool still holds (tiles referenced by an
+        atlas) do not count as released.
+        """
+        usage = dict(self.usage())
+        start = sum(usage.values())
+        excess = start - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        with self.lock:
+            pools = sorted((pool for pool in self.pools.values() if pool.trim), key=lambda pool: pool.priority)
+        freed = 0
+        for pool in pools:
+            if freed >= excess:
+                break
+            before = pool.size()
+            pool.trim(max(0, before - (excess - freed)))
+            freed = max(0, start - self.total())
+        self.trimmed_bytes += freed
+        return freed
+
+    def describe(self):
+        """One-line readout, e.g. "RAM 1.2 GB / 3.0 GB (sources 800 MB, tiles 300 MB)" """
+        usage = sorted(((name, nbytes) for name, nbytes in self.usage() if nbytes), key=lambda item: -item[1])
+        total = sum(nbytes for _, nbytes in usage)
+        details = ", ".join(f"{name} {format_bytes(nbytes)}" for name, nbytes in usage[:3])
+        text = f"RAM {format_bytes(total)} / {format_bytes(self.max_bytes)}"
+        return f"{text} ({details})" if details else text
@@ -0,0 +1,186 @@
+"""Mip chain generation for DDS outputs.
+
+Each level is a 2x2 box reduction of the previous one, done in linear light
+for sRGB formats, so building the whole chain costs about a third of a pass
+over the base image. Level 1 can be fed strip by strip while the base level
+is being streamed. Chains are cached per output object, so writing the same
+output again (another format, another file) reuses the reduced levels.
+The cache is bounded from outside: chain_bytes() reports it and
+release_chains() drops the oldest chains (see memory.MemoryBudget).
+"""
+import threading
+import weakref
+
+import numpy as np
+
+from . import profiling
+
+
+ALPHA_COVERAGE_THRESHOLD = 0.5
+ALPHA_COVERAGE_SEARCH_STEPS = 12
+
+SRGB_TO_LINEAR = np.where(
+    np.arange(256) / 255.0 <= 0.04045,
+    np.arange(256) / 255.0 / 12.92,
+    ((np.arange(256) / 255.0 + 0.055) / 1.055) ** 2.4,
+).astype(np.float32)
+
+_chains = {}
+_chains_lock = threading.Lock()
+
+
+def mip_count(width, height):
+    """Levels of a full chain down to 1x1"""
+    return max(width, height).bit_length()
+
+
+def level_dimensions(width, height, level):
+    return max(1, width >> level), max(1, height >> level)
+
+
+def to_linear(pixels, srgb):
+    """uint8 RGBA -> float32 RGBA in 0..1, colour decoded from sRGB when srgb"""
+    if srgb:
+        values = np.empty(pixels.shape, dtype=np.float32)
+        values[..., :3] = SRGB_TO_LINEAR[pixels[..., :3]]
+        values[..., 3] = pixels[..., 3] * np.float32(1.0 / 255.0)
+        return values
+    return pixels.astype(np.float32) * np.float32(1.0 / 255.0)
+
+
+def from_linear(values, srgb):
+    """Inverse of to_linear, rounded back to uint8"""
+    values = np.clip(values, 0.0, 1.0)
+    if srgb:
+        color = values[..., :3]
+        values = values.copy()
+        values[..., :3] = np.where(
+            color <= 0.0031308, color * 12.92, 1.055 * np.power(color, 1.0 / 2.4) - 0.055
+        )
+    return np.rint(values * 255.0).astype(np.uint8)
+
+
+@profiling.profiled("mipmap reduce")
+def reduce_2x2(pixels, srgb, halve_y=True, halve_x=True):
+    """Box-filter an (H, W, 4) uint8 array by 2 along the requested axes (odd edges are dropped)"""
+    values = to_linear(pixels, srgb)
+    if halve_y:
+        rows = values.shape[0] // 2 * 2
+        values = (values[0:rows:2] + values[1:rows:2]) * np.float32(0.5)
+    if halve_x:
+        cols = values.shape[1] // 2 * 2
+        values = (values[:, 0:cols:2] + values[:, 1:cols:2]) * np.float32(0.5)
+    return from_linear(values, srgb)
+
+
+def alpha_coverage(alpha, scale=1.0):
+    return np.count_nonzero(alpha * scale >= ALPHA_COVERAGE_THRESHOLD * 255.0) / max(1, alpha.size)
+
+
+def scale_alpha_to_coverage(pixels, target):
+    """Copy of pixels with alpha scaled so that the alpha-test coverage matches target"""
+    alpha = pixels[..., 3].astype(np.float32)
+    low, high = 0.0, 4.0
+    for _ in range(ALPHA_COVERAGE_SEARCH_STEPS):
+        middle = (low + high) / 2.0
+        if alpha_coverage(alpha, middle) < target:
+            low = middle
+        else:
+            high = middle
+    scaled = pixels.copy()
+    scaled[..., 3] = np.clip(np.rint(alpha * high), 0, 255).astype(np.uint8)
+    return scaled
+
+
+class MipChain:
+    """Mip levels 1..n of one output, each reduced once from the previous level"""
+
+    def __init__(self, width, height, srgb=False, preserve_alpha_coverage=False):
+        self.width = width
+        self.height = height
+        self.srgb = srgb
+        self.preserve_alpha_coverage = preserve_alpha_coverage
+        self.count = mip_count(width, height)
+        self.levels = {}
+        self.base_coverage = None
+        self.pending_rows = []
+        self.coverage_hits = 0
+
+    @property
+    def complete(self):
+        return self.count <= 1 or 1 in self.levels
+
+    def begin_base(self):
+        self.pending_rows = []
+        self.coverage_hits = 0
+
+    def feed_base_rows(self, rows):
+        """Accumulate a strip of the base level (strips must arrive top to bottom, even heights but the last)"""
+        self.pending_rows.append(reduce_2x2(rows, self.srgb, halve_y=self.height > 1, halve_x=self.width > 1))
+        if self.preserve_alpha_coverage:
+            self.coverage_hits += np.count_nonzero(rows[..., 3] >= ALPHA_COVERAGE_THRESHOLD * 255.0)
+
+    def finish_base(self):
+        if self.count > 1:
+            self.levels[1] = np.concatenate(self.pending_rows)
+        self.pending_rows = []
+        self.base_coverage = self.coverage_hits / max(1, self.width * self.height)
+
+    def reduced(self, index):
+        """Unscaled level index >= 1, reduced from level index - 1 on first use"""
+        if index not in self.levels:
+            previous = self.reduced(index - 1)
+            self.levels[index] = reduce_2x2(
+                previous, self.srgb, halve_y=previous.shape[0] > 1, halve_x=previous.shape[1] > 1
+            )
+        return self.levels[index]
+
+    def level(self, index):
+        """uint8 RGBA array of mip level index >= 1, alpha-coverage corrected if enabled"""
+        pixels = self.reduced(index)
+        if self.preserve_alpha_coverage and self.base_coverage is not None:
+            return scale_alpha_to_coverage(pixels, self.base_coverage)
+        return pixels
+
+
+def chain_for(output, srgb=False, preserve_alpha_coverage=False):
+    """Cached MipChain of an output (Pillow image or lazy view), dropped with the output"""
+    key = id(output)
+    with _chains_lock:
+        entry = _chains.get(key)
+        if entry is None or entry[0]() is not output:
+            entry = (weakref.ref(output), {})
+            _chains[key] = entry
+            weakref.finalize(output, _chains.pop, key, None)
+
+        chains = entry[1]
+        chain_key = (srgb, preserve_alpha_coverage)
+        if chain_key not in chains:
+            width, height = output.size
+            chains[chain_key] = MipChain(width, height, srgb, preserve_alpha_coverage)
+        return chains[chain_key]
+
+
+def entry_bytes(entry):
+    return sum(level.nbytes for chain in list(entry[1].values()) for level in list(chain.levels.values()))
+
+
+def chain_bytes():
+    """Bytes of the reduced levels held by all cached chains"""
+    with _chains_lock:
+        entries = list(_chains.values())
+    return sum(entry_bytes(entry) for entry in entries)
+
+
+def release_chains(max_bytes=0):
+    """Drop cached chains, oldest output first, until at most max_bytes of levels remain.
+
+    Chains are only removed from the cache, so a save still writing one
+    keeps using it; its levels are freed once that save is done.
+    """
+    with _chains_lock:
+        total = sum(entry_bytes(entry) for entry in _chains.values())
+        for key in list(_chains):
+            if total <= max_bytes:
+                break
+            total -= entry_bytes(_chains.pop(key))
@@ -0,0 +1,110 @@
+from PIL import Image
+
+
+MAX_LEVEL_SIZE = 4096
+MIN_LEVEL_SIZE = 128
+# Lazy views are rendered directly, so keep their top level closer to canvas sizes
+MAX_VIEW_LEVEL_SIZE = 2048
+
+
+def fit_size(size, bounds):
+    """Size an image of `size` gets from Image.thumbnail(bounds) (never enlarges)"""
+    width, height = size
+    max_w, max_h = max(1, bounds[0]), max(1, bounds[1])
+    if width <= max_w and height <= max_h:
+        return size
+
+    aspect = width / height
+    if max_w / max_h >= aspect:
+        return max(1, round(max_h * aspect)), max_h
+    return max_w, max(1, round(max_w / aspect))
+
+
+class PreviewPyramid:
+    """Precomputed downscaled levels of one output image.
+
+    Levels are built once (at most MAX_LEVEL_SIZE on the long side, halving
+    down to MIN_LEVEL_SIZE). A preview for any canvas size is then resampled
+    from the smallest level that is still at least as large as the displayed
+    size, so resizing the window never touches the full-resolution image.
+    Lazy outputs such as TiledView are rendered straight at the top level
+    size instead of being reduced from full resolution. Levels dropped by
+    trim() are rebuilt from the source when a larger preview needs them.
+    """
+
+    def __init__(self, image, max_level_size=MAX_LEVEL_SIZE, min_level_size=MIN_LEVEL_SIZE):
+        self.source = image
+        self.size = image.size
+        self.max_level_size = max_level_size
+        self.min_level_size = min_level_size
+        self.last_bounds = None
+        self.last_preview = None
+        self.trimmed = False
+        self.build_levels()
+
+    def build_levels(self):
+        image = self.source
+        max_level_size = self.max_level_size
+        if isinstance(image, Image.Image):
+            self.levels = [image]
+            longest = max(image.size)
+            factor = 1
+            while longest // factor > max_level_size:
+                factor *= 2
+
+            level = image.reduce(factor) if factor > 1 else image
+            if level is not image:
+                self.levels.append(level)
+        else:
+            top_size = min(max_level_size, MAX_VIEW_LEVEL_SIZE)
+            level = image.render_preview(fit_size(image.size, (top_size, top_size)))
+            self.levels = [level]
+        while max(level.size) // 2 >= self.min_level_size:
+            level = level.reduce(2)
+            self.levels.append(level)
+        self.trimmed = False
+
+    def nbytes(self):
+        """Bytes of the levels and the last preview (not counting the output itself, which may be level 0)"""
+        images = {id(image): image for image in self.levels + [self.last_preview] if image is not None}
+        images.pop(id(self.source), None)
+        return sum(image.width * image.height * len(image.getbands()) for image in images.values())
+
+    def trim(self):
+        """Keep only the levels no larger than the one serving the current preview"""
+        if self.last_preview is None:
+            return
+        current = self.level_for(self.last_preview.size)
+        self.levels = [level for level in self.levels if max(level.size) <= max(current.size)]
+        self.trimmed = True
+
+    def level_for(self, display_size):
+        best = self.levels[0]
+        for level in self.levels[1:]:
+            if level.width >= display_size[0] and level.height >= display_size[1]:
+                best = level
+        return best
+
+    def render(self, bounds):
+        """Preview image fitted into bounds; repeated calls with the same bounds are free"""
+        bounds = (max(1, bounds[0]), max(1, bounds[1]))
+        if bounds == self.last_bounds:
+            return self.last_preview
+
+        display_size = fit_size(self.size, bounds)
+        if self.last_preview is not None and self.last_preview.size == display_size:
+            self.last_bounds = bounds
+            return self.last_preview
+
+        level = self.level_for(display_size)
+        if self.trimmed and (level.width < display_size[0] or level.height < display_size[1]):
+            self.build_levels()
+            level = self.level_for(display_size)
+        if level.size == display_size:
+            preview = level
+        else:
+            preview = level.resize(display_size, Image.Resampling.BICUBIC)
+
+        self.last_bounds = bounds
+        self.last_preview = preview
+        return preview
@@ -0,0 +1,199 @@
+"""Atlas project files (.atlasproj).
+
+Version 2 projects are zip archives: manifest.json holds the settings and
+slots, and each slot refers to its image by the SHA-256 of the encoded
+bytes. Every distinct image is stored once, as images/<hash><ext>, in its
+original encoding when known (DDS inputs keep their blocks and mips).
+Loading only reads the manifest; slot images are read and decoded on first
+use. Version 1 projects (JSON with base64 PNG slot images) still load.
+
+Encoded payloads are cached per image object, so saving again only encodes
+slots whose image changed.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import weakref
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from . import profiling
+from .saving import SaveProgress, atomic_output
+from .source_cache import shared_cache
+from .sources import EncodedImage, full_image
+
+
+PROJECT_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+ZIP_MAGIC = b"PK\x03\x04"
+
+_payloads = {}
+
+
+def encode_slot_image(image):
+    """(digest, bytes, ext) to store for a slot image, reusing the original file when known"""
+    data = getattr(image, "encoded_data", None)
+    if data is not None:
+        data, ext = bytes(data), image.encoded_ext
+    else:
+        buffer = io.BytesIO()
+        full_image(image).save(buffer, format="PNG")
+        data, ext = buffer.getvalue(), ".png"
+    digest = getattr(image, "digest", None) or hashlib.sha256(data).hexdigest()
+    return digest, data, ext
+
+
+def cached_payload(image):
+    entry = _payloads.get(id(image))
+    if entry is not None and entry[0]() is image:
+        return entry[1]
+    return None
+
+
+def store_payload(image, payload):
+    """Remember the payload of image until the image is dropped"""
+    key = id(image)
+    _payloads[key] = (weakref.ref(image), payload)
+    weakref.finalize(image, _payloads.pop, key, None)
+
+
+def clear_payload_cache():
+    """Forget every cached payload, so the next save encodes all slots again"""
+    _payloads.clear()
+
+
+def slot_payloads(images, workers=None, progress=None):
+    """Payloads of the distinct images, encoding uncached ones on a thread pool (zlib releases the GIL)"""
+    progress = progress or SaveProgress()
+    payloads = {}
+    missing = []
+    for image in images:
+        if id(image) in payloads:
+            continue
+        payloads[id(image)] = cached_payload(image)
+        profiling.cache("payload cache", payloads[id(image)] is not None)
+        if payloads[id(image)] is None:
+            missing.append(image)
+
+    progress.add_work(len(missing))
+
+    def encode(image):
+        progress.check()
+        payload = encode_slot_image(image)
+        progress.step()
+        return payload
+
+    if len(missing) == 1:
+        payloads[id(missing[0])] = encode(missing[0])
+    elif missing:
+        workers = workers or min(len(missing), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for image, payload in zip(missing, executor.map(encode, missing)):
+                payloads[id(image)] = payload
+
+    for image in missing:
+        store_payload(image, payloads[id(image)])
+    return payloads
+
+
+@profiling.profiled("project save")
+def save_project(path, target_size, slots, workers=None, progress=None):
+    """Write a v2 project; slots are dicts with scale, blank_alpha, label and image (or None).
+
+    All payloads are gathered before the file is opened, and the archive is
+    written under a temporary name and renamed over path when complete, so a
+    project can be saved over the archive its lazy slot images are read from.
+    progress (a saving.SaveProgress) counts encoded and written images.
+    """
+    progress = progress or SaveProgress()
+    payloads = slot_payloads([slot["image"] for slot in slots if slot.get("image") is not None], workers, progress)
+    progress.add_work(len({digest for digest, _, _ in payloads.values()}))
+
+    images = {}
+    manifest_slots = []
+    with atomic_output(path) as temporary, zipfile.ZipFile(temporary, "w") as archive:
+        for slot in slots:
+            image = slot.get("image")
+            digest = None
+            if image is not None:
+                digest, data, ext = payloads[id(image)]
+                if digest not in images:
+                    progress.check()
+                    # PNG/JPG/BCn payloads are already compressed; deflating them again costs more than it saves
+                    member = f"images/{digest}{ext}"
+                    archive.writestr(member, data, compress_type=zipfile.ZIP_STORED)
+                    images[digest] = member
+                    progress.step()
+
+            manifest_slots.append({
+                "scale": slot.get("scale", "1"),
+                "blank_alpha": bool(slot.get("blank_alpha", False)),
+                "label": slot.get("label"),
+                "image": digest,
+            })
+
+        manifest = {
+            "version": PROJECT_VERSION,
+            "target_size": target_size,
+            "slots": manifest_slots,
+            "images": images,
+        }
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=1), compress_type=zipfile.ZIP_DEFLATED)
+
+
+@profiling.profiled("project load")
+def load_project(path):
+    """{"version", "target_size", "slots"} of a v1 or v2 project; slot images are lazy EncodedImages"""
+    with open(path, "rb") as project_file:
+        magic = project_file.read(len(ZIP_MAGIC))
+
+    if magic == ZIP_MAGIC:
+        with zipfile.ZipFile(path) as archive:
+            manifest = json.loads(archive.read(MANIFEST_NAME).decode("utf-8"))
+        images = manifest.get("images", {})
+        # Slots repeating an image share one lazy source, like the stored member
+        loaded = {}
+        slots = []
+        for slot in manifest.get("slots", []):
+            digest = slot.get("image")
+            image = None
+            if digest:
+                image = loaded.get(digest)
+                if image is None:
+                    # Reuse the source of a file that is already open with the same content
+                    image = shared_cache.find(digest)
+                if image is None:
+                    member = images[digest]
+                    ext = member[member.rfind("."):].lower()
+                    image = EncodedImage(ext=ext, archive_path=path, member=member, digest=digest)
+                loaded[digest] = image
+            slots.append(dict(slot, image=image))
+        return {
+            "version": manifest.get("version", PROJECT_VERSION),
+            "target_size": manifest.get("target_size", "1024"),
+            "slots": slots,
+        }
+
+    with open(path, "r", encoding="utf-8") as project_file:
+        project_data = json.load(project_file)
+
+    # v1 slots repeat identical images; share one lazy image per payload
+    images = {}
+    slots = []
+    for slot in project_data.get("slots", []):
+        image_data = slot.get("image_base64")
+        image = None
+        if image_data:
+            image = images.get(image_data)
+            if image is None:
+                image = EncodedImage(base64.b64decode(image_data.encode("utf-8")), ".png")
+                images[image_data] = image
+        slot = {key: value for key, value in slot.items() if key != "image_base64"}
+        slots.append(dict(slot, image=image))
+    return {
+        "version": project_data.get("version", 1),
+        "target_size": project_data.get("target_size", "1024"),
+        "slots": slots,
+    }
@@ -0,0 +1,101 @@
+import queue
+import threading
+from collections import OrderedDict
+
+
+class RenderCancelled(Exception):
+    """Raised by a render function that noticed a newer request"""
+
+
+class RenderWorker:
+    """Background thread that renders only the most recent request of each kind.
+
+    Every submit() bumps the generation counter of its kind (e.g. "tile",
+    "atlas") and replaces the request of that kind that has not started yet;
+    requests of other kinds stay queued and run in submission order. Render
+    functions receive a ``cancelled()`` callable they can poll between
+    steps, and results of superseded generations are dropped instead of
+    being delivered. Finished results are handed back on the UI thread by
+    calling deliver(), e.g. from a root.after() poll, since Tk widgets must
+    not be touched from the worker thread.
+    """
+
+    def __init__(self, name="render-worker"):
+        self.condition = threading.Condition()
+        self.generations = {}
+        # kind -> (generation, render, on_done), oldest request first
+        self.pending = OrderedDict()
+        self.running = False
+        self.stopped = False
+        self.results = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, kind, render, on_done):
+        """Queue render(cancelled) and call on_done(result) on delivery if still current"""
+        with self.condition:
+            generation = self.generations.get(kind, 0) + 1
+            self.generations[kind] = generation
+            self.pending.pop(kind, None)
+            self.pending[kind] = (generation, render, on_done)
+            self.condition.notify()
+            return generation
+
+    def cancel(self, kind=None):
+        """Drop the latest request of kind (of every kind for None), queued or running"""
+        with self.condition:
+            for cancelled_kind in list(self.generations) if kind is None else [kind]:
+                self.generations[cancelled_kind] = self.generations.get(cancelled_kind, 0) + 1
+                self.pending.pop(cancelled_kind, None)
+
+    def is_current(self, kind, generation):
+        with self.condition:
+            return generation == self.generations.get(kind)
+
+    def has_work(self):
+        with self.condition:
+            return bool(self.pending) or self.running or not self.results.empty()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                kind, (generation, render, on_done) = self.pending.popitem(last=False)
+                self.running = True
+
+            try:
+                result = render(lambda: not self.is_current(kind, generation))
+                if self.is_current(kind, generation):
+                    self.results.put((kind, generation, on_done, result))
+            except RenderCancelled:
+                pass
+            except Exception:
+                # Auto-generation stays silent on bad input, as before
+                pass
+            finally:
+                with self.condition:
+                    self.running = False
+
+    def deliver(self):
+        """Run callbacks of finished, still-current renders on the calling (UI) thread.
+
+        Returns True while requests are still outstanding.
+        """
+        while True:
+            try:
+                kind, generation, on_done, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if self.is_current(kind, generation):
+                on_done(result)
+        return self.has_work()
+
+    def stop(self):
+        """Drop queued requests and end the thread once the running render returns"""
+        with self.condition:
+            self.stopped = True
+            self.pending.clear()
+            self.condition.notify()
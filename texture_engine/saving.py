@@ -0,0 +1,148 @@
+"""Background saves: progress, cancellation and atomic file replacement.
+
+Writers take an optional SaveProgress; they declare their work with
+add_work(), report it with step() and call check() between steps, which
+raises SaveCancelled once cancel() was called. Files are written through
+atomic_output(), so a failed or cancelled save never leaves a truncated
+file behind and an existing file is only replaced by a complete one.
+SaveWorker runs save jobs one at a time on a background thread, so the UI
+stays usable while large outputs are encoded.
+"""
+import os
+import queue
+import threading
+import uuid
+from contextlib import contextmanager
+
+
+class SaveCancelled(Exception):
+    """Raised inside a save whose SaveProgress was cancelled"""
+
+
+class SaveProgress:
+    """Work done by a save, in writer-defined units (e.g. pixels encoded)"""
+
+    def __init__(self):
+        self.total = 0
+        self.done = 0
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def add_work(self, units):
+        with self.lock:
+            self.total += units
+
+    def step(self, units=1):
+        with self.lock:
+            self.done += units
+
+    def check(self):
+        if self.cancelled:
+            raise SaveCancelled()
+
+    def cancel(self):
+        self.cancelled = True
+
+    @property
+    def fraction(self):
+        with self.lock:
+            return min(1.0, self.done / self.total) if self.total else 0.0
+
+
+@contextmanager
+def atomic_output(path):
+    """Yield a temporary path next to path; it replaces path only if the block succeeds"""
+    temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        yield temporary
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+class SaveJob:
+    def __init__(self, label, run, on_done=None):
+        self.label = label
+        self.run = run
+        self.on_done = on_done
+        self.progress = SaveProgress()
+        self.result = None
+        self.error = None
+        self.completed = False
+        self.finished = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self.progress.cancelled
+
+    def cancel(self):
+        self.progress.cancel()
+
+
+class SaveWorker:
+    """Background thread running save jobs in submission order.
+
+    run(progress) executes on the worker thread and must not touch Tk
+    widgets; snapshot settings before submitting. Finished jobs are handed
+    back on the UI thread by deliver(), e.g. from a root.after() poll.
+    """
+
+    def __init__(self, name="save-worker"):
+        self.queue = queue.Queue()
+        self.finished = queue.Queue()
+        self.jobs = []
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.loop, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, label, run, on_done=None):
+        """Queue run(progress); on_done(job) is called on delivery (check job.completed, then job.error)"""
+        job = SaveJob(label, run, on_done)
+        with self.lock:
+            self.jobs.append(job)
+        self.queue.put(job)
+        return job
+
+    def active(self):
+        """Jobs not delivered yet, the running one first"""
+        with self.lock:
+            return list(self.jobs)
+
+    def cancel_all(self):
+        for job in self.active():
+            job.cancel()
+
+    def wait(self, timeout=None):
+        """Block until every submitted job has run (e.g. before exiting); False on timeout"""
+        return all(job.finished.wait(timeout) for job in self.active())
+
+    def loop(self):
+        while True:
+            job = self.queue.get()
+            try:
+                job.progress.check()
+                job.result = job.run(job.progress)
+                job.completed = True
+            except SaveCancelled:
+                pass
+            except Exception as e:
+                job.error = e
+            job.finished.set()
+            self.finished.put(job)
+
+    def deliver(self):
+        """Call on_done of finished jobs on the calling (UI) thread; returns True while jobs remain"""
+        while True:
+            try:
+                job = self.finished.get_nowait()
+            except queue.Empty:
+                break
+            with self.lock:
+                self.jobs.remove(job)
+            if job.on_done is not None:
+                job.on_done(job)
+        return bool(self.active())
@@ -0,0 +1,105 @@
+"""Shared lazy sources per input file.
+
+Opening a file that is already loaded (another atlas slot, the single tab, a
+specular channel, a re-drop) returns the same source instead of decoding it
+again. Files are found by (path, size, mtime) without being read, and
+otherwise by the SHA-256 of their bytes, so copies of a texture under other
+names share one source as well. Sources are shared read-only; the least
+recently used ones are dropped from the cache once the estimated decoded
+size exceeds the byte budget (holders keep theirs).
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from . import profiling
+from .sources import EncodedImage
+
+
+DEFAULT_SOURCE_CACHE_BYTES = 1024 * 1024 * 1024
+
+
+def file_key(path):
+    stat = os.stat(path)
+    return os.path.normcase(os.path.abspath(path)), stat.st_size, stat.st_mtime_ns
+
+
+class SourceCache:
+    """LRU of EncodedImage sources keyed by content hash, with a (path, size, mtime) index"""
+
+    def __init__(self, max_bytes=DEFAULT_SOURCE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.paths = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def lookup(self, digest):
+        entry = self.entries.get(digest)
+        if entry is None:
+            return None
+        self.entries.move_to_end(digest)
+        self.hits += 1
+        return entry[0]
+
+    def find(self, digest):
+        """Cached source with this content hash, or None"""
+        with self.lock:
+            return self.lookup(digest)
+
+    def open(self, path):
+        """Shared EncodedImage for path; raises for unreadable images"""
+        key = file_key(path)
+        with self.lock:
+            source = self.lookup(self.paths.get(key))
+            if source is not None:
+                profiling.cache("source cache", True)
+                return source
+
+        with open(path, "rb") as file:
+            data = file.read()
+        digest = hashlib.sha256(data).hexdigest()
+        with self.lock:
+            source = self.lookup(digest)
+            if source is not None:
+                profiling.cache("source cache", True)
+                self.paths[key] = digest
+                return source
+
+        source = EncodedImage(data, os.path.splitext(path)[1].lower(), digest=digest)
+        width, height = source.size  # reads the header, so unreadable files fail here rather than on first use
+        nbytes = len(data) + width * height * 4
+
+        with self.lock:
+            # Another thread may have loaded the same content meanwhile
+            existing = self.lookup(digest)
+            if existing is not None:
+                self.paths[key] = digest
+                return existing
+            self.misses += 1
+            profiling.cache("source cache", False)
+            if nbytes <= self.max_bytes:
+                self.entries[digest] = (source, nbytes)
+                self.paths[key] = digest
+                self.current_bytes += nbytes
+                self.evict()
+        return source
+
+    def evict(self):
+        while self.current_bytes > self.max_bytes and self.entries:
+            digest, (_, nbytes) = self.entries.popitem(last=False)
+            self.current_bytes -= nbytes
+            for key in [key for key, value in self.paths.items() if value == digest]:
+                del self.paths[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.paths.clear()
+            self.current_bytes = 0
+
+
+shared_cache = SourceCache()
@@ -0,0 +1,215 @@
+"""Lazy image sources.
+
+Slot and input images do not have to be decoded Pillow images: DdsImage
+(dds_reader) and EncodedImage keep the encoded file and decode on first use.
+image_for_size() and full_image() turn any source into a Pillow image.
+With set_disk_cache(), decoded pixels of EncodedImages persist across
+launches (see disk_cache).
+"""
+import hashlib
+import io
+import os
+import struct
+import threading
+import time
+import weakref
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from . import profiling
+from .dds_reader import DdsImage
+
+
+disk_cache = None
+_live_sources = weakref.WeakSet()
+
+
+def set_disk_cache(cache):
+    """Use cache (a disk_cache.DiskCache, or None) for decodes of EncodedImages"""
+    global disk_cache
+    disk_cache = cache
+
+
+class EncodedImage:
+    """Image kept as its encoded file bytes (PNG/JPG/DDS), decoded on first use.
+
+    The bytes are given directly or read on first access from a member of a
+    zip archive (project files), so creating one is nearly free. DDS data is
+    decoded through DdsImage, so mip levels still decode one at a time.
+    """
+
+    mode = "RGBA"
+
+    def __init__(self, data=None, ext=".png", archive_path=None, member=None, digest=None):
+        self.data = data
+        self.encoded_ext = ext
+        self.archive_path = archive_path
+        self.member = member
+        self.digest = digest
+        self.source = None
+        self.header_size = None
+        self.last_used = 0.0
+        self.lock = threading.RLock()
+        _live_sources.add(self)
+
+    def __getstate__(self):
+        # Picklable for process pools: only the encoded form travels, and
+        # archive members are re-read on the other side
+        state = self.__dict__.copy()
+        state["source"] = None
+        if self.archive_path is not None:
+            state["data"] = None
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+        _live_sources.add(self)
+
+    @property
+    def encoded_data(self):
+        with self.lock:
+            if self.data is None:
+                with zipfile.ZipFile(self.archive_path) as archive:
+                    self.data = archive.read(self.member)
+            return self.data
+
+    @property
+    def size(self):
+        """Image size, read from the file header without decoding"""
+        with self.lock:
+            if self.header_size is None:
+                if self.encoded_ext == ".dds":
+                    self.header_size = self.decoded().size
+                else:
+                    self.header_size = self.pillow_size()
+            return self.header_size
+
+    def pillow_size(self):
+        with Image.open(io.BytesIO(self.encoded_data)) as image:
+            return image.size
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def content_digest(self):
+        """SHA-256 of the encoded bytes"""
+        with self.lock:
+            if self.digest is None:
+                self.digest = hashlib.sha256(self.encoded_data).hexdigest()
+            return self.digest
+
+    def decoded(self):
+        """DdsImage for DDS data (levels still decode lazily), otherwise the RGBA Pillow image"""
+        with self.lock:
+            if self.source is None:
+                data = self.encoded_data
+                cache = disk_cache
+                if self.encoded_ext == ".dds":
+                    try:
+                        self.source = DdsImage(data)
+                        if cache is not None:
+                            self.source.level_cache = cache
+                            self.source.cache_key = self.content_digest()
+                        return self.source
+                    except (ValueError, struct.error):
+                        pass
+
+                if cache is not None:
+                    self.source = cache.load(self.content_digest(), self.pillow_size())
+                if self.source is None:
+                    width, height = self.pillow_size()
+                    with profiling.stage("decode", nbytes=width * height * 4, format=self.encoded_ext):
+                        self.source = Image.open(io.BytesIO(data)).convert("RGBA")
+                    if cache is not None:
+                        cache.store(self.content_digest(), self.source)
+            return self.source
+
+    def image_for_size(self, min_size):
+        self.last_used = time.monotonic()
+        return image_for_size(self.decoded(), min_size)
+
+    def full_image(self):
+        self.last_used = time.monotonic()
+        return full_image(self.decoded())
+
+    def decoded_bytes(self):
+        source = self.source
+        if isinstance(source, DdsImage):
+            return source.decoded_bytes()
+        return 0 if source is None else source.width * source.height * 4
+
+    def release(self):
+        """Drop decoded pixels, keeping the encoded bytes (decoded again, or read from the disk cache, on next use)"""
+        with self.lock:
+            if isinstance(self.source, DdsImage):
+                self.source.release()
+            else:
+                self.source = None
+
+
+def image_for_size(image, min_size):
+    """A Pillow image for a source that only needs to cover min_size pixels"""
+    if isinstance(image, (DdsImage, EncodedImage)):
+        return image.image_for_size(min_size)
+    return image
+
+
+def full_image(image):
+    """The full-resolution Pillow image of a source"""
+    if isinstance(image, (DdsImage, EncodedImage)):
+        return image.full_image()
+    return image
+
+
+def decoded_bytes():
+    """Decoded pixels held by all live EncodedImages"""
+    return sum(source.decoded_bytes() for source in list(_live_sources))
+
+
+def encoded_bytes():
+    """Encoded file bytes held by all live EncodedImages (archive members not read yet count 0)"""
+    return sum(len(source.data) for source in list(_live_sources) if source.data is not None)
+
+
+def held_bytes():
+    """Encoded plus decoded bytes held by all live EncodedImages"""
+    return encoded_bytes() + decoded_bytes()
+
+
+def release_decoded(max_bytes):
+    """Release decoded pixels of the least recently used EncodedImages until at most max_bytes remain"""
+    sources = sorted(list(_live_sources), key=lambda source: source.last_used)
+    total = sum(source.decoded_bytes() for source in sources)
+    for source in sources:
+        if total <= max_bytes:
+            break
+        nbytes = source.decoded_bytes()
+        if nbytes:
+            source.release()
+            total -= nbytes
+
+
+def prefetch(requests, workers=None):
+    """Decode the levels that (source, min_size) requests need, concurrently.
+
+    Pillow and the DDS block decoders release the GIL, so a thread pool
+    scales with cores. Plain Pillow images need no work and are skipped.
+    """
+    requests = [(image, min_size) for image, min_size in requests if isinstance(image, (DdsImage, EncodedImage))]
+    if len(requests) <= 1:
+        for image, min_size in requests:
+            image.image_for_size(min_size)
+        return
+
+    workers = workers or min(len(requests), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda request: request[0].image_for_size(request[1]), requests))
@@ -0,0 +1,146 @@
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from . import profiling
+from .dds_reader import DdsImage
+from .sources import EncodedImage, full_image
+
+
+SPECULAR_CHANNELS = ("roughness", "ambient_occlusion", "metalness")
+
+
+@dataclass
+class SpecularConfig:
+    """Packing options: invert roughness (smoothness inputs), and black instead of a metalness map"""
+    invert_roughness: bool = False
+    use_black_metalness: bool = False
+
+
+def luminance(image):
+    """(H, W) uint8 "L" conversion of an image or lazy source.
+
+    A lazy source decoded for the conversion is released again, so no RGBA
+    copy of the input stays alive next to its channel.
+    """
+    lazy = isinstance(image, (EncodedImage, DdsImage))
+    decoded_before = image.decoded_bytes() if lazy else 0
+    channel = np.asarray(full_image(image).convert("L"))
+    if lazy and image.decoded_bytes() > decoded_before:
+        image.release()
+    return channel
+
+
+def resample_nearest(channel, size):
+    """Nearest-neighbour resize of a (H, W) uint8 array to size (width, height)"""
+    if (channel.shape[1], channel.shape[0]) == tuple(size):
+        return channel
+    return np.asarray(Image.fromarray(channel).resize(size, Image.Resampling.NEAREST))
+
+
+class SpecularPacker:
+    """Packs roughness/AO/metalness into the R/G/B channels of an opaque RGBA image.
+
+    Each input is kept once as a single-channel array; AO and metalness are
+    resampled to the roughness size once and cached, so toggling Invert
+    Roughness or No Metalness only rewrites channels of the output buffer.
+    Inputs may be replaced from one thread while another packs.
+    """
+
+    def __init__(self):
+        self.channels = {}
+        self.resampled = {}
+        self.lock = threading.Lock()
+
+    def set_input(self, key, image):
+        channel = None if image is None else luminance(image)
+        with self.lock:
+            if channel is None:
+                self.channels.pop(key, None)
+            else:
+                self.channels[key] = channel
+            self.resampled.pop(key, None)
+
+    def has_input(self, key):
+        return key in self.channels
+
+    def clear(self):
+        with self.lock:
+            self.channels.clear()
+            self.resampled.clear()
+
+    def input_bytes(self):
+        return sum(channel.nbytes for channel in list(self.channels.values()))
+
+    def resampled_bytes(self):
+        return sum(
+            channel.nbytes
+            for key, (_, channel) in list(self.resampled.items())
+            if channel is not self.channels.get(key)
+        )
+
+    def trim(self, max_bytes=0):
+        """Drop the resampled copies (they are rebuilt on the next pack)"""
+        with self.lock:
+            if self.resampled_bytes() > max_bytes:
+                self.resampled.clear()
+
+    @property
+    def size(self):
+        """Output size (the roughness size), or None without roughness"""
+        roughness = self.channels.get("roughness")
+        return None if roughness is None else (roughness.shape[1], roughness.shape[0])
+
+    def channel(self, key, size):
+        """Input key resampled to size, cached until the input or the size changes"""
+        cached = self.resampled.get(key)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        channel = resample_nearest(self.channels[key], size)
+        self.resampled[key] = (size, channel)
+        return channel
+
+    def ready(self, config):
+        """Whether every input config needs is set"""
+        return (
+            self.has_input("roughness")
+            and self.has_input("ambient_occlusion")
+            and (config.use_black_metalness or self.has_input("metalness"))
+        )
+
+    @profiling.profiled("specular pack")
+    def pack(self, config=None):
+        config = config or SpecularConfig()
+        with self.lock:
+            size = self.size
+            roughness = self.channels["roughness"]
+            ambient_occlusion = self.channel("ambient_occlusion", size)
+            use_metalness = not config.use_black_metalness and "metalness" in self.channels
+            metalness = self.channel("metalness", size) if use_metalness else None
+
+        # The returned image shares this buffer, so each result gets its own
+        pixels = np.empty((size[1], size[0], 4), dtype=np.uint8)
+        if config.invert_roughness:
+            np.bitwise_not(roughness, out=pixels[..., 0])
+        else:
+            pixels[..., 0] = roughness
+        pixels[..., 1] = ambient_occlusion
+        if metalness is None:
+            pixels[..., 2] = 0
+        else:
+            pixels[..., 2] = metalness
+        pixels[..., 3] = 255
+        return Image.fromarray(pixels)
+
+
+def pack_specular(roughness, ambient_occlusion, metalness, config=None):
+    """Pack roughness/AO/metalness into the R/G/B channels of an opaque RGBA image"""
+    config = config or SpecularConfig()
+    packer = SpecularPacker()
+    packer.set_input("roughness", roughness)
+    packer.set_input("ambient_occlusion", ambient_occlusion)
+    if not config.use_black_metalness and metalness is not None:
+        packer.set_input("metalness", metalness)
+    return packer.pack(config)
@@ -0,0 +1,141 @@
+"""Strip-based writers for outputs too large to encode as one Pillow image.
+
+Rows are produced and written a strip at a time, so peak memory stays at a
+few strips regardless of the output dimensions.
+"""
+import struct
+import zlib
+
+import numpy as np
+from . import bcn, dds, endpoints, mipmaps
+from .saving import SaveProgress
+
+
+STRIP_BYTES = 32 * 1024 * 1024
+# Smaller strips when someone watches the progress, so it advances (and can be cancelled) often
+PROGRESS_STRIP_BYTES = 8 * 1024 * 1024
+# Outputs above this many pixels are streamed instead of encoded in one piece
+STREAMING_THRESHOLD_PIXELS = 64 * 1024 * 1024
+STREAMING_EXTENSIONS = {".png", ".dds"}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_CHUNK_BYTES = 1024 * 1024
+
+
+def should_stream(output, ext):
+    width, height = output.size
+    return ext in STREAMING_EXTENSIONS and width * height > STREAMING_THRESHOLD_PIXELS
+
+
+def strip_height_for(width, strip_bytes=STRIP_BYTES, multiple=4):
+    """Rows per strip for a given width, rounded down to a multiple of the block height"""
+    rows = strip_bytes // max(1, width * 4)
+    return max(multiple, rows // multiple * multiple)
+
+
+def render_rows(output, top, bottom):
+    """Rows [top, bottom) of an output (Pillow image or lazy view) as an RGBA uint8 array"""
+    if hasattr(output, "render_rows"):
+        return output.render_rows(top, bottom)
+    strip = output.crop((0, top, output.width, bottom))
+    if strip.mode != "RGBA":
+        strip = strip.convert("RGBA")
+    return np.asarray(strip)
+
+
+def iter_strips(output, strip_height):
+    height = output.size[1]
+    for top in range(0, height, strip_height):
+        yield render_rows(output, top, min(height, top + strip_height))
+
+
+# ---------- PNG ----------
+def png_chunk(chunk_type, data):
+    crc = zlib.crc32(chunk_type + data) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", crc)
+
+
+def write_png_streaming(output, path, compress_level=6, strip_bytes=STRIP_BYTES, progress=None):
+    """Write an RGBA PNG, filtering (Sub) and deflating one strip at a time"""
+    width, height = output.size
+    compressor = zlib.compressobj(compress_level)
+    pending = bytearray()
+    progress = progress or SaveProgress()
+    progress.add_work(width * height)
+
+    with open(path, "wb") as file:
+        file.write(PNG_SIGNATURE)
+        file.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+
+        for strip in iter_strips(output, strip_height_for(width, strip_bytes, multiple=1)):
+            progress.check()
+            raw = strip.reshape(strip.shape[0], width * 4)
+            lines = np.empty((raw.shape[0], width * 4 + 1), dtype=np.uint8)
+            lines[:, 0] = 1  # Sub filter
+            lines[:, 1:5] = raw[:, :4]
+            np.subtract(raw[:, 4:], raw[:, :-4], out=lines[:, 5:])
+
+            pending += compressor.compress(lines.tobytes())
+            if len(pending) >= PNG_CHUNK_BYTES:
+                file.write(png_chunk(b"IDAT", bytes(pending)))
+                pending.clear()
+            progress.step(strip.shape[0] * width)
+
+        pending += compressor.flush()
+        file.write(png_chunk(b"IDAT", bytes(pending)))
+        file.write(png_chunk(b"IEND", b""))
+
+
+# ---------- DDS ----------
+def write_dds_streaming(
+    output, path, pixel_format=None, strip_bytes=STRIP_BYTES, workers=None, preset=None,
+    generate_mipmaps=False, preserve_alpha_coverage=False, progress=None
+):
+    """Write a DDS as uncompressed RGBA8 (pixel_format None) or a block format.
+
+    Strips are block-compressed with the built-in encoder; returns its
+    bcn.CompressionStats (None for uncompressed output). With generate_mipmaps
+    the full chain follows the base level; level 1 is reduced from the same
+    strips, and the output's cached MipChain is reused by later saves.
+    progress (a saving.SaveProgress) counts encoded pixels.
+    """
+    width, height = output.size
+    stats = None
+    if pixel_format is not None:
+        stats = bcn.CompressionStats(dds.block_codec(pixel_format), preset or endpoints.DEFAULT_PRESET)
+
+    def encode(pixels):
+        if stats is None:
+            return np.ascontiguousarray(pixels).tobytes()
+        return stats.compress(pixels, workers)
+
+    chain = None
+    if generate_mipmaps:
+        chain = mipmaps.chain_for(output, dds.is_srgb(pixel_format), preserve_alpha_coverage)
+    feed_chain = chain is not None and not chain.complete
+    if feed_chain:
+        chain.begin_base()
+
+    progress = progress or SaveProgress()
+    progress.add_work(width * height)
+    for level in range(1, chain.count if chain else 1):
+        progress.add_work(max(1, width >> level) * max(1, height >> level))
+
+    with open(path, "wb") as file:
+        file.write(dds.build_header(width, height, pixel_format, chain.count if chain else 1))
+        for strip in iter_strips(output, strip_height_for(width, strip_bytes)):
+            progress.check()
+            file.write(encode(strip))
+            if feed_chain:
+                chain.feed_base_rows(strip)
+            progress.step(strip.shape[0] * width)
+
+        if chain is not None:
+            if feed_chain:
+                chain.finish_base()
+            for level in range(1, chain.count):
+                progress.check()
+                pixels = chain.level(level)
+                file.write(encode(pixels))
+                progress.step(pixels.shape[0] * pixels.shape[1])
+    return stats
@@ -0,0 +1,106 @@
+import numpy as np
+from PIL import Image
+
+from . import profiling
+from .sources import full_image, image_for_size
+
+
+@profiling.profiled("tile_image")
+def tile_image(img, multiplier):
+    """Repeat an image multiplier x multiplier times"""
+    w, h = img.size
+    new_img = Image.new("RGBA", (w * multiplier, h * multiplier))
+
+    for x in range(multiplier):
+        for y in range(multiplier):
+            new_img.paste(img, (x * w, y * h))
+
+    return new_img
+
+
+def tiled_nearest_indices(length, multiplier, target_length):
+    """Source indices NEAREST picks when resizing a tiled axis to target_length.
+
+    The mapping is sampled from Pillow itself on a one-pixel-high index image,
+    so it matches resize() exactly; -1 marks output pixels Pillow leaves empty.
+    """
+    probe = np.arange(length * multiplier, dtype=np.int32) % length + 1
+    probe_img = Image.fromarray(probe.reshape(1, -1))
+    mapped = np.asarray(probe_img.resize((target_length, 1), Image.Resampling.NEAREST))
+    return mapped.reshape(-1).astype(np.intp) - 1
+
+
+@profiling.profiled("tile_resample")
+def tile_resample(img, multiplier, size):
+    """Return tile_image(img, multiplier).resize(size, NEAREST) without the tiled intermediate.
+
+    Pixels are gathered straight from the source through per-axis index maps,
+    so peak memory is bounded by the source plus the output.
+    """
+    w, h = img.size
+    target_w, target_h = size
+    cols = tiled_nearest_indices(w, multiplier, target_w)
+    rows = tiled_nearest_indices(h, multiplier, target_h)
+
+    pixels = np.ascontiguousarray(np.asarray(img.convert("RGBA"))).view(np.uint32).reshape(h, w)
+    result = pixels[np.ix_(np.maximum(rows, 0), np.maximum(cols, 0))]
+    result[rows < 0, :] = 0
+    result[:, cols < 0] = 0
+    return Image.fromarray(result.view(np.uint8).reshape(target_h, target_w, 4))
+
+
+class TiledView:
+    """Lazy multiplier x multiplier tiling of a source image.
+
+    Previews are rendered by tiling a downscaled copy of the source, so their
+    cost depends on the preview size only. The full-resolution image is only
+    built by materialize(), i.e. when an output is actually written.
+    """
+
+    def __init__(self, source, multiplier):
+        self.source = source
+        self.multiplier = multiplier
+        self.size = (source.width * multiplier, source.height * multiplier)
+        self.scaled_source = None
+        self.source_pixels = None
+
+    @property
+    def width(self):
+        return self.size[0]
+
+    @property
+    def height(self):
+        return self.size[1]
+
+    def render_preview(self, size):
+        """Render the tiled image at exactly `size` from a downscaled source"""
+        tile_size = (
+            max(1, min(self.source.width, round(size[0] / self.multiplier))),
+            max(1, min(self.source.height, round(size[1] / self.multiplier))),
+        )
+        scaled = self.scaled_source
+        if scaled is None or scaled.size != tile_size:
+            level = image_for_size(self.source, tile_size)
+            if tile_size == level.size:
+                scaled = level
+            else:
+                scaled = level.resize(tile_size, Image.Resampling.BICUBIC, reducing_gap=2.0)
+            self.scaled_source = scaled
+        return tile_resample(scaled, self.multiplier, size)
+
+    def render_rows(self, top, bottom):
+        """Full-resolution rows [top, bottom) as an (rows, width, 4) uint8 array"""
+        if self.source_pixels is None:
+            self.source_pixels = np.asarray(full_image(self.source).convert("RGBA"))
+        band = self.source_pixels[np.arange(top, bottom) % self.source.height]
+        return np.tile(band, (1, self.multiplier, 1))
+
+    def materialize(self):
+        return tile_image(full_image(self.source), self.multiplier)
+
+
+def materialize(output):
+    """Return a full-resolution Pillow image for an output that may be a lazy view (TiledView, atlas.AtlasView)"""
+    if hasattr(output, "materialize"):
+        return output.materialize()
+    return output